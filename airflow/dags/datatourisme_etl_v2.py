@@ -1,7 +1,5 @@
 import os
 import uuid
-import json
-import redis
 import logging
 import datetime
 from datetime import timedelta
@@ -13,7 +11,9 @@ from airflow.models import Variable
 from airflow.utils.trigger_rule import TriggerRule
 from airflow.utils.dates import days_ago
 from utils import *
+from utils import json_codec
 import neo4j as neo4j
+import pyarrow as pa
 from parts.clusters import create_cluster_tasks
 
 # Variables Airflow
@@ -30,14 +30,29 @@ URL_ARCHIVE = Variable.get("URL_ARCHIVE")
 NEO4J_USER = Variable.get("NEO4J_USER")
 NEO4J_PASSWORD = Variable.get("NEO4J_PASSWORD")
 NEO4J_URL = Variable.get("NEO4J_URL")
+# Mode incrémental : seuls les Pois nouveaux ou modifiés depuis le dernier run sont parsés
+INCREMENTAL_INGESTION = Variable.get("INCREMENTAL_INGESTION", default_var="false").lower() == "true"
+# Comparaison en base : les Pois de l'archive sont comparés à la table Point_Of_Interest par PostgreSQL,
+# sans charger les Pois de la base dans Redis ni en mémoire
+DIFF_IN_DATABASE = Variable.get("DIFF_IN_DATABASE", default_var="false").lower() == "true"
+# Nombre de connexions et de threads utilisés pour écrire chaque batch de Pois en sous-lots parallèles
+BATCH_WRITE_WORKERS = int(Variable.get("BATCH_WRITE_WORKERS", default_var="1"))
 DOWNLOAD_PATH = "./raw_archive"
 ZIP_PATH = "./raw_archive/archive.zip"
-
-def get_redis_client():
+# Nombre de POIs lus puis filtrés à la fois par get_france_poi
+POI_CHUNK_SIZE = 10000
+# Les données échangées entre les tâches passent par temporary_objects, configuré par l'environnement :
+# elles expirent après un jour et, au-delà de REDIS_SPILL_SIZE, sont écrites dans REDIS_SPILL_DIRECTORY plutôt qu'en mémoire dans Redis
+os.environ["REDIS_HOST"] = REDIS_HOST
+os.environ["REDIS_PORT"] = REDIS_PORT
+os.environ.setdefault("REDIS_EXPIRATION", str(int(timedelta(days=1).total_seconds())))
+
+def read_temporary_bytes(key: str) -> bytes | None:
     """
-    Retourne un client Redis.
+    Retourne les octets d'un objet temporaire, None s'il n'existe pas.
     """
-    return redis.StrictRedis(host=REDIS_HOST, port=REDIS_PORT, db=0)
+    chunks = object_stream(key)
+    return None if chunks is None else b"".join(chunks)
 
 
 with DAG(
@@ -208,92 +223,128 @@ with DAG(
             with open(f"{CUR_DIR}/sql/create_tables.sql", "r") as sql_file:
                 cursor.execute(sql_file.read())
             cursor.close()
+            # Index et évolutions du schéma, versionnés
+            connection.autocommit = False
+            migrate_database(connection)
             connection.close()
             logging.info("Tables créées avec succès !")
         except Exception as e:
             logging.error(f"Erreur lors de la création des tables : {e}")
 
-    @task(task_id="download_archive")
-    def download_archive() -> None:
+    @task.short_circuit(task_id="download_archive")
+    def download_archive() -> bool:
         """
         Téléchargement de l'archive depuis datatourisme
+        Si l'archive n'a pas changé depuis le dernier traitement, toutes les tâches suivantes sont ignorées
+        Les validateurs HTTP de la dernière archive traitée sont lus en base : ils ne dépendent pas du worker
+
+        :return: 
+            bool - True si une nouvelle archive est à traiter
         """
-        archive = download_datatourisme_archive(url = URL_ARCHIVE, download_path=DOWNLOAD_PATH)
-        if not archive:
-            raise
+        connection = connect_to_db_V2(host=POSTGRES_HOST,
+                port=POSTGRES_PORT,
+                user=POSTGRES_USER,
+                password=POSTGRES_PASSWORD,
+                dbname=POSTGRES_DATATOURISME_DB,)
+        validators = get_archive_validators(connection)
+        connection.close()
+        status = download_datatourisme_archive(url = URL_ARCHIVE, download_path=DOWNLOAD_PATH, validators=validators)
+        if status == DownloadStatus.FAILED:
+            raise RuntimeError("Échec du téléchargement de l'archive datatourisme")
+        return status == DownloadStatus.DOWNLOADED
 
     @task(task_id="get_all_poi_metadata_from_archive")
     def get_all_poi_metadata_from_archive() -> str:
         """
         Récupération des métadata des Pois depuis l'archive datatourisme
+        En mode incrémental, seules les métadata des Pois dont `lastUpdateDatatourisme` diffère
+        du watermark enregistré en base sont conservées
 
         :return: 
             str - clé redis
         """
-        redis_client = get_redis_client()
+        if not check_archive_integrity(ZIP_PATH):
+            raise RuntimeError("L'archive datatourisme ne correspond pas à sa somme de contrôle")
         poi_metadata_list = get_all_poi_metadata(ZIP_PATH)
+        if INCREMENTAL_INGESTION:
+            connection = connect_to_db_V2(host=POSTGRES_HOST,
+                    port=POSTGRES_PORT,
+                    user=POSTGRES_USER,
+                    password=POSTGRES_PASSWORD,
+                    dbname=POSTGRES_DATATOURISME_DB,)
+            create_poi_watermark_table(connection)
+            watermarks = get_poi_watermarks(connection)
+            connection.close()
+            total = len(poi_metadata_list)
+            poi_metadata_list = select_updated_metadata(poi_metadata_list, watermarks)
+            logging.info(f"Mode incrémental : {len(poi_metadata_list)} Pois nouveaux ou modifiés sur {total}.")
         redis_key = f"metadata_{uuid.uuid4()}"
-        redis_client.set(redis_key, json.dumps([PoiMetadata.to_dict(metadata) for metadata in poi_metadata_list]))
+        object_write(redis_key, [json_codec.dumps([PoiMetadata.to_dict(metadata) for metadata in poi_metadata_list])])
         return redis_key
 
+    @task(task_id="save_feed_validators", trigger_rule=TriggerRule.NONE_FAILED)
+    def save_feed_validators() -> None:
+        """
+        Enregistrement de l'ETag et du Last-Modified de l'archive traitée :
+        le prochain run ne la téléchargera et ne la traitera que si elle a changé
+        """
+        connection = connect_to_db_V2(host=POSTGRES_HOST,
+                port=POSTGRES_PORT,
+                user=POSTGRES_USER,
+                password=POSTGRES_PASSWORD,
+                dbname=POSTGRES_DATATOURISME_DB,)
+        store_archive_validators(connection, read_archive_validators(DOWNLOAD_PATH))
+        connection.close()
 
-    @task(task_id="get_all_poi_from_archive")
-    def get_all_poi_from_archive(metadata_redis_key: str) -> str:
+    @task(task_id="save_watermarks", trigger_rule=TriggerRule.NONE_FAILED)
+    def save_watermarks(metadata_redis_key: str) -> None:
         """
-        Récupération des Pois depuis l'archive datatourisme grace au metadata des Pois
+        Enregistrement des watermarks des Pois traités, utilisés par le mode incrémental du run suivant
 
         :param: 
             metadata_redis_key: str - clé redis des metadata
-
-        :return: 
-            str - clé redis
-        """
-        redis_client = get_redis_client()
-        metadata_data = json.loads(redis_client.get(metadata_redis_key))
-        poi_metadata_objects = [PoiMetadata.from_dict(item) for item in metadata_data]
-        pois = parse_poi_batch(ZIP_PATH, poi_metadata_objects)
-        redis_key = f"pois_{uuid.uuid4()}"
-        redis_client.set(redis_key, json.dumps([Poi.to_dict(poi) for poi in pois]))
-        return redis_key
-        
-
-    @task(task_id="download_shape")
-    def download_shape(**kwargs) -> None:
-        """
-        Téléchargment de la forme de la France
         """
-        task_instance = kwargs['ti']
-        path_shape_file, path_to_delete = download_and_get_shapefile()
-        task_instance.xcom_push(key="path_shape_file", value=path_shape_file)
-        task_instance.xcom_push(key="path_to_delete", value=path_to_delete)
-
+        metadata_data = json_codec.loads(read_temporary_bytes(metadata_redis_key))
+        connection = connect_to_db_V2(host=POSTGRES_HOST,
+                port=POSTGRES_PORT,
+                user=POSTGRES_USER,
+                password=POSTGRES_PASSWORD,
+                dbname=POSTGRES_DATATOURISME_DB,)
+        create_poi_watermark_table(connection)
+        save_poi_watermarks(connection, (PoiMetadata.from_dict(item) for item in metadata_data))
+        connection.close()
 
     @task(task_id="get_france_poi")
-    def get_france_poi(pois_redis_key: str, **kwargs) -> str:
+    def get_france_poi(metadata_redis_key: str, **kwargs) -> str:
         """
         Récupération des Pois présent en France uniquement
+        Les Pois sont lus depuis l'archive et filtrés par lots de POI_CHUNK_SIZE :
+        seuls les Pois situés en France sont conservés en mémoire
 
         :param: 
-            urls: pois_redis_key: str - clé redis des pois
+            metadata_redis_key: str - clé redis des metadata
 
         :return: 
             str - clé redis des Pois en France
         """
-        task_instance = kwargs['ti']
-        path_shape_file = task_instance.xcom_pull(task_ids="download_shape", key="path_shape_file")
-        shape_geometry = get_france_geometry(path_shape_file)
-        redis_client = get_redis_client()
-        pois = json.loads(redis_client.get(pois_redis_key))
-        pois = [Poi.from_dict(poi) for poi in pois]
-        pois = filter_poi_in_france(pois, shape_geometry)
+        # Les régions, départements, villes et catégories internés ne sont conservés que le temps d'un run
+        geography_registry.clear()
+        shape_geometry = load_france_boundary()
+        metadata_data = json_codec.loads(read_temporary_bytes(metadata_redis_key))
+        poi_metadata_objects = (PoiMetadata.from_dict(item) for item in metadata_data)
+        pois = PoiTable.concat(
+            filter_poi_in_france(PoiTable.from_pois(batch), shape_geometry)
+            for batch in iter_poi_batches(ZIP_PATH, poi_metadata_objects, batch_size=POI_CHUNK_SIZE)
+        )
         redis_key = f"pois_{uuid.uuid4()}"
-        redis_client.set(redis_key, json.dumps([Poi.to_dict(poi) for poi in pois]))
+        object_write(redis_key, [pois.to_bytes()])
         return redis_key
 
     @task(task_id="check_all_tables_available", trigger_rule=TriggerRule.ONE_SUCCESS, retries=3, retry_delay=datetime.timedelta(seconds=10))
     def check_all_tables_available():
         """
-        Vérifications si toutes les tables sont présentes dans la base de donnée datatourisme
+        Vérifications si toutes les tables sont présentes dans la base de donnée datatourisme,
+        puis application des migrations du schéma
         """
         try:
             connection = psycopg2.connect(
@@ -316,12 +367,16 @@ with DAG(
                     missing_tables.append(table)
 
             cursor.close()
-            connection.close()
 
             if missing_tables:
+                connection.close()
                 logging.error(f"Les tables suivantes sont manquantes : {', '.join(missing_tables)}")
                 raise ValueError(f"Les tables suivantes sont manquantes : {', '.join(missing_tables)}")
 
+            # Migrations pas encore appliquées aux tables existantes (empreinte du contenu des Pois, index...)
+            migrate_database(connection)
+            connection.close()
+
             logging.info("Toutes les tables sont disponibles.")
             return True
 
@@ -330,22 +385,26 @@ with DAG(
             raise
 
     @task(task_id="get_all_poi_from_db")
-    def get_all_poi_from_db() -> str:
+    def get_all_poi_from_db() -> str | None:
         """
         Récupération de tous les Pois depuis la base de donnée datatourisme
+        Inutile en mode comparaison en base
 
         :return: 
-            str - clé redis des Pois dans la base de donnée
+            str - clé redis des Pois dans la base de donnée, None en mode comparaison en base
         """
+        if DIFF_IN_DATABASE:
+            return None
         engine = connect_to_db_V2(host=POSTGRES_HOST,
                 port=POSTGRES_PORT,
                 user=POSTGRES_USER,
                 password=POSTGRES_PASSWORD,
                 dbname=POSTGRES_DATATOURISME_DB,)
-        db_pois = get_all_pois_from_db(engine)
-        redis_client = get_redis_client()
+        # Les POIs sont lus par lots avec un curseur côté serveur et encodés au fil de l'eau
+        db_pois = PoiTable.from_pois(iter_pois_from_db(engine))
+        engine.close()
         redis_key = f"pois_{uuid.uuid4()}"
-        redis_client.set(redis_key, json.dumps([Poi.to_dict(poi) for poi in db_pois]))
+        object_write(redis_key, [db_pois.to_bytes()])
         return redis_key
 
     @task(task_id="compare_archive_pois_with_db")
@@ -355,51 +414,52 @@ with DAG(
 
         :param: 
             pois_redis_key: str - clé redis des Pois de l'archive
-            db_pois_redis_key: str - clé redis des Pois dans la base de donnée
+            db_pois_redis_key: str - clé redis des Pois dans la base de donnée (None en mode comparaison en base)
         """
         task_instance = kwargs['ti']
-        redis_client = get_redis_client()
         
         # Récupérer les POIs depuis Redis
-        pois_data = redis_client.get(pois_redis_key)
+        pois_data = read_temporary_bytes(pois_redis_key)
         if not pois_data:
             logging.error(f"Erreur : Les données pour {pois_redis_key} sont vides ou inexistantes.")
             return
 
         try:
-            pois = json.loads(pois_data)
-            pois = [Poi.from_dict(poi) for poi in pois]
-        except json.JSONDecodeError as e:
+            pois = PoiTable.from_bytes(pois_data)
+        except pa.ArrowInvalid as e:
             logging.error(f"Erreur lors de la désérialisation des POIs depuis Redis pour {pois_redis_key}: {str(e)}")
             return
 
-        # Récupérer les POIs de la base de données depuis Redis
-        db_pois_data = redis_client.get(db_pois_redis_key)
-        if not db_pois_data:
-            logging.error(f"Erreur : Les données pour {db_pois_redis_key} sont vides ou inexistantes.")
-            return
+        if DIFF_IN_DATABASE:
+            # Comparer les POIs de l'archive avec la table Point_Of_Interest, dans la base
+            connection = connect_to_db_V2(host=POSTGRES_HOST,
+                    port=POSTGRES_PORT,
+                    user=POSTGRES_USER,
+                    password=POSTGRES_PASSWORD,
+                    dbname=POSTGRES_DATATOURISME_DB,)
+            pois_to_create, pois_to_update = compare_pois_in_db(connection, pois)
+            connection.close()
+        else:
+            # Récupérer les POIs de la base de données depuis Redis
+            db_pois_data = read_temporary_bytes(db_pois_redis_key)
+            if not db_pois_data:
+                logging.error(f"Erreur : Les données pour {db_pois_redis_key} sont vides ou inexistantes.")
+                return
 
-        try:
-            db_pois = json.loads(db_pois_data)
-            
-            # Vérifier si les données sont sous forme de liste, sinon loguer l'erreur
-            if not isinstance(db_pois, list):
-                logging.error(f"Erreur : Les données pour {db_pois_redis_key} ne sont pas une liste valide.")
+            try:
+                db_pois = PoiTable.from_bytes(db_pois_data)
+            except pa.ArrowInvalid as e:
+                logging.error(f"Erreur lors de la désérialisation des POIs de la base de données : {str(e)}")
                 return
-            
-            db_pois = [Poi.from_dict(poi) for poi in db_pois]
-        except json.JSONDecodeError as e:
-            logging.error(f"Erreur lors de la désérialisation des POIs de la base de données : {str(e)}")
-            return
 
-        # Comparer les POIs de la base de données avec les POIs de l'archive
-        pois_to_create, pois_to_update = compare_pois(db_pois, pois)
+            # Comparer les POIs de la base de données avec les POIs de l'archive
+            pois_to_create, pois_to_update = compare_pois(db_pois, pois)
         # Enregistrer les POIs à créer et à mettre à jour dans Redis
         redis_key_pois_to_create = f"pois_{uuid.uuid4()}"
-        redis_client.set(redis_key_pois_to_create, json.dumps([Poi.to_dict(poi) for poi in pois_to_create]))
+        object_write(redis_key_pois_to_create, [pois_to_create.to_bytes()])
 
         redis_key_pois_to_update = f"pois_{uuid.uuid4()}"
-        redis_client.set(redis_key_pois_to_update, json.dumps([Poi.to_dict(poi) for poi in pois_to_update]))
+        object_write(redis_key_pois_to_update, [pois_to_update.to_bytes()])
 
         # Sauvegarder les clés dans XCom pour le traitement suivant
         task_instance.xcom_push(key="pois_to_create_key", value=redis_key_pois_to_create)
@@ -424,35 +484,36 @@ with DAG(
         else:
             redis_key = task_instance.xcom_pull(task_ids="compare_archive_pois_with_db", key="pois_to_update_key")
         batch_keys = []
-        redis_client = get_redis_client()
-        redis_data = redis_client.get(redis_key)
+        redis_data = read_temporary_bytes(redis_key)
         if not redis_data:
             logging.info(f"Aucun POI à {action} pour la clé Redis {redis_key}.")
             return batch_keys
-        pois = json.loads(redis_client.get(redis_key))
-        pois = [Poi.from_dict(poi) for poi in pois]
-        batches = [pois[i:i + batch_size] for i in range(0, len(pois), batch_size)]
+        pois = PoiTable.from_bytes(redis_data)
+        batches = (pois[i:i + batch_size] for i in range(0, len(pois), batch_size))
         
         
 
         for batch in batches:
             batch_key = f"batch_{uuid.uuid4()}"
-            redis_client.set(batch_key, json.dumps([Poi.to_dict(poi) for poi in batch]))
+            object_write(batch_key, [batch.to_bytes()])
             batch_keys.append(batch_key)
 
         return batch_keys
     
     @task(task_id="process_neo4j")
-    def process_neo4j(redis_key_pois: str) -> None:
+    def process_neo4j(**kwargs) -> None:
         """
-        Enregistrement des Pois dans neo4j
-
-        :param: 
-            redis_key_pois: str - clé redis de Pois
+        Enregistrement dans neo4j des Pois à créer et à mettre à jour :
+        les Pois dont le contenu n'a pas changé ne sont pas réimportés
         """
-        redis_client = get_redis_client()
-        pois = json.loads(redis_client.get(redis_key_pois))
-        pois = [Poi.from_dict(poi) for poi in pois]
+        task_instance = kwargs['ti']
+        pois = PoiTable.concat(
+            PoiTable.from_bytes(read_temporary_bytes(task_instance.xcom_pull(task_ids="compare_archive_pois_with_db", key=key)))
+            for key in ("pois_to_create_key", "pois_to_update_key")
+        )
+        if not len(pois):
+            logging.info("Aucun POI à importer dans neo4j.")
+            return
         driver = neo4j.GraphDatabase.driver(
             NEO4J_URL,
             auth=(NEO4J_USER, NEO4J_PASSWORD)
@@ -473,11 +534,9 @@ with DAG(
         batch_key = action_dict["batch_key"]
         action = action_dict["action"]
 
-        redis_client = get_redis_client()
         try:
             # Récupérer les données du batch depuis Redis
-            pois = json.loads(redis_client.get(batch_key))
-            pois = [Poi.from_dict(poi) for poi in pois]
+            pois = PoiTable.from_bytes(read_temporary_bytes(batch_key))
 
             # Appeler la fonction process_batch avec les POIs et l'action
             process_batch(
@@ -488,6 +547,8 @@ with DAG(
                 password=POSTGRES_PASSWORD,
                 host=POSTGRES_HOST,
                 port=POSTGRES_PORT,
+                cache=dimension_cache,
+                workers=BATCH_WRITE_WORKERS,
             )
             logging.info(f"Batch {batch_key} traité avec succès (action : {action}).")
 
@@ -496,43 +557,38 @@ with DAG(
             raise
 
     @task(task_id="cleanup_data", trigger_rule=TriggerRule.ALL_DONE)
-    def cleanup_data(metadata_redis_key: str, pois_redis_key: str, pois_in_france_redis_key: str, pois_db_redis_key: str, create_keys: List[str], update_keys: List[str], **kwargs) -> None:
+    def cleanup_data(metadata_redis_key: str, pois_in_france_redis_key: str, pois_db_redis_key: str, create_keys: List[str], update_keys: List[str], **kwargs) -> None:
         """
         Néttoyage des données
 
         :param: 
             metadata_redis_key: str - La clé redis des metadata
-            pois_redis_key: str - La clé redis des Pois
+            pois_in_france_redis_key: str - La clé redis des Pois en France
             pois_db_redis_key: str - La clé redis des Pois de la base de donnée
             create_keys: List[str] - La liste des clés redis des batch de création
             update_keys: List[str] - La liste des clés redis des batch de modification
         """
         task_instance = kwargs['ti']
-        path_to_delete = task_instance.xcom_pull(task_ids="download_shape", key="path_to_delete")
         pois_to_create_key = task_instance.xcom_pull(task_ids="compare_archive_pois_with_db", key="pois_to_create_key")
         pois_to_update_key = task_instance.xcom_pull(task_ids="compare_archive_pois_with_db", key="pois_to_update_key")
-        redis_client = get_redis_client()
         if pois_to_create_key:
-            redis_client.delete(pois_to_create_key)
+            object_delete(pois_to_create_key)
         if pois_to_update_key:
-            redis_client.delete(pois_to_update_key)
+            object_delete(pois_to_update_key)
         if metadata_redis_key:
-            redis_client.delete(metadata_redis_key)
-        if pois_redis_key:
-            redis_client.delete(pois_redis_key)
-            pois_in_france_redis_key
+            object_delete(metadata_redis_key)
         if pois_in_france_redis_key:
-            redis_client.delete(pois_in_france_redis_key)
+            object_delete(pois_in_france_redis_key)
         if pois_db_redis_key:
-            redis_client.delete(pois_db_redis_key)
+            object_delete(pois_db_redis_key)
         if create_keys:
             for key in create_keys:
-                redis_client.delete(key)
+                object_delete(key)
         if update_keys:
             for key in update_keys:
-                redis_client.delete(key)
-        if path_to_delete:
-            cleanup_downloaded_data(path_to_delete)
+                object_delete(key)
+        # Fichiers de débordement dont l'objet a expiré, laissés par des runs interrompus
+        object_cleanup()
         cleanup_downloaded_data(DOWNLOAD_PATH)
 
     @task(task_id="prepare_action_list")
@@ -560,21 +616,21 @@ with DAG(
     download_archive_task = download_archive()
     get_all_poi_metadata_from_archive_task = get_all_poi_metadata_from_archive()
     get_all_poi_from_db_task = get_all_poi_from_db()
-    get_all_poi_from_archive_task = get_all_poi_from_archive(get_all_poi_metadata_from_archive_task)
-    download_shape_task = download_shape()
-    get_france_poi_task = get_france_poi(get_all_poi_from_archive_task)
+    get_france_poi_task = get_france_poi(get_all_poi_metadata_from_archive_task)
     compare_archive_pois_with_db_task = compare_archive_pois_with_db(get_france_poi_task, get_all_poi_from_db_task)
     create_batches_task = create_batches("insert")
     update_batches_task = create_batches("update")
     create_action_list = prepare_action_list(create_batches_task, "insert")
     update_action_list = prepare_action_list(update_batches_task, "update")
     check_all_tables_available_task = check_all_tables_available()
-    process_neo4j_task = process_neo4j(get_france_poi_task)
+    process_neo4j_task = process_neo4j()
+    save_watermarks_task = save_watermarks(get_all_poi_metadata_from_archive_task)
+    save_feed_validators_task = save_feed_validators()
     # Utilisation de la tâche `expand`
     create_process_batches = process_batch_task.expand(action_dict=create_action_list)
     update_process_batches = process_batch_task.expand(action_dict=update_action_list)
 
-    cleanup_data_task = cleanup_data(get_all_poi_metadata_from_archive_task, get_all_poi_from_archive_task, get_france_poi_task, get_all_poi_from_db_task, create_batches_task, update_batches_task)
+    cleanup_data_task = cleanup_data(get_all_poi_metadata_from_archive_task, get_france_poi_task, get_all_poi_from_db_task, create_batches_task, update_batches_task)
 
     # Dépendances
     postgres_ready >> database_exists >> decide_database_creation_task
@@ -586,12 +642,12 @@ with DAG(
     table_decision >> check_all_tables_available_task
     check_all_tables_available_task >> get_all_poi_from_db_task
 
-    download_archive_task >> get_all_poi_metadata_from_archive_task
-    get_all_poi_metadata_from_archive_task >> get_all_poi_from_archive_task
-    get_all_poi_from_archive_task >> download_shape_task
-    download_shape_task >> get_france_poi_task
+    # La table des validateurs de l'archive est créée par les migrations
+    check_all_tables_available_task >> download_archive_task >> get_all_poi_metadata_from_archive_task
+    get_all_poi_metadata_from_archive_task >> get_france_poi_task
     
-    get_france_poi_task >> [compare_archive_pois_with_db_task, process_neo4j_task]
+    get_france_poi_task >> compare_archive_pois_with_db_task
+    compare_archive_pois_with_db_task >> process_neo4j_task
     get_all_poi_from_db_task >> compare_archive_pois_with_db_task
 
     [get_france_poi_task, get_all_poi_from_db_task] >> compare_archive_pois_with_db_task
@@ -599,6 +655,6 @@ with DAG(
     compare_archive_pois_with_db_task >> create_batches_task >> create_process_batches >> cleanup_data_task
     compare_archive_pois_with_db_task >> update_batches_task >> update_process_batches >> cleanup_data_task
     process_neo4j_task >> cleanup_data_task
-    [create_process_batches, update_process_batches, process_neo4j_task] >> cleanup_data_task
+    [create_process_batches, update_process_batches, process_neo4j_task] >> save_watermarks_task >> save_feed_validators_task >> cleanup_data_task
 
     cleanup_data_task >> create_cluster_tasks()
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 import pandas as pd
 from airflow.decorators import task, task_group
 from parts.helpers import inject_vars_into_env
-from utils import connect_to_db_from_env, select_pois_from_db, GeoClustering, GeoRouting, connect_to_neo4j, \
+from utils import connect_to_db_from_env, iter_poi_rows_from_db, GeoClustering, GeoRouting, connect_to_neo4j, \
   import_clusters, import_routes
 
 
@@ -67,10 +67,10 @@ cluster_definitions = [
 def create_cluster(definition: ClusterDefinition):
   os.environ['POSTGRES_DB'] = os.environ['POSTGRES_DATATOURISME_DB']
   with connect_to_db_from_env() as pg_conn:
-    pois = select_pois_from_db(pg_conn, definition.category)
-    print(f'Extracted {len(pois)} POIs for category {definition.category}')
-    pois_data = [{'id': poi.id, 'lat': poi.latitude, 'lon': poi.longitude} for poi in pois]
-    df_pois = pd.DataFrame(pois_data)
+    # Coordonnées Lambert-93 enregistrées à l'ingestion, recalculées par GeoClustering si absentes
+    rows = iter_poi_rows_from_db(pg_conn, ('dt_poi_id', 'latitude', 'longitude', 'x', 'y'), category=definition.category)
+    df_pois = pd.DataFrame.from_records(rows, columns=['id', 'lat', 'lon', 'x', 'y'])
+    print(f'Extracted {len(df_pois)} POIs for category {definition.category}')
     clustering = GeoClustering(df_pois)
     clustering.create_clusters(min_cluster_size=definition.min_cluster_size)
     clustering.increase_clusters(threshold_in_meters=definition.expand_threshold)
@@ -8,8 +8,9 @@ from pyproj import Transformer
 data_folder = '../../../datatourisme/metropole'
 data = []
 n = 0
-# EPSG:2154 is the EPSG code for the RGF93 / Lambert-93 projection used in France
-transformer = Transformer.from_crs("EPSG:4326", "EPSG:2154", always_xy=True)
+# EPSG:9794 is the EPSG code for the RGF93 v2b / Lambert-93 projection used in France,
+# the same as the x/y columns stored in PostgreSQL and used by utils.geo_clustering
+transformer = Transformer.from_crs("EPSG:4326", "EPSG:9794", always_xy=True)
 
 
 with open(os.path.join(data_folder, 'index.json'), 'r') as file:
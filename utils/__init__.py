@@ -1,36 +1,62 @@
-from .downloader import check_file_exists, download_datatourisme_archive, extract_data, download_datatourisme_categories, download_and_get_shapefile, cleanup_downloaded_data
-from .database_helper import connect_to_db, show_tables, save_dataframe_to_postgres, parse_index_datatourisme, collect_region_information_from_files, collect_department_information_from_files, collect_city_information_from_files, collect_all_categories, connect_to_db_V2, connect_to_db_from_env, get_all_pois_from_db, select_pois_from_db, add_poi_to_db, update_poi_in_db, process_batch
+from .downloader import check_file_exists, DownloadStatus, download_datatourisme_archive, check_archive_integrity, read_archive_validators, save_archive_validators, extract_data, download_datatourisme_categories, cleanup_downloaded_data
+from .database_helper import connect_to_db, show_tables, save_dataframe_to_postgres, copy_dataframe_rows, parse_index_datatourisme, collect_region_information_from_files, collect_department_information_from_files, collect_city_information_from_files, collect_all_categories, collect_all_information_from_files, connect_to_db_V2, connect_to_db_from_env, get_all_pois_from_db, select_pois_from_db, iter_pois_from_db, iter_poi_rows_from_db, diff_pois_in_db, compare_pois_in_db, add_poi_to_db, add_pois_to_db, DimensionCache, dimension_cache, update_poi_in_db, update_pois_in_db, write_pois_parallel, process_batch, schema_migrations, migrate_database, query_plan_indexes, create_poi_watermark_table, get_poi_watermarks, save_poi_watermarks, get_archive_validators, store_archive_validators
+from .france_boundary import build_france_boundary, load_france_boundary
 from .geo_clustering import compute_xy, GeoClustering
 from .geo_routing import GeoRouting
-from .json_helper_functions import get_poi_identifier, get_poi_name, get_poi_creation_date, get_poi_update_date, find_last_update_by_label, get_poi_category, category_cleanup, get_poi_region, get_poi_department, get_poi_city, get_poi_postal_code, get_poi_coordinates, parse_poi_from_json, get_all_poi, get_all_poi_metadata, get_france_geometry, filter_poi_in_france, parse_poi_batch, get_all_poi_parallel
+from .json_helper_functions import PoiRecord, get_poi_record, get_poi_identifier, get_poi_name, get_poi_creation_date, get_poi_update_date, find_last_update_by_label, get_poi_category, category_cleanup, get_poi_region, get_poi_department, get_poi_city, get_poi_postal_code, get_poi_coordinates, parse_poi_from_json, iter_pois, iter_poi_batches, get_all_poi, get_all_poi_metadata, france_mask, poi_in_france_mask, filter_poi_in_france, parse_poi_batch, iter_poi_batches_parallel, get_all_poi_parallel
 from .neo4j_helper import connect_to_neo4j, import_pois, import_clusters, import_routes
-from .point_of_interest_helper import Poi, PoiMetadata, Category, City, Departement, Region, compare_pois
-from .temporary_objects import object_store, object_read, object_delete
+from .point_of_interest_helper import Poi, PoiTable, GeographyRegistry, geography_registry, PoiMetadata, Category, City, Departement, Region, poi_content_hash, lambert93_xy, poi_xy, compare_pois, compare_poi_tables, select_updated_metadata
+from .temporary_objects import object_store, object_read, object_delete, object_write, object_stream, object_cleanup, object_read_table
 
 # Liste des éléments accessibles via `from utils import *`
 __all__ = [
     "check_file_exists",
+    "DownloadStatus",
     "download_datatourisme_archive",
+    "check_archive_integrity",
+    "read_archive_validators",
+    "save_archive_validators",
     "extract_data",
     "download_datatourisme_categories",
     "connect_to_db",
     "show_tables",
     "save_dataframe_to_postgres",
+    "copy_dataframe_rows",
     "parse_index_datatourisme",
     "collect_region_information_from_files",
     "collect_department_information_from_files",
     "collect_city_information_from_files",
     "collect_all_categories",
+    "collect_all_information_from_files",
     "connect_to_db_V2",
     "connect_to_db_from_env",
     "get_all_pois_from_db",
     "select_pois_from_db",
+    "iter_pois_from_db",
+    "iter_poi_rows_from_db",
+    "diff_pois_in_db",
+    "compare_pois_in_db",
     "add_poi_to_db",
+    "add_pois_to_db",
+    "DimensionCache",
+    "dimension_cache",
     "update_poi_in_db",
+    "update_pois_in_db",
+    "write_pois_parallel",
     "process_batch",
+    "schema_migrations",
+    "migrate_database",
+    "query_plan_indexes",
+    "create_poi_watermark_table",
+    "get_poi_watermarks",
+    "save_poi_watermarks",
+    "get_archive_validators",
+    "store_archive_validators",
     "compute_xy",
     "GeoClustering",
     "GeoRouting",
+    "PoiRecord",
+    "get_poi_record",
     "get_poi_identifier",
     "get_poi_name",
     "get_poi_creation_date",
@@ -44,26 +70,43 @@ __all__ = [
     "get_poi_postal_code",
     "get_poi_coordinates",
     "parse_poi_from_json",
+    "iter_pois",
+    "iter_poi_batches",
     "get_all_poi",
     "get_all_poi_metadata",
-    "get_france_geometry",
+    "build_france_boundary",
+    "load_france_boundary",
+    "france_mask",
+    "poi_in_france_mask",
     "filter_poi_in_france",
     "parse_poi_batch", 
+    "iter_poi_batches_parallel",
     "get_all_poi_parallel",
     "connect_to_neo4j",
     "import_pois",
     "import_clusters", 
     "import_routes",
-    "download_and_get_shapefile",
     "cleanup_downloaded_data",
     "Poi",
+    "PoiTable",
+    "GeographyRegistry",
+    "geography_registry",
     "PoiMetadata",
     "Category", 
     "City", 
     "Departement", 
     "Region",
     "compare_pois",
+    "compare_poi_tables",
+    "poi_content_hash",
+    "lambert93_xy",
+    "poi_xy",
+    "select_updated_metadata",
     "object_store",
     "object_read",
     "object_delete",
+    "object_write",
+    "object_stream",
+    "object_cleanup",
+    "object_read_table",
 ]
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Benchmark du débit de parsing d'une archive DataTourisme pour chaque backend JSON disponible.
+
+Usage (depuis la racine du dépôt) :
+  python -m utils.benchmarks.json_backends [nombre_de_pois]
+"""
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from utils import json_codec
+from utils.json_helper_functions import get_all_poi_metadata, iter_pois
+from utils.benchmarks.synthetic import make_synthetic_archive
+
+
+def read_objects(zip_path: str) -> list[bytes]:
+  """
+  Lit (et décompresse) le contenu brut de tous les fichiers objets de l'archive
+  """
+  with zipfile.ZipFile(zip_path, "r") as zip_ref:
+    return [zip_ref.read(name) for name in zip_ref.namelist() if name.startswith("objects/")]
+
+
+def bench_decode(contents: list[bytes], loads) -> float:
+  """
+  Décode tous les contenus JSON
+  :return: durée en secondes
+  """
+  start = time.perf_counter()
+  for data in contents:
+    loads(data)
+  return time.perf_counter() - start
+
+
+def bench_parse(zip_path: str) -> tuple[int, float]:
+  """
+  Parse toutes les POIs de l'archive avec `iter_pois` et le backend sélectionné
+  :return: (nombre de POIs, durée en secondes)
+  """
+  metadata = get_all_poi_metadata(zip_path)
+  start = time.perf_counter()
+  count = sum(1 for _ in iter_pois(zip_path, metadata))
+  return count, time.perf_counter() - start
+
+
+def main(count: int):
+  with tempfile.TemporaryDirectory() as temp_dir:
+    zip_path = make_synthetic_archive(os.path.join(temp_dir, "archive.zip"), count)
+    contents = read_objects(zip_path)
+    size = sum(len(data) for data in contents)
+    print(f"Archive synthétique : {count} POIs, {size / 1e6:.1f} Mo de JSON")
+    results = []
+    for name in json_codec.backends:
+      json_codec.select_backend(name)
+      decode_duration = bench_decode(contents, json_codec.loads)
+      parsed, parse_duration = bench_parse(zip_path)
+      results.append((name, len(contents) / decode_duration, size / decode_duration / 1e6, parsed / parse_duration))
+    json_codec.select_backend()
+  print(f"{'backend':<10}{'décodage seul':>26}{'iter_pois (zip + parsing)':>28}")
+  for name, files_per_second, mb_per_second, pois_per_second in results:
+    print(f"{name:<10}{files_per_second:>10.0f} f/s {mb_per_second:>8.1f} Mo/s{pois_per_second:>22.0f} POI/s")
+
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
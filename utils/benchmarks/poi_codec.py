@@ -0,0 +1,46 @@
+"""
+Benchmark de la sérialisation des POIs échangés entre les tâches du DAG via Redis :
+- JSON : `Poi.to_dict` → `json_codec.dumps` puis `json_codec.loads` → `Poi.from_dict` ;
+- Arrow IPC : `PoiTable.to_bytes` puis `PoiTable.from_bytes`.
+
+Usage (depuis la racine du dépôt) :
+  python -m utils.benchmarks.poi_codec [nombre_de_pois]
+"""
+import sys
+import time
+from utils import json_codec
+from utils.point_of_interest_helper import Poi, PoiTable
+from utils.benchmarks.synthetic import synthetic_pois
+
+
+def timed(function, *args) -> tuple[object, float]:
+  start = time.perf_counter()
+  result = function(*args)
+  return result, time.perf_counter() - start
+
+
+def json_encode(pois: list[Poi]) -> bytes:
+  return json_codec.dumps([Poi.to_dict(poi) for poi in pois])
+
+
+def json_decode(data: bytes) -> list[Poi]:
+  return [Poi.from_dict(poi) for poi in json_codec.loads(data)]
+
+
+def main(count: int):
+  pois = list(synthetic_pois(count))
+  table = PoiTable.from_pois(pois)
+  print(f"{count} POIs synthétiques, backend JSON : {json_codec.select_backend()}")
+  print(f"{'format':<28}{'taille':>12}{'encodage':>12}{'décodage':>12}")
+
+  data, encode_duration = timed(json_encode, pois)
+  _, decode_duration = timed(json_decode, data)
+  print(f"{'JSON (list[Poi])':<28}{len(data) / 1e6:>9.1f} Mo{encode_duration:>10.2f} s{decode_duration:>10.2f} s")
+
+  data, encode_duration = timed(PoiTable.to_bytes, table)
+  _, decode_duration = timed(PoiTable.from_bytes, data)
+  print(f"{'Arrow IPC (PoiTable)':<28}{len(data) / 1e6:>9.1f} Mo{encode_duration:>10.2f} s{decode_duration:>10.2f} s")
+
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,98 @@
+"""
+Benchmark de l'insertion puis de la mise à jour des POIs dans PostgreSQL (tâche `process_batch_task` du DAG) :
+- `add_poi_to_db` et `update_poi_in_db` POI par POI : plusieurs requêtes et une transaction par POI ;
+- `add_pois_to_db` et `update_pois_in_db` : chargement par COPY dans des tables temporaires puis quelques
+  requêtes ensemblistes, en une seule transaction par lot ;
+- `write_pois_parallel` : les mêmes écritures, chaque lot étant découpé en sous-lots écrits en parallèle
+  par plusieurs threads et connexions d'un pool.
+
+Chaque méthode insère puis met à jour les mêmes POIs, en partant de tables vides créées par `database_create.sql` dans un schéma temporaire
+`benchmark_poi_insert` supprimé à la fin. Nécessite un serveur PostgreSQL local
+(variables d'environnement POSTGRES_HOST, POSTGRES_PORT, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_DB).
+
+Usage (depuis la racine du dépôt) :
+  python -m utils.benchmarks.poi_insert [nombre_de_pois] [taille_des_lots] [nombre_de_threads]
+"""
+import os
+import sys
+import time
+from psycopg2.pool import ThreadedConnectionPool
+from utils.database_helper import connect_to_db_from_env, add_poi_to_db, add_pois_to_db, update_poi_in_db, update_pois_in_db, write_pois_parallel
+from utils.point_of_interest_helper import PoiTable
+from utils.benchmarks.synthetic import synthetic_pois
+
+schema = "benchmark_poi_insert"
+create_script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database_create.sql")
+
+
+def reset_schema(conn):
+  with open(create_script_path, "r") as file:
+    create_script = file.read()
+  with conn.cursor() as cursor:
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {schema}")
+    cursor.execute(f"SET search_path TO {schema}")
+    cursor.execute(create_script)
+  conn.commit()
+
+
+def drop_schema(conn):
+  with conn.cursor() as cursor:
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+  conn.commit()
+
+
+def row_at_a_time(write_poi):
+  def write(conn, table: PoiTable, batch_size: int):
+    for poi in table:
+      write_poi(conn, poi)
+  return write
+
+
+def bulk(write_pois):
+  def write(conn, table: PoiTable, batch_size: int):
+    for start in range(0, len(table), batch_size):
+      write_pois(conn, table[start:start + batch_size])
+  return write
+
+
+def parallel(pool: ThreadedConnectionPool, type: str, workers: int):
+  def write(conn, table: PoiTable, batch_size: int):
+    for start in range(0, len(table), batch_size):
+      write_pois_parallel(pool, table[start:start + batch_size], type, workers=workers)
+  return write
+
+
+def timed(conn, write, table: PoiTable, batch_size: int) -> float:
+  start = time.perf_counter()
+  write(conn, table, batch_size)
+  return time.perf_counter() - start
+
+
+def main(count: int, batch_size: int, workers: int):
+  table = PoiTable.from_pois(synthetic_pois(count))
+  conn = connect_to_db_from_env()
+  # Les connexions du pool utilisent le schéma du benchmark
+  pool = ThreadedConnectionPool(1, workers, dsn=conn.dsn, password=os.environ["POSTGRES_PASSWORD"],
+                                options=f"-c search_path={schema}")
+  print(f"{count} POIs synthétiques, lots de {batch_size} POIs, {workers} threads")
+  print(f"{'méthode':<32}{'durée':>10}{'POIs/s':>12}")
+  try:
+    for (insert_name, insert), (update_name, update) in [
+      (("add_poi_to_db (par POI)", row_at_a_time(add_poi_to_db)), ("update_poi_in_db (par POI)", row_at_a_time(update_poi_in_db))),
+      (("add_pois_to_db (COPY)", bulk(add_pois_to_db)), ("update_pois_in_db (COPY)", bulk(update_pois_in_db))),
+      (("write_pois_parallel (insert)", parallel(pool, "insert", workers)), ("write_pois_parallel (update)", parallel(pool, "update", workers))),
+    ]:
+      reset_schema(conn)
+      for name, write in [(insert_name, insert), (update_name, update)]:
+        duration = timed(conn, write, table, batch_size)
+        print(f"{name:<32}{duration:>8.2f} s{count / duration:>12.0f}")
+  finally:
+    pool.closeall()
+    drop_schema(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000, int(sys.argv[2]) if len(sys.argv) > 2 else 10000,
+       int(sys.argv[3]) if len(sys.argv) > 3 else 4)
@@ -0,0 +1,88 @@
+"""
+Benchmark de la mémoire occupée par un ensemble de POIs selon leur représentation :
+- liste de `Poi` dont chaque POI a ses propres objets City → Departement → Region et Category
+  (comportement avant l'internement) ;
+- liste de `Poi` issus de `parse_poi_from_json`, qui partagent les objets internés par `geography_registry` ;
+- `PoiTable` construite à partir de ces POIs.
+
+La taille mesurée est celle de tous les objets atteignables (chaînes, dates, objets géographiques...),
+chaque objet partagé n'étant compté qu'une fois. La durée de construction inclut la génération des POIs
+synthétiques pour les deux listes.
+
+Usage (depuis la racine du dépôt) :
+  python -m utils.benchmarks.poi_memory [nombre_de_pois]
+"""
+import gc
+import sys
+import time
+import types
+import numpy as np
+from utils.point_of_interest_helper import Poi, PoiTable, City, Departement, Region, Category, geography_registry
+from utils.benchmarks.synthetic import synthetic_pois
+
+
+def unshared_copy(poi: Poi) -> Poi:
+  """
+  Copie un POI avec une chaîne City → Departement → Region et des catégories qui lui sont propres
+  """
+  region = Region(name=poi.city.departement.region.name, id=poi.city.departement.region.id)
+  departement = Departement(name=poi.city.departement.name, id=poi.city.departement.id, region=region)
+  city = City(name=poi.city.name, id=poi.city.id, departement=departement)
+  return Poi(
+    id=poi.id, name=poi.name, rating=poi.rating, created_at=poi.created_at, updated_at=poi.updated_at,
+    latitude=poi.latitude, longitude=poi.longitude, postal_code=poi.postal_code, city=city,
+    categories=[Category(name=category.name, id=category.id) for category in poi.categories],
+    osm_node_id=poi.osm_node_id
+  )
+
+
+def deep_size(obj) -> int:
+  """
+  Taille en octets de tous les objets atteignables depuis `obj`, chaque objet partagé n'étant compté qu'une fois.
+  Les types, modules et fonctions ne sont pas comptés, les éléments des tableaux NumPy d'objets le sont.
+  """
+  seen = set()
+  size = 0
+  pending = [obj]
+  while pending:
+    current = pending.pop()
+    if id(current) in seen or isinstance(current, (type, types.ModuleType, types.FunctionType)) or current is None:
+      continue
+    seen.add(id(current))
+    size += sys.getsizeof(current)
+    pending.extend(gc.get_referents(current))
+    if isinstance(current, np.ndarray) and current.dtype == object:
+      # Les éléments d'un tableau NumPy d'objets ne sont pas exposés au ramasse-miettes
+      pending.extend(current.ravel())
+  return size
+
+
+def timed(build) -> tuple[object, float]:
+  start = time.perf_counter()
+  result = build()
+  return result, time.perf_counter() - start
+
+
+def main(count: int):
+  geography_registry.clear()
+  unshared, unshared_duration = timed(lambda: [unshared_copy(poi) for poi in synthetic_pois(count)])
+  unshared_size = deep_size(unshared)
+  del unshared
+  pois, interned_duration = timed(lambda: list(synthetic_pois(count)))
+  interned_size = deep_size(pois)
+  table, table_duration = timed(lambda: PoiTable.from_pois(pois))
+  del pois
+  table_size = deep_size(table)
+
+  print(f"{count} POIs synthétiques, {len(table.cities)} communes, {len(geography_registry)} objets internés")
+  print(f"{'représentation':<36}{'octets/POI':>12}{'total':>12}{'construction':>16}")
+  for name, size, duration in [
+    ("list[Poi] sans partage", unshared_size, unshared_duration),
+    ("list[Poi] internés (parsing)", interned_size, interned_duration),
+    ("PoiTable", table_size, table_duration),
+  ]:
+    print(f"{name:<36}{size / count:>12.0f}{size / 1e6:>9.1f} Mo{duration:>14.2f} s")
+
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
@@ -0,0 +1,121 @@
+"""
+Génération de données DataTourisme synthétiques pour les benchmarks.
+
+Les POIs générés reprennent la structure des fichiers d'exemple de `utils/tests/dt_feed_example`
+avec des identifiants, des coordonnées et des communes variés.
+"""
+import copy
+import json
+import os
+import random
+import zipfile
+from typing import Iterator
+from utils.json_helper_functions import parse_poi_from_json
+from utils.point_of_interest_helper import Poi
+
+example_data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tests", "dt_feed_example", "data")
+
+categories = [
+  ["CulturalSite", "PointOfInterest", "PlaceOfInterest", "Museum", "schema:Museum"],
+  ["CulturalEvent", "EntertainmentAndEvent", "PointOfInterest", "ShowEvent"],
+  ["SportsEvent", "EntertainmentAndEvent", "PointOfInterest"],
+  ["NaturalHeritage", "PointOfInterest", "PlaceOfInterest"],
+  ["Castle", "CulturalSite", "PointOfInterest", "PlaceOfInterest"],
+]
+
+
+def example_templates() -> list[dict]:
+  """
+  Charge les fichiers JSON d'exemple servant de modèles aux POIs synthétiques
+  :return: list[dict] - le contenu des fichiers d'exemple
+  """
+  with open(os.path.join(example_data_path, "index.json"), "r", encoding="utf-8") as file:
+    index = json.load(file)
+  templates = []
+  for item in index:
+    with open(os.path.join(example_data_path, "objects", item["file"]), "r", encoding="utf-8") as file:
+      templates.append(json.load(file))
+  return templates
+
+
+def synthetic_poi_json(i: int, n_cities: int = 2000, template: dict | None = None, rng: random.Random = random) -> dict:
+  """
+  Crée le contenu JSON d'un POI synthétique
+  :param i: int - numéro du POI, utilisé pour son identifiant
+  :param n_cities: int - nombre de communes distinctes parmi lesquelles la commune du POI est tirée
+  :param template: dict | None - fichier JSON d'exemple à compléter (par défaut un JSON minimal)
+  :param rng: random.Random - générateur aléatoire
+  :return: dict - le contenu JSON du POI
+  """
+  city = rng.randrange(n_cities)
+  departement = city % 96
+  region = departement % 13
+  content = copy.deepcopy(template) if template else {}
+  content.update({
+    "dc:identifier": f"SYN{i:012d}",
+    "rdfs:label": {"fr": [f"POI synthétique {i}"]},
+    "@type": categories[i % len(categories)],
+    "creationDate": "2024-01-01",
+    "lastUpdateDatatourisme": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T03:22:07.57Z",
+    "isLocatedAt": [{
+      "schema:geo": {
+        "schema:latitude": f"{rng.uniform(42.5, 50.9):.6f}",
+        "schema:longitude": f"{rng.uniform(-4.5, 7.9):.6f}",
+      },
+      "schema:address": [{
+        "schema:postalCode": f"{10000 + city:05d}",
+        "hasAddressCity": {
+          "@id": f"kb:{city}",
+          "rdfs:label": {"fr": [f"Commune {city}"]},
+          "isPartOfDepartment": {
+            "@id": f"kb:France{region}{departement:02d}",
+            "rdfs:label": {"fr": [f"Département {departement}"]},
+            "isPartOfRegion": {
+              "@id": f"kb:France{region}",
+              "rdfs:label": {"fr": [f"Région {region}"]},
+            },
+          },
+        },
+      }],
+    }],
+  })
+  return content
+
+
+def make_synthetic_archive(zip_path: str, count: int, n_cities: int = 2000, seed: int = 0) -> str:
+  """
+  Crée une archive ZIP au format du flux DataTourisme (index.json + objects/) avec des POIs synthétiques
+  :param zip_path: str - chemin de l'archive à créer
+  :param count: int - nombre de POIs
+  :param n_cities: int - nombre de communes distinctes
+  :param seed: int - graine du générateur aléatoire
+  :return: str - le chemin de l'archive
+  """
+  rng = random.Random(seed)
+  templates = example_templates()
+  index = []
+  with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zip_ref:
+    for i in range(count):
+      content = synthetic_poi_json(i, n_cities, templates[i % len(templates)], rng)
+      file_path = f"{i % 16:x}/{i % 256:02x}/{i}.json"
+      zip_ref.writestr(os.path.join("objects", file_path), json.dumps(content))
+      index.append({
+        "label": content["rdfs:label"]["fr"][0],
+        "lastUpdateDatatourisme": content["lastUpdateDatatourisme"],
+        "file": file_path,
+      })
+    zip_ref.writestr("index.json", json.dumps(index))
+  return zip_path
+
+
+def synthetic_pois(count: int, n_cities: int = 2000, seed: int = 0) -> Iterator[Poi]:
+  """
+  Génère des objets Poi synthétiques à partir de JSON minimaux
+  :param count: int - nombre de POIs
+  :param n_cities: int - nombre de communes distinctes
+  :param seed: int - graine du générateur aléatoire
+  :return: Iterator[Poi]
+  """
+  rng = random.Random(seed)
+  for i in range(count):
+    yield parse_poi_from_json(synthetic_poi_json(i, n_cities, rng=rng))
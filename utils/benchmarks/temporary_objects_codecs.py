@@ -0,0 +1,73 @@
+"""
+Benchmark des codecs de compression de `temporary_objects` : durée de `object_store` et de `object_read`
+et taille stockée, selon la taille des données, pour deux types de données échangées par le DAG :
+- une liste d'objets `Poi` ;
+- un DataFrame de POIs (identifiant, nom, catégorie, coordonnées), comme ceux de la clusterisation.
+
+Nécessite un serveur Redis (variables d'environnement REDIS_HOST, REDIS_PORT...).
+
+Usage (depuis la racine du dépôt) :
+  REDIS_HOST=localhost python -m utils.benchmarks.temporary_objects_codecs [nombre_de_pois ...]
+"""
+import sys
+import time
+import pandas as pd
+from utils.point_of_interest_helper import Poi
+from utils.temporary_objects import codecs, object_store, object_read, object_delete, _redis, _chunk_count, _chunk_key
+from utils.benchmarks.synthetic import synthetic_pois
+
+settings = [("none", None), ("gzip", 1), ("gzip", 6), ("gzip", 9), ("zlib", 1), ("lz4", 0), ("zstd", 1), ("zstd", 3)]
+
+
+def poi_dataframe(pois: list[Poi]) -> pd.DataFrame:
+  return pd.DataFrame({
+    "id": [poi.id for poi in pois],
+    "name": [poi.name for poi in pois],
+    "category": [poi.categories[0].name for poi in pois],
+    "latitude": [poi.latitude for poi in pois],
+    "longitude": [poi.longitude for poi in pois],
+  })
+
+
+def stored_size(name: str) -> int:
+  """
+  Nombre d'octets stockés dans redis pour un objet (tous ses morceaux)
+  """
+  client = _redis()
+  value = client.get(name)
+  count = _chunk_count(value)
+  if count is None:
+    return len(value)
+  return sum(client.strlen(_chunk_key(name, index)) for index in range(count))
+
+
+def bench(name: str, data, codec: str, level: int | None) -> tuple[int, float, float]:
+  """
+  :return: (taille stockée, durée d'écriture, durée de lecture)
+  """
+  start = time.perf_counter()
+  object_store(name, data, codec=codec, level=level)
+  store_duration = time.perf_counter() - start
+  start = time.perf_counter()
+  object_read(name)
+  read_duration = time.perf_counter() - start
+  size = stored_size(name)
+  object_delete(name)
+  return size, store_duration, read_duration
+
+
+def main(counts: list[int]):
+  print(f"{'données':<22}{'codec':<10}{'taille':>12}{'écriture':>12}{'lecture':>12}")
+  for count in counts:
+    pois = list(synthetic_pois(count))
+    for label, data in [(f"list[Poi] x{count}", pois), (f"DataFrame x{count}", poi_dataframe(pois))]:
+      for codec, level in settings:
+        if codec not in codecs:
+          continue
+        size, store_duration, read_duration = bench("benchmark_codecs", data, codec, level)
+        name = codec if level is None else f"{codec}:{level}"
+        print(f"{label:<22}{name:<10}{size / 1e6:>9.2f} Mo{store_duration * 1000:>9.0f} ms{read_duration * 1000:>9.0f} ms")
+
+
+if __name__ == "__main__":
+  main([int(count) for count in sys.argv[1:]] or [1000, 10000, 100000])
@@ -32,6 +32,9 @@ CREATE TABLE Point_Of_Interest (
     longitude FLOAT,
     postal_code VARCHAR(20),
     dt_city_id VARCHAR(255),
+    content_hash CHAR(32),
+    x INT,
+    y INT,
     FOREIGN KEY (dt_city_id) REFERENCES City(dt_city_id)
 );
 
@@ -49,3 +52,9 @@ CREATE TABLE Category_Point_Of_Interest (
     FOREIGN KEY (dt_poi_id) REFERENCES Point_Of_Interest(dt_poi_id),
     FOREIGN KEY (dt_category_id) REFERENCES Category(dt_category_id)
 );
+
+-- Create the Poi_Watermark table (incremental ingestion)
+CREATE TABLE Poi_Watermark (
+    file_path VARCHAR(255) PRIMARY KEY,
+    last_update VARCHAR(64) NOT NULL
+);
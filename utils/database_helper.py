@@ -1,17 +1,36 @@
 import fireducks.pandas as pd
 import json
+import logging
 import utils.json_helper_functions as helper
 import dotenv
 import os
 from sqlalchemy import create_engine, inspect
 from sqlalchemy.engine import Engine
-from typing import List
+from typing import List, Dict, Iterable, Iterator, Sequence, Tuple
+import io
+import uuid
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import psycopg2
-from .point_of_interest_helper import Poi
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from .point_of_interest_helper import Poi, PoiTable, PoiMetadata, lambert93_xy, poi_xy
 
 # Chargement des variables d'environnement
 dotenv.load_dotenv()
 
+# Colonnes de la table Point_Of_Interest, dans l'ordre de la table
+poi_columns = ("dt_poi_id", "osm_node_id", "name", "rating", "dt_created_at", "dt_updated_at",
+               "latitude", "longitude", "postal_code", "dt_city_id", "content_hash", "x", "y")
+# Nombre de lignes lues par aller-retour avec les curseurs côté serveur
+default_fetch_size = 10000
+# Nombre de lignes envoyées par commande COPY
+default_copy_size = 100000
+
 
 def connect_to_db() -> Engine:
     """
@@ -32,7 +51,8 @@ def show_tables(engine: create_engine) -> list:
     tables = db_inspection.get_table_names()
     return tables
 
-def save_dataframe_to_postgres(df: pd.DataFrame, table_name: str, engine: create_engine, if_exists: str='replace'):
+def save_dataframe_to_postgres(df: pd.DataFrame, table_name: str, engine: create_engine, if_exists: str='replace',
+                               method: str = None):
     """
     Sauvegarde un DataFrame pandas dans une table PostgreSQL.
 
@@ -42,8 +62,61 @@ def save_dataframe_to_postgres(df: pd.DataFrame, table_name: str, engine: create
     :param table_name: str - Le nom de la table dans laquelle sauvegarder le DataFrame
     :param engine:
     :param if_exists: str - L'action si la table existe {"fail", "replace", "append"}(default: "replace")
+    :param method: str - Méthode d'insertion des lignes : None (un INSERT par ligne), "multi" (INSERT multi-lignes)
+        ou "copy" (COPY ... FROM STDIN, voir `copy_dataframe_rows`, bien plus rapide pour les chargements en masse).
+        La création ou le remplacement de la table ne dépendent pas de la méthode.
+    """
+    if method == "copy":
+        method = copy_dataframe_rows
+    df.to_sql(table_name, engine, if_exists=if_exists, index=False, method=method)
+
+
+class _CopyStream:
+    """
+    Fichier en lecture seule qui produit au fil de l'eau les lignes au format texte de COPY :
+    seules les lignes nécessaires à chaque lecture de psycopg2 sont converties en mémoire.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._rows = iter(rows)
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        lines = [self._buffer]
+        length = len(self._buffer)
+        # Une ligne n'est convertie que si le tampon ne suffit pas à la lecture
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = "\t".join(_copy_value(value) for value in row) + "\n"
+            lines.append(line)
+            length += len(line)
+        data = "".join(lines)
+        if size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def copy_dataframe_rows(table, conn, keys: List[str], data_iter: Iterable[tuple]):
     """
-    df.to_sql(table_name, engine, if_exists=if_exists, index=False)
+    Méthode d'insertion pour `DataFrame.to_sql` (paramètre `method`) : les lignes sont envoyées par
+    COPY ... FROM STDIN, en flux (voir `_CopyStream`), sans construire le CSV complet en mémoire.
+
+    :param table: pandas.io.sql.SQLTable - Table cible
+    :param conn: Connexion SQLAlchemy (psycopg2)
+    :param keys: List[str] - Noms des colonnes
+    :param data_iter: Iterable[tuple] - Lignes à insérer
+    """
+    name = sql.Identifier(table.schema, table.name) if table.schema else sql.Identifier(table.name)
+    dbapi_connection = conn.connection
+    with dbapi_connection.cursor() as cursor:
+        query = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            name, sql.SQL(", ").join(sql.Identifier(key) for key in keys)).as_string(cursor)
+        cursor.copy_expert(query, _CopyStream(data_iter))
+        return cursor.rowcount
 
 def parse_index_datatourisme(index_path:str = "./data/index.json") -> list:
     """
@@ -60,6 +133,56 @@ def parse_index_datatourisme(index_path:str = "./data/index.json") -> list:
         urls.append("data/objects/"+item["file"])
     return urls
 
+def _region_dataframe(records: list) -> pd.DataFrame:
+    data = [[record.region_id, record.region_name] for record in records]
+    # On crée un dataframe pour stocker les résultats
+    region_df = pd.DataFrame(data, columns=["dt_region_id", "name"])
+    return region_df
+
+def _department_dataframe(records: list) -> pd.DataFrame:
+    data = [[record.departement_id, record.region_id, record.departement_name] for record in records]
+    # On crée un dataframe pour stocker les résultats
+    department_df = pd.DataFrame(data, columns=["dt_departement_id", "dt_region_id", "name"])
+    return department_df
+
+def _city_dataframe(records: list) -> pd.DataFrame:
+    data = [[record.city_id, record.departement_id, record.city_name] for record in records]
+    # On crée un dataframe pour stocker les résultats
+    city_df = pd.DataFrame(data, columns=["dt_city_id","dt_departement_id","name"])
+    # Et on supprime les doublons
+    city_df = city_df.drop_duplicates()
+    return city_df
+
+def _category_dataframe(records: list) -> pd.DataFrame:
+    # On récupère les catégories de POI et on les ajoute à un set
+    # pour s'assurer de leur unicité
+    # Si on récupère une liste, on l'eclate et on ajoute chaque élément un à un dans le set
+    categories = set()
+    for record in records:
+        if isinstance(record.categories, list):
+            for category in record.categories:
+                categories.add(category)
+        else:
+            categories.add(record.categories)
+
+    # Transformation du set en DataFrame
+    category_df = pd.DataFrame(categories, columns=["name"])
+    return category_df
+
+# Champs des fichiers JSON utilisés pour construire les tables des régions, départements, villes et catégories
+_dimension_fields = ("region_id", "region_name", "departement_id", "departement_name", "city_id", "city_name", "categories")
+
+def collect_all_information_from_files(urls: list) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Collecte en un seul passage sur les fichiers JSON les informations des régions, départements, villes et catégories.
+    Chaque fichier n'est lu et parsé qu'une seule fois, et seuls les champs de `_dimension_fields` en sont extraits.
+
+    :param urls: list - La liste des URL des fichiers JSON
+    :return: tuple - Les DataFrames (region_df, department_df, city_df, category_df)
+    """
+    records = [helper.get_poi_record(url, _dimension_fields) for url in urls]
+    return (_region_dataframe(records), _department_dataframe(records), _city_dataframe(records), _category_dataframe(records))
+
 def collect_region_information_from_files(urls: list) -> pd.DataFrame:
     """
     Collecte les informations des points d'intérêt à partir des fichiers JSON.
@@ -67,13 +190,7 @@ def collect_region_information_from_files(urls: list) -> pd.DataFrame:
     :param urls: list - La liste des URL des fichiers JSON
     :return: pd.DataFrame - Le DataFrame contenant les informations des points d'intérêt
     """
-    data = []
-    for url in urls:
-        poi_region_id, poi_region_name = helper.get_poi_region(url)
-        data.append([poi_region_id, poi_region_name])
-    # On crée un dataframe pour stocker les résultats
-    region_df = pd.DataFrame(data, columns=["dt_region_id", "name"])
-    return region_df
+    return collect_all_information_from_files(urls)[0]
 
 def collect_department_information_from_files(urls: list) -> pd.DataFrame:
     """
@@ -82,15 +199,7 @@ def collect_department_information_from_files(urls: list) -> pd.DataFrame:
     :param urls: list - La liste des URL des fichiers JSON
     :return: pd.DataFrame - Le DataFrame contenant les informations des points d'intérêt
     """
-    data = []
-    for url in urls:
-        poi_departement_id, poi_departement_name = helper.get_poi_department(url)
-        poi_region_id, poi_region_name = helper.get_poi_region(url)
-        data.append([poi_departement_id, poi_region_id, poi_departement_name])
-    # On crée un dataframe pour stocker les résultats
-    department_df = pd.DataFrame(data, columns=["dt_departement_id", "dt_region_id", "name"])
-
-    return department_df
+    return collect_all_information_from_files(urls)[1]
 
 def collect_city_information_from_files(urls: list) -> pd.DataFrame:
     """
@@ -99,18 +208,7 @@ def collect_city_information_from_files(urls: list) -> pd.DataFrame:
     :param urls: list - La liste des URL des fichiers JSON
     :return: pd.DataFrame - Le DataFrame contenant les informations des points d'intérêt
     """
-    data = []
-    for url in urls:
-        # Récuperation de l'ID de la ville et de son nom
-        poi_city_id, poi_city_name = helper.get_poi_city(url)
-        # Récupération du département de la ville
-        poi_departement_id, poi_department_name = helper.get_poi_department(url)
-        data.append([poi_city_id, poi_departement_id, poi_city_name])
-    # On crée un dataframe pour stocker les résultats
-    city_df = pd.DataFrame(data, columns=["dt_city_id","dt_departement_id","name"])
-    # Et on supprime les doublons
-    city_df = city_df.drop_duplicates()
-    return city_df
+    return collect_all_information_from_files(urls)[2]
 
 def collect_all_categories(urls: list) -> pd.DataFrame:
     """
@@ -118,22 +216,7 @@ def collect_all_categories(urls: list) -> pd.DataFrame:
     :param urls: list - La liste des URL des fichiers JSON
     :return: pd.DataFrame - Le DataFrame contenant la liste des catégories à insérer dans la table Category
     """
-    # On récupère les catégories de POI et on les ajoute à un set
-    # pour s'assurer de leur unicité
-    # Si on récupère une liste, on l'eclate et on ajoute chaque élément un à un dans le set
-
-    categories = set()
-    for url in urls:
-        poi_category = helper.get_poi_category(url)
-        if isinstance(poi_category, list):
-            for category in poi_category:
-                categories.add(category)
-        else:
-            categories.add(poi_category)
-
-    # Transformation du set en DataFrame
-    category_df = pd.DataFrame(categories, columns=["name"])
-    return category_df
+    return collect_all_information_from_files(urls)[3]
 
 def connect_to_db_V2(dbname, user, password, host, port):
     """
@@ -167,12 +250,7 @@ def get_all_pois_from_db(conn) -> List[Poi]:
     :return
         List[Poi]: Liste des objets Poi.
     """
-    query = """
-    SELECT * FROM Point_Of_Interest AS poi
-    """
-    with conn.cursor() as cursor:
-      cursor.execute(query)
-      return _pois_query(cursor)
+    return list(iter_pois_from_db(conn))
 
 
 def select_pois_from_db(conn, category: str) -> List[Poi]:
@@ -186,45 +264,196 @@ def select_pois_from_db(conn, category: str) -> List[Poi]:
   :return
       List[Poi]: Liste des objets Poi.
   """
-  query = """
-    SELECT poi.* FROM Point_Of_Interest AS poi
-    LEFT JOIN category_point_of_interest cpoi on poi.dt_poi_id = cpoi.dt_poi_id
-    LEFT JOIN category on cpoi.dt_category_id = category.dt_category_id
-    WHERE category.name = %s
-    """
-  with conn.cursor() as cursor:
-    cursor.execute(query, (category,))
-    return _pois_query(cursor)
-
-
-def _pois_query(cursor) -> List[Poi]:
-  pois = []
-  results = cursor.fetchall()
-  for row in results:
-    # Extraire les informations
-    poi_id, osm_node_id, name, rating, created_at, updated_at, latitude, longitude, postal_code, city = row
-
-    if isinstance(city, str):
-            try:
-                city = json.loads(city)  # Si c'est une chaîne JSON, la désérialiser
-            except json.JSONDecodeError:
-                city = None
-    # Créer une instance de la classe Poi
-    poi = Poi(
-      id=poi_id,
-      name=name,
-      rating=rating,
-      created_at=created_at,
-      updated_at=updated_at,
-      latitude=latitude,
-      longitude=longitude,
-      postal_code=postal_code,
-      city=city,
-      categories=[],
-      osm_node_id=osm_node_id
-    )
-    pois.append(poi)
-  return pois
+  return list(iter_pois_from_db(conn, category))
+
+
+def _poi_rows_query(columns: Sequence[str], category: str = None) -> Tuple[sql.Composed, tuple]:
+    """
+    Requête de `iter_poi_rows_from_db` et ses paramètres.
+    """
+    unknown = [column for column in columns if column not in poi_columns]
+    if unknown:
+        raise ValueError(f"Colonnes inconnues dans Point_Of_Interest : {', '.join(unknown)}")
+    query = sql.SQL("SELECT {} FROM Point_Of_Interest AS poi").format(
+        sql.SQL(", ").join(sql.Identifier("poi", column) for column in columns))
+    if category is None:
+        return query, ()
+    query += sql.SQL("""
+        LEFT JOIN category_point_of_interest cpoi on poi.dt_poi_id = cpoi.dt_poi_id
+        LEFT JOIN category on cpoi.dt_category_id = category.dt_category_id
+        WHERE category.name = %s""")
+    return query, (category,)
+
+
+def iter_poi_rows_from_db(conn, columns: Sequence[str] = poi_columns, category: str = None,
+                          fetch_size: int = default_fetch_size) -> Iterator[tuple]:
+    """
+    Parcourt les lignes de la table Point_Of_Interest, éventuellement restreintes à une catégorie,
+    en ne lisant que les colonnes demandées, par exemple `("dt_poi_id", "dt_updated_at")` pour comparer
+    les POIs ou `("dt_poi_id", "latitude", "longitude")` pour les clusteriser.
+    Les lignes sont lues par un curseur côté serveur, par lots de `fetch_size` : seul le lot courant
+    est en mémoire.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+        columns (Sequence[str]): Colonnes à lire, parmi `poi_columns`.
+        category (str): Catégorie des POIs à sélectionner, tous les POIs si None.
+        fetch_size (int): Nombre de lignes lues par aller-retour.
+
+    :return
+        Iterator[tuple]: Les lignes, avec les colonnes dans l'ordre de `columns`.
+    """
+    query, parameters = _poi_rows_query(columns, category)
+    # Curseur nommé : PostgreSQL garde le résultat et le transmet par lots à chaque fetchmany
+    with conn.cursor(name=f"poi_rows_{uuid.uuid4().hex}") as cursor:
+        cursor.execute(query, parameters)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows
+
+
+def iter_pois_from_db(conn, category: str = None, fetch_size: int = default_fetch_size) -> Iterator[Poi]:
+    """
+    Parcourt les POIs de la base de données, éventuellement restreints à une catégorie,
+    lus par lots de `fetch_size` avec un curseur côté serveur (voir `iter_poi_rows_from_db`).
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+        category (str): Catégorie des POIs à sélectionner, tous les POIs si None.
+        fetch_size (int): Nombre de lignes lues par aller-retour.
+
+    :return
+        Iterator[Poi]: Les objets Poi.
+    """
+    return (_poi_from_row(row) for row in iter_poi_rows_from_db(conn, poi_columns, category, fetch_size))
+
+
+def _poi_from_row(row: tuple) -> Poi:
+  # Extraire les informations
+  poi_id, osm_node_id, name, rating, created_at, updated_at, latitude, longitude, postal_code, city, content_hash, x, y = row
+
+  if isinstance(city, str):
+    try:
+      city = json.loads(city)  # Si c'est une chaîne JSON, la désérialiser
+    except json.JSONDecodeError:
+      city = None
+  # Créer une instance de la classe Poi
+  return Poi(
+    id=poi_id,
+    name=name,
+    rating=rating,
+    created_at=created_at,
+    updated_at=updated_at,
+    latitude=latitude,
+    longitude=longitude,
+    postal_code=postal_code,
+    city=city,
+    categories=[],
+    osm_node_id=osm_node_id,
+    content_hash=content_hash,
+    x=x,
+    y=y
+  )
+
+
+def _copy_value(value) -> str:
+    """
+    Représentation d'une valeur dans le format texte de COPY.
+    """
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[tuple], page_size: int = default_copy_size):
+    """
+    Charge des lignes dans une table avec COPY ... FROM STDIN, par paquets de `page_size` lignes.
+    Les valeurs None sont chargées comme NULL.
+    """
+    query = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table), sql.SQL(", ").join(sql.Identifier(column) for column in columns)).as_string(cursor)
+    rows = iter(rows)
+    while True:
+        buffer = io.StringIO()
+        count = 0
+        for row in rows:
+            buffer.write("\t".join(_copy_value(value) for value in row))
+            buffer.write("\n")
+            count += 1
+            if count == page_size:
+                break
+        if count == 0:
+            break
+        buffer.seek(0)
+        cursor.copy_expert(query, buffer)
+
+
+def diff_pois_in_db(conn, rows: Iterable[Tuple[str, object, str]], page_size: int = default_copy_size) -> Tuple[List[str], List[str]]:
+    """
+    Compare des POIs à ceux de la base de données sans charger la table Point_Of_Interest en Python :
+    les triplets (identifiant, date de mise à jour, empreinte du contenu) sont chargés par COPY dans une table
+    temporaire (les tables temporaires ne sont pas journalisées), puis une seule jointure calcule les POIs à créer,
+    absents de la base, et à mettre à jour, dont la date de mise à jour est plus récente que celle de la base
+    et dont l'empreinte diffère (ou est inconnue). Le nombre de mises à jour évitées est journalisé.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+        rows (Iterable[Tuple[str, object, str]]): Identifiant, date de mise à jour et empreinte de chaque POI.
+        page_size (int): Nombre de lignes envoyées par commande COPY.
+
+    :return
+        tuple: (identifiants des POIs à créer, identifiants des POIs à mettre à jour)
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TEMPORARY TABLE poi_staging (
+                dt_poi_id     VARCHAR(255) NOT NULL,
+                dt_updated_at TIMESTAMP,
+                content_hash  CHAR(32)
+            ) ON COMMIT DROP
+            """
+        )
+        _copy_rows(cursor, "poi_staging", ("dt_poi_id", "dt_updated_at", "content_hash"), rows, page_size)
+        cursor.execute("ANALYZE poi_staging")
+        cursor.execute(
+            """
+            SELECT staging.dt_poi_id, poi.dt_poi_id IS NULL, staging.content_hash = poi.content_hash
+            FROM poi_staging AS staging
+            LEFT JOIN Point_Of_Interest AS poi ON poi.dt_poi_id = staging.dt_poi_id
+            WHERE poi.dt_poi_id IS NULL OR staging.dt_updated_at > poi.dt_updated_at
+            """
+        )
+        results = cursor.fetchall()
+    conn.commit()
+    ids_to_create = [poi_id for poi_id, is_new, _ in results if is_new]
+    ids_to_update = [poi_id for poi_id, is_new, unchanged in results if not is_new and not unchanged]
+    unchanged = len(results) - len(ids_to_create) - len(ids_to_update)
+    if unchanged:
+        logging.info(f"{unchanged} POIs ont une date de mise à jour plus récente mais un contenu inchangé : "
+                     f"{unchanged} mises à jour évitées.")
+    return ids_to_create, ids_to_update
+
+
+def compare_pois_in_db(conn, table: PoiTable, page_size: int = default_copy_size) -> Tuple[PoiTable, PoiTable]:
+    """
+    Équivalent de `compare_pois` calculé par PostgreSQL avec `diff_pois_in_db` : seuls les identifiants
+    des POIs à créer et à mettre à jour sont renvoyés par la base, puis sélectionnés dans `table`.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+        table (PoiTable): POIs extraits des fichiers JSON.
+        page_size (int): Nombre de lignes envoyées par commande COPY.
+
+    :return
+        tuple: (pois_to_create, pois_to_update)
+    """
+    rows = zip(table.ids, table.updated_at.tolist(), table.content_hashes)
+    ids_to_create, ids_to_update = diff_pois_in_db(conn, rows, page_size)
+    return (table.take(np.isin(table.ids, np.array(ids_to_create, dtype=object))),
+            table.take(np.isin(table.ids, np.array(ids_to_update, dtype=object))))
 
 
 def add_poi_to_db(conn, poi: Poi):
@@ -256,13 +485,14 @@ def add_poi_to_db(conn, poi: Poi):
             """
             INSERT INTO point_of_interest (
                 dt_poi_id, name, rating, dt_created_at, dt_updated_at,
-                latitude, longitude, postal_code, dt_city_id, osm_node_id
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                latitude, longitude, postal_code, dt_city_id, osm_node_id, content_hash, x, y
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             ON CONFLICT (dt_poi_id) DO NOTHING
             """,
             (
                 poi.id, poi.name, poi.rating, poi.created_at, poi.updated_at,
-                poi.latitude, poi.longitude, poi.postal_code, poi.city.id, poi.osm_node_id
+                poi.latitude, poi.longitude, poi.postal_code, poi.city.id, poi.osm_node_id, poi.content_hash,
+                *poi_xy(poi)
             )
         )
         # Insérer les catégories
@@ -300,6 +530,282 @@ def add_poi_to_db(conn, poi: Poi):
         conn.commit()
 
 
+def _optional_values(column: np.ndarray) -> list:
+    """
+    Valeurs d'une colonne numérique de PoiTable, None à la place de NaN/NaT.
+    """
+    values = column.tolist()
+    if column.dtype.kind == "f":
+        return [None if value != value else value for value in values]
+    return values
+
+
+def _optional_ints(column: np.ndarray) -> list:
+    """
+    Valeurs entières d'une colonne de flottants de PoiTable (coordonnées x, y), None à la place de NaN.
+    """
+    return [None if value != value else int(value) for value in column.tolist()]
+
+
+class DimensionCache:
+    """
+    Cache des clés des tables de dimensions (régions, départements, villes) et des identifiants des catégories
+    déjà présents dans la base de données. Les clés existantes sont lues une seule fois, au premier appel
+    de `ensure` ; les appels suivants n'insèrent que les lignes manquantes, en une requête multi-lignes
+    par table, et renvoient les identifiants des catégories utilisés pour écrire les liens POI → catégorie.
+
+    Une instance vit le temps d'un lot (`add_pois_to_db`, `update_pois_in_db`) ou, si elle est passée
+    explicitement, de tout le processus (`dimension_cache`) : les lignes de dimensions ne sont jamais
+    supprimées, les clés mises en cache restent donc valides. Les clés ajoutées par une transaction ne sont
+    mises en cache qu'une fois celle-ci validée (`commit`), et oubliées si elle est annulée (`rollback`).
+    Une instance peut être partagée par plusieurs threads (`write_pois_parallel`). Chaque tâche Airflow
+    s'exécutant dans son propre processus, `dimension_cache` ne sert qu'aux lots d'une même tâche.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.regions = set()
+        self.departements = set()
+        self.cities = set()
+        self.categories = {}
+        # Clés ajoutées par les transactions en cours, par connexion
+        self.pending = {}
+        self.lock = threading.RLock()
+
+    def clear(self):
+        with self.lock:
+            self.__init__()
+
+    def load(self, cursor):
+        """
+        Lit les clés des régions, départements et villes et les identifiants des catégories de la base.
+        """
+        with self.lock:
+            cursor.execute("SELECT dt_region_id FROM region")
+            self.regions = {row[0] for row in cursor.fetchall()}
+            cursor.execute("SELECT dt_departement_id FROM departement")
+            self.departements = {row[0] for row in cursor.fetchall()}
+            cursor.execute("SELECT dt_city_id FROM city")
+            self.cities = {row[0] for row in cursor.fetchall()}
+            cursor.execute("SELECT name, dt_category_id FROM category")
+            self.categories = dict(cursor.fetchall())
+            self.loaded = True
+
+    def commit(self, conn):
+        """
+        Met en cache les clés ajoutées par la transaction de `conn`, une fois celle-ci validée.
+        """
+        with self.lock:
+            regions, departements, cities, categories = self.pending.pop(conn, (set(), set(), set(), {}))
+            self.regions |= regions
+            self.departements |= departements
+            self.cities |= cities
+            self.categories.update(categories)
+
+    def rollback(self, conn):
+        """
+        Oublie les clés ajoutées par la transaction annulée de `conn` : elles ne sont pas dans la base.
+        """
+        with self.lock:
+            self.pending.pop(conn, None)
+
+    def ensure(self, cursor, table: PoiTable) -> Dict[str, int]:
+        """
+        Ajoute à la base les régions, départements, villes et catégories de la table qui n'y sont pas encore.
+        Les clés ajoutées sont mises en cache par `commit` une fois la transaction validée.
+
+        :return: Dict[str, int] - Identifiant de chaque catégorie connue, par nom.
+        """
+        with self.lock:
+            if not self.loaded:
+                self.load(cursor)
+            pending = self.pending.setdefault(cursor.connection, (set(), set(), set(), {}))
+            known_regions, known_departements, known_cities = (
+                self.regions | pending[0], self.departements | pending[1], self.cities | pending[2])
+            categories = {**self.categories, **pending[3]}
+        regions, departements, cities = {}, {}, {}
+        for code in np.unique(table.city_codes[table.city_codes >= 0]):
+            city = table.cities[code]
+            departement = city.departement
+            region = departement.region if departement is not None else None
+            if region is not None and region.id not in known_regions:
+                regions.setdefault(region.id, (region.id, region.name))
+            if departement is not None and departement.id not in known_departements:
+                departements.setdefault(departement.id, (departement.id, departement.name, region.id if region is not None else None))
+            if city.id not in known_cities:
+                cities.setdefault(city.id, (city.id, city.name, departement.id if departement is not None else None))
+        for query, rows, keys in (
+            ("INSERT INTO region (dt_region_id, name) VALUES %s ON CONFLICT (dt_region_id) DO NOTHING", regions, pending[0]),
+            ("INSERT INTO departement (dt_departement_id, name, dt_region_id) VALUES %s "
+             "ON CONFLICT (dt_departement_id) DO NOTHING", departements, pending[1]),
+            ("INSERT INTO city (dt_city_id, name, dt_departement_id) VALUES %s ON CONFLICT (dt_city_id) DO NOTHING", cities, pending[2]),
+        ):
+            if rows:
+                # Insertion dans l'ordre des clés : des transactions concurrentes verrouillent les mêmes lignes
+                # dans le même ordre, sans interblocage
+                execute_values(cursor, query, sorted(rows.values()))
+                keys.update(rows)
+
+        names = {table.categories[code].name for code in np.unique(table.category_codes)} - categories.keys()
+        if names:
+            inserted = dict(execute_values(
+                cursor, "INSERT INTO category (name) VALUES %s ON CONFLICT (name) DO NOTHING RETURNING name, dt_category_id",
+                [(name,) for name in sorted(names)], fetch=True
+            ))
+            # Catégories ajoutées entre-temps par un autre lot
+            names -= inserted.keys()
+            if names:
+                cursor.execute("SELECT name, dt_category_id FROM category WHERE name = ANY(%s)", (list(names),))
+                inserted.update(cursor.fetchall())
+            pending[3].update(inserted)
+            categories.update(inserted)
+        return categories
+
+
+dimension_cache = DimensionCache()
+
+
+def _poi_rows(table: PoiTable) -> Iterator[tuple]:
+    city_ids = [table.cities[code].id if code >= 0 else None for code in table.city_codes.tolist()]
+    return zip(
+        table.ids, table.osm_node_ids, table.names, _optional_values(table.ratings),
+        _optional_values(table.created_at), _optional_values(table.updated_at),
+        _optional_values(table.latitudes), _optional_values(table.longitudes),
+        table.postal_codes, city_ids, table.content_hashes, _optional_ints(table.x), _optional_ints(table.y)
+    )
+
+
+def _poi_category_rows(table: PoiTable, category_ids: Dict[str, int]) -> Iterator[tuple]:
+    poi_indices = np.repeat(np.arange(len(table)), np.diff(table.category_offsets))
+    codes = np.unique(table.category_codes)
+    table_category_ids = np.full(len(table.categories), -1, dtype=np.int64)
+    table_category_ids[codes] = [category_ids[table.categories[code].name] for code in codes]
+    return zip(table.ids[poi_indices], table_category_ids[table.category_codes].tolist())
+
+
+def _stage_pois(cursor, table: PoiTable, page_size: int, cache: DimensionCache):
+    """
+    Ajoute les régions, départements, villes et catégories manquants de la table (voir `DimensionCache`),
+    puis charge par COPY les POIs et leurs liens vers les catégories (par identifiant) dans les tables
+    temporaires `poi_staging` et `poi_category_staging`, supprimées à la fin de la transaction.
+    """
+    category_ids = cache.ensure(cursor, table)
+    cursor.execute(
+        """
+        CREATE TEMPORARY TABLE poi_staging (LIKE Point_Of_Interest) ON COMMIT DROP;
+        CREATE TEMPORARY TABLE poi_category_staging (
+            dt_poi_id      VARCHAR(255) NOT NULL,
+            dt_category_id INT NOT NULL
+        ) ON COMMIT DROP;
+        """
+    )
+    _copy_rows(cursor, "poi_staging", poi_columns, _poi_rows(table), page_size)
+    _copy_rows(cursor, "poi_category_staging", ("dt_poi_id", "dt_category_id"),
+               _poi_category_rows(table, category_ids), page_size)
+
+
+def _write_pois(conn, pois: Iterable[Poi] | PoiTable, statement: str, page_size: int, cache: DimensionCache):
+    """
+    Prépare un lot de POIs avec `_stage_pois` puis l'applique avec `statement`, en une seule transaction.
+    """
+    table = pois if isinstance(pois, PoiTable) else PoiTable.from_pois(pois)
+    cache = cache if cache is not None else DimensionCache()
+    try:
+        with conn.cursor() as cursor:
+            _stage_pois(cursor, table, page_size, cache)
+            cursor.execute(statement)
+        conn.commit()
+    except Exception:
+        # Les dimensions ajoutées par la transaction annulée ne sont pas dans la base
+        conn.rollback()
+        cache.rollback(conn)
+        raise
+    cache.commit(conn)
+
+
+def add_pois_to_db(conn, pois: Iterable[Poi] | PoiTable, page_size: int = default_copy_size, cache: DimensionCache = None):
+    """
+    Ajoute un lot de POIs dans la base de données en une seule transaction, avec un nombre constant
+    de requêtes quelle que soit la taille du lot (au lieu de 4 + 2 × catégories requêtes par POI
+    pour `add_poi_to_db`) :
+    - les régions, départements, villes et catégories manquants sont ajoutés par `DimensionCache`,
+      qui fournit aussi les identifiants des catégories ;
+    - les POIs et leurs liens vers les catégories sont chargés par COPY dans des tables temporaires,
+      puis reportés par un `INSERT ... SELECT ... ON CONFLICT DO NOTHING`.
+    Comme pour `add_poi_to_db`, les POIs déjà présents ne sont pas modifiés, et leurs catégories non plus.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+        pois (Iterable[Poi] | PoiTable): POIs à ajouter.
+        page_size (int): Nombre de lignes envoyées par commande COPY.
+        cache (DimensionCache): Cache des dimensions à réutiliser entre les lots (par défaut, un cache propre au lot).
+    """
+    _write_pois(conn, pois, """
+        WITH inserted AS (
+            INSERT INTO point_of_interest (
+                dt_poi_id, osm_node_id, name, rating, dt_created_at, dt_updated_at,
+                latitude, longitude, postal_code, dt_city_id, content_hash, x, y
+            )
+            SELECT DISTINCT ON (dt_poi_id)
+                dt_poi_id, osm_node_id, name, rating, dt_created_at, dt_updated_at,
+                latitude, longitude, postal_code, dt_city_id, content_hash, x, y
+            FROM poi_staging
+            ON CONFLICT (dt_poi_id) DO NOTHING
+            RETURNING dt_poi_id
+        )
+        INSERT INTO category_point_of_interest (dt_poi_id, dt_category_id)
+        SELECT DISTINCT staging.dt_poi_id, staging.dt_category_id
+        FROM poi_category_staging AS staging
+        JOIN inserted ON inserted.dt_poi_id = staging.dt_poi_id
+        """, page_size, cache)
+
+
+def update_pois_in_db(conn, pois: Iterable[Poi] | PoiTable, page_size: int = default_copy_size, cache: DimensionCache = None):
+    """
+    Met à jour un lot de POIs dans la base de données en une seule transaction, avec un nombre constant
+    de requêtes (au lieu d'une mise à jour, d'une suppression de tous les liens vers les catégories
+    et de deux requêtes par catégorie pour chaque POI avec `update_poi_in_db`) :
+    - les POIs et leurs liens vers les catégories sont chargés par COPY dans des tables temporaires
+      (les villes et catégories manquantes sont ajoutées, comme pour `add_pois_to_db`) ;
+    - un `UPDATE ... FROM` met à jour les POIs ;
+    - seuls les liens vers les catégories qui ont changé sont supprimés ou ajoutés,
+      les autres ne sont pas modifiés.
+    Les POIs absents de la base sont ignorés.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+        pois (Iterable[Poi] | PoiTable): POIs à mettre à jour.
+        page_size (int): Nombre de lignes envoyées par commande COPY.
+        cache (DimensionCache): Cache des dimensions à réutiliser entre les lots (par défaut, un cache propre au lot).
+    """
+    _write_pois(conn, pois, """
+        UPDATE point_of_interest AS poi
+        SET name = staging.name, rating = staging.rating, dt_created_at = staging.dt_created_at,
+            dt_updated_at = staging.dt_updated_at, latitude = staging.latitude, longitude = staging.longitude,
+            postal_code = staging.postal_code, dt_city_id = staging.dt_city_id, osm_node_id = staging.osm_node_id,
+            content_hash = staging.content_hash, x = staging.x, y = staging.y
+        FROM poi_staging AS staging
+        WHERE poi.dt_poi_id = staging.dt_poi_id;
+
+        DELETE FROM category_point_of_interest AS link
+        USING poi_staging AS staging
+        WHERE link.dt_poi_id = staging.dt_poi_id
+          AND NOT EXISTS (
+              SELECT 1 FROM poi_category_staging AS new_link
+              WHERE new_link.dt_poi_id = link.dt_poi_id AND new_link.dt_category_id = link.dt_category_id
+          );
+
+        INSERT INTO category_point_of_interest (dt_poi_id, dt_category_id)
+        SELECT DISTINCT new_link.dt_poi_id, new_link.dt_category_id
+        FROM poi_category_staging AS new_link
+        JOIN point_of_interest AS poi ON poi.dt_poi_id = new_link.dt_poi_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM category_point_of_interest AS link
+            WHERE link.dt_poi_id = new_link.dt_poi_id AND link.dt_category_id = new_link.dt_category_id
+        );
+        """, page_size, cache)
+
+
 def update_poi_in_db(conn, poi: Poi):
     """
     Met à jour un POI dans la base de données.
@@ -314,12 +820,14 @@ def update_poi_in_db(conn, poi: Poi):
             """
             UPDATE point_of_interest
             SET name = %s, rating = %s, dt_created_at = %s, dt_updated_at = %s,
-                latitude = %s, longitude = %s, postal_code = %s, dt_city_id = %s, osm_node_id = %s
+                latitude = %s, longitude = %s, postal_code = %s, dt_city_id = %s, osm_node_id = %s,
+                content_hash = %s, x = %s, y = %s
             WHERE dt_poi_id = %s
             """,
             (
                 poi.name, poi.rating, poi.created_at, poi.updated_at,
-                poi.latitude, poi.longitude, poi.postal_code, poi.city.id, poi.osm_node_id, poi.id
+                poi.latitude, poi.longitude, poi.postal_code, poi.city.id, poi.osm_node_id,
+                poi.content_hash, *poi_xy(poi), poi.id
             )
         )
         # Mettre à jour les catégories
@@ -353,19 +861,324 @@ def update_poi_in_db(conn, poi: Poi):
             )
         conn.commit()
 
-def process_batch(pois: List[Poi], type: str, dbname, user, password, host, port):
+def write_pois_parallel(pool: ThreadedConnectionPool, pois: Iterable[Poi] | PoiTable, type: str, workers: int = 4,
+                        sub_batch_size: int = None, page_size: int = default_copy_size, cache: DimensionCache = None) -> float:
+    """
+    Insère ou met à jour un lot de POIs en le découpant en sous-lots indépendants, écrits en parallèle
+    par au plus `workers` threads, chacun avec sa propre connexion du pool et sa propre transaction.
+
+    Les régions, départements, villes et catégories de tout le lot sont d'abord ajoutés en une seule
+    transaction, dans l'ordre de leurs clés : les sous-lots n'écrivent ensuite que leurs POIs et leurs liens
+    vers les catégories, des lignes qui leur sont propres, ce qui évite les interblocages entre transactions.
+    Un sous-lot en échec n'annule pas les sous-lots déjà écrits : l'exception est relevée après leur fin.
+
+    :param
+        pool (ThreadedConnectionPool): Pool de connexions à la base de données PostgreSQL (au moins `workers` connexions).
+        pois (Iterable[Poi] | PoiTable): POIs à insérer ou mettre à jour.
+        type (str): "insert" pour insérer (`add_pois_to_db`), "update" pour mettre à jour (`update_pois_in_db`).
+        workers (int): Nombre maximal de sous-lots écrits en même temps.
+        sub_batch_size (int): Nombre de POIs par sous-lot (par défaut, le lot est réparti entre les threads).
+        page_size (int): Nombre de lignes envoyées par commande COPY.
+        cache (DimensionCache): Cache des dimensions (par défaut, un cache propre au lot).
+
+    :return:
+        float - Débit d'écriture, en POIs par seconde.
+    """
+    write = {"insert": add_pois_to_db, "update": update_pois_in_db}[type]
+    table = pois if isinstance(pois, PoiTable) else PoiTable.from_pois(pois)
+    cache = cache if cache is not None else DimensionCache()
+    start = time.perf_counter()
+
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cursor:
+            cache.ensure(cursor, table)
+        conn.commit()
+        cache.commit(conn)
+    except Exception:
+        conn.rollback()
+        cache.rollback(conn)
+        raise
+    finally:
+        pool.putconn(conn)
+
+    def write_sub_batch(sub_batch: PoiTable):
+        conn = pool.getconn()
+        try:
+            write(conn, sub_batch, page_size=page_size, cache=cache)
+        finally:
+            pool.putconn(conn)
+
+    sub_batch_size = sub_batch_size or max(1, math.ceil(len(table) / workers))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(write_sub_batch, table[index:index + sub_batch_size])
+                   for index in range(0, len(table), sub_batch_size)]
+    for future in futures:
+        future.result()
+
+    duration = time.perf_counter() - start
+    rate = len(table) / duration if duration > 0 else float("inf")
+    logging.info(f"{len(table)} POIs écrits ({type}) en {duration:.2f} s par {len(futures)} sous-lots "
+                 f"sur {workers} threads : {rate:.0f} POIs/s.")
+    return rate
+
+
+def process_batch(pois: List[Poi] | PoiTable, type: str, dbname, user, password, host, port, cache: DimensionCache = None,
+                  workers: int = 1):
     """
     Fonction pour mettre à jour/insérer créer un batch de POIs dans la base de données.
+    Chaque lot est inséré ou mis à jour en une seule transaction par `add_pois_to_db` ou `update_pois_in_db`.
 
     Args:
-        pois (List[Poi]): Liste des POIs à mettre à jour/insérer.
+        pois (List[Poi] | PoiTable): Liste des POIs à mettre à jour/insérer.
         type (str): type d'action sur la base de donné "update" pour modifier et "insert" pour insérer
+        cache (DimensionCache): Cache des dimensions partagé entre les lots d'un même processus (`dimension_cache`),
+            par défaut un cache propre au lot.
+        workers (int): Au-delà de 1, le batch est découpé en sous-lots écrits en parallèle par `write_pois_parallel`,
+            avec un pool de `workers` connexions.
     """
+    if workers > 1:
+        pool = ThreadedConnectionPool(1, workers, dbname=dbname, user=user, password=password, host=host, port=port)
+        try:
+            write_pois_parallel(pool, pois, type, workers=workers, cache=cache)
+        finally:
+            pool.closeall()
+        return
     engine = connect_to_db_V2(dbname, user, password, host, port)
     if type == "update":
-        for poi in pois:
-            update_poi_in_db(engine, poi)
+        update_pois_in_db(engine, pois, cache=cache)
     if type == "insert":
-        for poi in pois:
-            add_poi_to_db(engine, poi)
-    engine.close()
\ No newline at end of file
+        add_pois_to_db(engine, pois, cache=cache)
+    engine.close()
+
+
+def _backfill_poi_xy(cursor, fetch_size: int = default_fetch_size):
+    """
+    Calcule (voir `lambert93_xy`) les coordonnées Lambert-93 des POIs qui n'en ont pas, lors de la migration 3.
+    Les POIs sont lus par lots de `fetch_size` avec un curseur côté serveur, leurs coordonnées chargées
+    par COPY dans une table temporaire, puis reportées par un seul `UPDATE ... FROM`.
+    """
+    cursor.execute("CREATE TEMPORARY TABLE poi_xy_staging (dt_poi_id VARCHAR(255), x INT, y INT) ON COMMIT DROP")
+    with cursor.connection.cursor(name=f"poi_xy_{uuid.uuid4().hex}") as rows_cursor:
+        rows_cursor.execute(
+            """
+            SELECT dt_poi_id, latitude, longitude FROM Point_Of_Interest
+            WHERE (x IS NULL OR y IS NULL) AND latitude IS NOT NULL AND longitude IS NOT NULL
+            """
+        )
+        while True:
+            rows = rows_cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            ids, latitudes, longitudes = zip(*rows)
+            x, y = lambert93_xy(latitudes, longitudes)
+            _copy_rows(cursor, "poi_xy_staging", ("dt_poi_id", "x", "y"), zip(ids, _optional_ints(x), _optional_ints(y)))
+    cursor.execute(
+        """
+        UPDATE Point_Of_Interest AS poi SET x = staging.x, y = staging.y
+        FROM poi_xy_staging AS staging
+        WHERE poi.dt_poi_id = staging.dt_poi_id AND staging.x IS NOT NULL
+        """
+    )
+    logging.info(f"Coordonnées Lambert-93 calculées pour {cursor.rowcount} POIs.")
+
+
+def _add_poi_xy_columns(cursor):
+    cursor.execute("ALTER TABLE Point_Of_Interest ADD COLUMN IF NOT EXISTS x INT, ADD COLUMN IF NOT EXISTS y INT")
+    _backfill_poi_xy(cursor)
+
+
+# Migrations du schéma, appliquées dans l'ordre par `migrate_database` : (version, description, requêtes
+# ou fonction appelée avec le curseur de la transaction de la migration).
+# Une migration publiée ne doit plus être modifiée, les changements suivants sont de nouvelles versions.
+schema_migrations = [
+    (1, "Empreinte du contenu des POIs", """
+        ALTER TABLE Point_Of_Interest ADD COLUMN IF NOT EXISTS content_hash CHAR(32);
+    """),
+    (2, "Index des recherches de POIs et de villes par catégorie", """
+        -- Catégorie par nom : l'index de la contrainte UNIQUE ne couvre pas l'identifiant
+        CREATE INDEX IF NOT EXISTS category_name_idx ON Category (name) INCLUDE (dt_category_id);
+        -- Liens depuis une catégorie (recherches) et depuis un POI (mises à jour des liens)
+        CREATE INDEX IF NOT EXISTS category_poi_category_idx ON Category_Point_Of_Interest (dt_category_id, dt_poi_id);
+        CREATE INDEX IF NOT EXISTS category_poi_poi_idx ON Category_Point_Of_Interest (dt_poi_id, dt_category_id);
+        -- Villes par préfixe de nom (LIKE 'x%') ou par nom exact
+        CREATE INDEX IF NOT EXISTS city_name_pattern_idx ON City (name text_pattern_ops) INCLUDE (dt_city_id);
+        CREATE INDEX IF NOT EXISTS poi_city_idx ON Point_Of_Interest (dt_city_id);
+    """),
+    # Les coordonnées des POIs existants sont calculées une seule fois, avec l'ajout des colonnes
+    (3, "Coordonnées Lambert-93 des POIs", _add_poi_xy_columns),
+    (4, "Validateurs HTTP de la dernière archive traitée", """
+        CREATE TABLE IF NOT EXISTS Archive_Validator (
+            archive       VARCHAR(255) PRIMARY KEY,
+            etag          VARCHAR(255),
+            last_modified VARCHAR(64),
+            saved_at      TIMESTAMP NOT NULL DEFAULT now()
+        );
+    """),
+]
+
+
+def migrate_database(conn) -> List[int]:
+    """
+    Applique les migrations de `schema_migrations` qui ne l'ont pas encore été, chacune dans sa transaction.
+    Les versions appliquées sont enregistrées dans la table Schema_Migration ; un verrou sur cette table
+    empêche deux exécutions simultanées d'appliquer la même migration.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL (hors mode autocommit).
+
+    :return
+        List[int]: Versions des migrations appliquées par cet appel.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS Schema_Migration (
+                version     INT PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at  TIMESTAMP NOT NULL DEFAULT now()
+            )
+            """
+        )
+    conn.commit()
+    applied = []
+    for version, description, statements in schema_migrations:
+        with conn.cursor() as cursor:
+            cursor.execute("LOCK TABLE Schema_Migration IN SHARE ROW EXCLUSIVE MODE")
+            cursor.execute("SELECT 1 FROM Schema_Migration WHERE version = %s", (version,))
+            if cursor.fetchone() is None:
+                if callable(statements):
+                    statements(cursor)
+                else:
+                    cursor.execute(statements)
+                cursor.execute("INSERT INTO Schema_Migration (version, description) VALUES (%s, %s)", (version, description))
+                applied.append(version)
+                logging.info(f"Migration {version} appliquée : {description}.")
+        conn.commit()
+    return applied
+
+
+def query_plan_indexes(conn, query, parameters: tuple = ()) -> set:
+    """
+    Index utilisés par le plan d'exécution d'une requête (EXPLAIN, sans l'exécuter).
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+        query (str | sql.Composable): Requête à analyser.
+        parameters (tuple): Paramètres de la requête.
+
+    :return
+        set: Noms des index parcourus par le plan.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("EXPLAIN (FORMAT JSON) ") + (sql.SQL(query) if isinstance(query, str) else query), parameters)
+        plans = [cursor.fetchone()[0][0]["Plan"]]
+    indexes = set()
+    while plans:
+        plan = plans.pop()
+        if "Index Name" in plan:
+            indexes.add(plan["Index Name"])
+        plans.extend(plan.get("Plans", []))
+    return indexes
+
+
+def create_poi_watermark_table(conn):
+    """
+    Crée si nécessaire la table des watermarks d'ingestion incrémentale.
+    Elle associe à chaque fichier de l'archive la valeur de `lastUpdateDatatourisme` déjà traitée.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS poi_watermark (
+                file_path VARCHAR(255) PRIMARY KEY,
+                last_update VARCHAR(64) NOT NULL
+            )
+            """
+        )
+    conn.commit()
+
+
+def get_poi_watermarks(conn) -> Dict[str, str]:
+    """
+    Récupère les watermarks d'ingestion incrémentale.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+
+    :return
+        Dict[str, str]: `lastUpdateDatatourisme` déjà traité, par chemin de fichier.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT file_path, last_update FROM poi_watermark")
+        return dict(cursor.fetchall())
+
+
+def save_poi_watermarks(conn, poi_metadata_list: Iterable[PoiMetadata], page_size: int = 10000):
+    """
+    Enregistre comme traités les POIs d'une liste de métadonnées.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+        poi_metadata_list (Iterable[PoiMetadata]): Métadonnées des POIs traités.
+        page_size (int): Nombre de lignes envoyées par requête.
+    """
+    with conn.cursor() as cursor:
+        execute_values(
+            cursor,
+            """
+            INSERT INTO poi_watermark (file_path, last_update) VALUES %s
+            ON CONFLICT (file_path) DO UPDATE SET last_update = EXCLUDED.last_update
+            """,
+            ((metadata.file_path, metadata.last_update) for metadata in poi_metadata_list),
+            page_size=page_size
+        )
+    conn.commit()
+
+
+def get_archive_validators(conn, archive: str = "datatourisme") -> Dict[str, str]:
+    """
+    Récupère l'ETag et le Last-Modified de la dernière archive traitée (table Archive_Validator, migration 4),
+    à passer à `download_datatourisme_archive` pour un téléchargement conditionnel.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+        archive (str): Nom de l'archive.
+
+    :return
+        Dict[str, str]: Validateurs HTTP ("etag", "last_modified"), vide si aucune archive n'a été traitée.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT etag, last_modified FROM Archive_Validator WHERE archive = %s", (archive,))
+        row = cursor.fetchone()
+    conn.commit()
+    if row is None:
+        return {}
+    return {"etag": row[0], "last_modified": row[1]}
+
+
+def store_archive_validators(conn, validators: Dict[str, str], archive: str = "datatourisme"):
+    """
+    Enregistre l'ETag et le Last-Modified d'une archive traitée (voir `read_archive_validators`).
+    Des validateurs vides (aucune archive téléchargée) ne remplacent pas ceux déjà enregistrés.
+
+    :param
+        conn: Connexion à la base de données PostgreSQL.
+        validators (Dict[str, str]): Validateurs HTTP ("etag", "last_modified").
+        archive (str): Nom de l'archive.
+    """
+    if not validators:
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO Archive_Validator (archive, etag, last_modified) VALUES (%s, %s, %s)
+            ON CONFLICT (archive) DO UPDATE
+            SET etag = EXCLUDED.etag, last_modified = EXCLUDED.last_modified, saved_at = now()
+            """,
+            (archive, validators.get("etag"), validators.get("last_modified"))
+        )
+    conn.commit()
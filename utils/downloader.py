@@ -1,9 +1,11 @@
 import shutil
+import hashlib
+import json
+from enum import Enum
 import dotenv
 import os
 import requests
 import zipfile
-import kagglehub
 import logging
 
 
@@ -12,49 +14,176 @@ def check_file_exists(directory: str, filename: str) -> bool:
     return os.path.isfile(file_path)
 
 
-def download_datatourisme_archive(url, download_path) -> bool:
-    """
-    Télécharge l'archive ZIP depuis DataTourisme si elle n'existe pas déjà.
+class DownloadStatus(Enum):
+    DOWNLOADED = "downloaded"  # Une nouvelle archive est disponible localement
+    NOT_MODIFIED = "not_modified"  # L'archive n'a pas changé depuis le dernier traitement
+    FAILED = "failed"
+
+
+# Taille par défaut des blocs lus lors du téléchargement
+default_chunk_size = 1024 * 1024
+
+
+def _read_json(path: str) -> dict:
+    if path and os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    return {}
 
-    :return: bool - True si le fichier a été téléchargé avec succès, False sinon.
+
+def _write_json(path: str, data: dict):
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    os.replace(temporary_path, path)
+
+
+def download_datatourisme_archive(url, download_path, validators_path: str = None, validators: dict = None, chunk_size: int = default_chunk_size, timeout: int = 60, max_retries: int = 3) -> DownloadStatus:
+    """
+    Télécharge l'archive ZIP depuis DataTourisme.
+
+    - Si `validators` (ou `validators_path`) est fourni, la requête est conditionnelle (If-None-Match / If-Modified-Since)
+      avec l'ETag et le Last-Modified de la dernière archive traitée : si le flux n'a pas changé,
+      rien n'est téléchargé. Sinon, comme auparavant, le téléchargement est ignoré si l'archive existe déjà.
+    - Le téléchargement est repris là où il s'est arrêté (en-tête Range) après une expiration
+      ou une coupure, jusqu'à `max_retries` fois.
+    - La somme SHA-256 de l'archive est calculée au fil du téléchargement et écrite dans `archive.zip.sha256`.
+    - L'ETag et le Last-Modified de l'archive sont écrits dans `archive.zip.validators.json`,
+      à relire avec `read_archive_validators` et à enregistrer une fois l'archive traitée.
+
+    :param url: str - URL du flux DataTourisme
+    :param download_path: str - Répertoire de téléchargement
+    :param validators_path: str - Fichier des validateurs HTTP de la dernière archive traitée
+    :param validators: dict - Validateurs HTTP de la dernière archive traitée ("etag", "last_modified"),
+        par exemple lus en base par `get_archive_validators` ; prioritaires sur `validators_path`
+    :param chunk_size: int - Taille des blocs lus (par défaut 1 Mo)
+    :param timeout: int - Délai d'expiration des requêtes en secondes
+    :param max_retries: int - Nombre maximal de reprises du téléchargement
+    :return: DownloadStatus
     """
     os.makedirs(download_path, exist_ok=True)
     file_path = os.path.join(download_path, "archive.zip")
-
-
+    part_path = f"{file_path}.part"
+
+    conditional_headers = {}
+    if validators is None and validators_path:
+        validators = _read_json(validators_path)
+    if validators is not None:
+        if validators.get("etag"):
+            conditional_headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            conditional_headers["If-Modified-Since"] = validators["last_modified"]
     # Vérification si le fichier existe déjà
-    if os.path.exists(file_path):
+    elif os.path.exists(file_path):
         logging.info(f"Le fichier existe déjà : {file_path}. Téléchargement ignoré.")
-        return True
+        return DownloadStatus.DOWNLOADED
 
+    checksum = hashlib.sha256()
+    downloaded = 0
+    new_validators = {}
     try:
-        logging.info(f"Téléchargement de l'archive depuis {url}...")
-        response = requests.get(url, stream=True, timeout=60)
-        response.raise_for_status()  # Vérifie les erreurs HTTP (404, 500, etc.)
-
-        # Vérification du type de contenu
-        content_type = response.headers.get('Content-Type')
-        if 'application/zip' not in content_type:
-            logging.error(f"Type de contenu inattendu : {content_type}")
-            return False
-
-        # Sauvegarde du fichier ZIP
-        with open(file_path, "wb") as file:
-            for chunk in response.iter_content(chunk_size=8192):
-                file.write(chunk)
-
+        for attempt in range(max_retries + 1):
+            if downloaded:
+                headers = {"Range": f"bytes={downloaded}-"}
+                if_range = new_validators.get("etag") or new_validators.get("last_modified")
+                if if_range:
+                    headers["If-Range"] = if_range
+                logging.info(f"Reprise du téléchargement à l'octet {downloaded}...")
+            else:
+                headers = conditional_headers
+                logging.info(f"Téléchargement de l'archive depuis {url}...")
+            try:
+                with requests.get(url, stream=True, timeout=timeout, headers=headers) as response:
+                    if response.status_code == 304:
+                        logging.info("L'archive n'a pas été modifiée depuis le dernier traitement.")
+                        return DownloadStatus.NOT_MODIFIED
+                    response.raise_for_status()  # Vérifie les erreurs HTTP (404, 500, etc.)
+
+                    resumed = downloaded and response.status_code == 206 \
+                        and response.headers.get("Content-Range", "").startswith(f"bytes {downloaded}-")
+                    if not resumed:
+                        # Premier essai, ou serveur ne supportant pas la reprise : on repart de zéro
+                        content_type = response.headers.get('Content-Type') or ''
+                        if 'application/zip' not in content_type:
+                            logging.error(f"Type de contenu inattendu : {content_type}")
+                            return DownloadStatus.FAILED
+                        checksum = hashlib.sha256()
+                        downloaded = 0
+                        new_validators = {
+                            "etag": response.headers.get("ETag"),
+                            "last_modified": response.headers.get("Last-Modified"),
+                        }
+
+                    # Sauvegarde du fichier ZIP
+                    with open(part_path, "ab" if resumed else "wb") as file:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            file.write(chunk)
+                            checksum.update(chunk)
+                            downloaded += len(chunk)
+                break
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                if attempt == max_retries:
+                    logging.error(f"Le téléchargement a échoué après {max_retries} reprises : {e}")
+                    return DownloadStatus.FAILED
+                logging.warning(f"Téléchargement interrompu ({e}).")
+
+        os.replace(part_path, file_path)
+        with open(f"{file_path}.sha256", "w", encoding="utf-8") as file:
+            file.write(f"{checksum.hexdigest()}  archive.zip\n")
+        _write_json(f"{file_path}.validators.json", new_validators)
         logging.info(f"Archive téléchargée avec succès et enregistrée sous : {file_path}.")
-        return True
+        return DownloadStatus.DOWNLOADED
 
-    except requests.exceptions.Timeout:
-        logging.error("Le téléchargement a expiré après 60 secondes.")
-        return False
     except requests.exceptions.RequestException as e:
         logging.error(f"Erreur lors du téléchargement : {e}")
-        return False
+        return DownloadStatus.FAILED
     except Exception as e:
         logging.exception(f"Erreur inattendue lors du téléchargement : {e}")
+        return DownloadStatus.FAILED
+
+
+def check_archive_integrity(file_path: str, chunk_size: int = default_chunk_size) -> bool:
+    """
+    Vérifie qu'une archive correspond à la somme SHA-256 écrite à côté d'elle lors du téléchargement.
+
+    :param file_path: str - Chemin de l'archive
+    :param chunk_size: int - Taille des blocs lus
+    :return: bool - True si la somme est présente et correspond
+    """
+    checksum_path = f"{file_path}.sha256"
+    if not os.path.isfile(checksum_path):
         return False
+    with open(checksum_path, "r", encoding="utf-8") as file:
+        expected = file.read().split()[0]
+    checksum = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            checksum.update(chunk)
+    return checksum.hexdigest() == expected
+
+
+def read_archive_validators(download_path: str) -> dict:
+    """
+    Lit l'ETag et le Last-Modified de l'archive téléchargée par `download_datatourisme_archive`.
+
+    :param download_path: str - Répertoire de téléchargement
+    :return: dict - Validateurs HTTP ("etag", "last_modified"), vide si aucune archive n'a été téléchargée
+    """
+    return _read_json(os.path.join(download_path, "archive.zip.validators.json"))
+
+
+def save_archive_validators(download_path: str, validators_path: str):
+    """
+    Enregistre l'ETag et le Last-Modified de l'archive téléchargée comme ceux de la dernière archive traitée.
+    Le prochain appel à `download_datatourisme_archive` avec ce `validators_path` sera conditionnel.
+
+    :param download_path: str - Répertoire de téléchargement
+    :param validators_path: str - Fichier des validateurs HTTP de la dernière archive traitée
+    """
+    validators = read_archive_validators(download_path)
+    if validators:
+        _write_json(validators_path, validators)
 
 
 def extract_data() -> bool:
@@ -96,22 +225,6 @@ def download_datatourisme_categories() -> bool:
     else:
         pass
 
-def download_and_get_shapefile() -> str:
-    """
-    Télécharge les données géographiques (Shapefile) via KaggleHub.
-
-    :return
-        str : Chemin vers le fichier Shapefile.
-    """
-    print("Téléchargement des données géographiques...")
-    path = kagglehub.dataset_download("abdulkerimnee/ne-110m-admin-0-countries")
-    path_to_delete = path
-    shp_path = os.path.join(path, "ne_110m_admin_0_countries", "ne_110m_admin_0_countries.shp")
-
-    if not os.path.exists(shp_path):
-        raise FileNotFoundError(f"Fichier Shapefile non trouvé : {shp_path}")
-    return shp_path, path_to_delete
-
 def cleanup_downloaded_data(path: str) -> None:
     """
     Supprime les fichiers temporaires.
@@ -0,0 +1,90 @@
+"""
+Frontière de la France mise en cache localement.
+
+La géométrie de la France est extraite une seule fois d'un Shapefile Natural Earth
+(`ne_110m_admin_0_countries`), simplifiée puis enregistrée au format WKB dans `utils/data/`,
+accompagnée de sa somme SHA-256. Le filtrage des POIs la recharge ensuite en quelques millisecondes,
+sans téléchargement ni lecture du Shapefile par geopandas.
+
+Régénération du cache :
+
+    python -m utils.france_boundary <chemin/vers/ne_110m_admin_0_countries.shp> --tolerance 0.01
+"""
+import argparse
+import hashlib
+import os
+from functools import lru_cache
+
+import shapely
+from shapely.geometry.base import BaseGeometry
+
+default_boundary_path = os.path.join(os.path.dirname(__file__), "data", "france_boundary.wkb")
+
+# Tolérance de simplification par défaut, en degrés (environ 1 km)
+default_tolerance = 0.01
+
+
+def _checksum_path(path: str) -> str:
+    return f"{path}.sha256"
+
+
+def build_france_boundary(shp_path: str, output_path: str = default_boundary_path,
+                          tolerance: float = default_tolerance) -> BaseGeometry:
+    """
+    Extrait la géométrie de la France d'un Shapefile, la simplifie et l'enregistre au format WKB
+    avec sa somme SHA-256.
+
+    :param shp_path: str - Chemin vers le Shapefile des pays
+    :param output_path: str - Chemin du fichier WKB à écrire
+    :param tolerance: float - Tolérance de simplification en degrés (0 pour ne pas simplifier)
+    :return: BaseGeometry - Géométrie enregistrée
+    """
+    # geopandas n'est nécessaire qu'à la régénération du cache : il n'est pas importé par le DAG
+    import geopandas as gpd
+
+    world = gpd.read_file(shp_path, engine="pyogrio")
+    geometry = shapely.union_all(world[world["name"] == "France"].geometry.values)
+    if geometry.is_empty:
+        raise ValueError(f"La France est absente du Shapefile : {shp_path}")
+    if tolerance > 0:
+        geometry = shapely.simplify(geometry, tolerance, preserve_topology=True)
+
+    data = shapely.to_wkb(geometry)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "wb") as file:
+        file.write(data)
+    with open(_checksum_path(output_path), "w", encoding="utf-8") as file:
+        file.write(f"{hashlib.sha256(data).hexdigest()}  {os.path.basename(output_path)}\n")
+    load_france_boundary.cache_clear()
+    return geometry
+
+
+@lru_cache(maxsize=None)
+def load_france_boundary(path: str = default_boundary_path) -> BaseGeometry:
+    """
+    Charge la géométrie de la France mise en cache après avoir vérifié sa somme SHA-256.
+    La géométrie est préparée et gardée en mémoire pour les appels suivants.
+
+    :param path: str - Chemin du fichier WKB
+    :return: BaseGeometry - Géométrie de la France
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(_checksum_path(path), "r", encoding="utf-8") as file:
+        expected = file.read().split()[0]
+    if hashlib.sha256(data).hexdigest() != expected:
+        raise ValueError(f"Somme SHA-256 invalide pour la frontière de la France : {path}")
+
+    geometry = shapely.from_wkb(data)
+    shapely.prepare(geometry)
+    return geometry
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Régénère le cache de la frontière de la France.")
+    parser.add_argument("shp_path", help="Shapefile Natural Earth des pays (ne_110m_admin_0_countries.shp)")
+    parser.add_argument("--output", default=default_boundary_path)
+    parser.add_argument("--tolerance", type=float, default=default_tolerance)
+    args = parser.parse_args()
+    boundary = build_france_boundary(args.shp_path, args.output, args.tolerance)
+    print(f"{args.output} : {shapely.get_num_coordinates(boundary)} points, {os.path.getsize(args.output)} octets")
@@ -2,19 +2,18 @@ import pandas as pd
 import numpy as np
 import hdbscan
 from sklearn.metrics import pairwise_distances
-from pyproj import Transformer
 import math
-
-# EPSG:9794 est le code EPSG pour la projection "RGF93 v2b / Lambert-93" utilisée en France
-# cf https://fr.wikipedia.org/wiki/Projection_conique_conforme_de_Lambert#Lambert_93
-transformer = Transformer.from_crs("EPSG:4326", "EPSG:9794", always_xy=True)
+from utils.point_of_interest_helper import lambert93_xy
 
 
 def compute_xy(lat: float, lon: float):
-  try:
-    return tuple(map(int, transformer.transform(lon, lat)))
-  except OverflowError:
+  """
+  Projection Lambert-93 d'un seul point, voir `lambert93_xy` pour des tableaux de coordonnées
+  """
+  x, y = lambert93_xy([lat], [lon])
+  if np.isnan(x[0]):
     return math.nan, math.nan
+  return int(x[0]), int(y[0])
 
 
 class GeoClustering:
@@ -24,19 +23,28 @@ class GeoClustering:
     :param pois: pd.DataFrame - Les POIs à regrouper
     :param longitude_column: str - nom de la colonne des longitudes dans le dataframe
     :param latitude_column: str - nom de la colonne des latitudes dans le dataframe
+    Si le dataframe a déjà des colonnes x et y (coordonnées Lambert-93 enregistrées en base),
+    seules les coordonnées manquantes sont calculées
     """
     self.pois = pois
     self.__add_lambert_metric_coordinates(longitude_column, latitude_column)
     self.__clusters = pd.DataFrame()
 
   def __add_lambert_metric_coordinates(self, longitude_column: str, latitude_column: str):
-    self.lambert = self.pois.apply(
-      lambda poi: compute_xy(poi[latitude_column], poi[longitude_column]),
-      axis=1, result_type='expand'
-    )
-    self.pois[['x', 'y']] = self.lambert
+    if {'x', 'y'} <= set(self.pois.columns):
+      x = self.pois['x'].to_numpy(dtype=float, na_value=np.nan)
+      y = self.pois['y'].to_numpy(dtype=float, na_value=np.nan)
+    else:
+      x = y = np.full(len(self.pois), np.nan)
+    missing = np.isnan(x) | np.isnan(y)
+    if missing.any():
+      x, y = x.copy(), y.copy()
+      x[missing], y[missing] = lambert93_xy(
+        self.pois[latitude_column].to_numpy(dtype=float)[missing], self.pois[longitude_column].to_numpy(dtype=float)[missing]
+      )
+    self.pois['x'], self.pois['y'] = x, y
     self.pois = self.pois.dropna()
-    self.lambert = self.lambert.dropna()
+    self.lambert = self.pois[['x', 'y']]
 
   def create_clusters(self, min_cluster_size: int = 15, min_samples: int = 1):
     """
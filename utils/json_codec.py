@@ -0,0 +1,87 @@
+"""
+Encodage et décodage JSON avec le backend le plus rapide disponible.
+
+Le backend est choisi parmi `orjson`, `msgspec` et la bibliothèque standard `json`, dans cet ordre
+de préférence, selon les bibliothèques installées. La variable d'environnement **JSON_BACKEND**
+permet d'imposer un backend.
+
+Tous les backends décodent directement des `bytes` (par exemple le contenu de `zip_ref.open()`)
+sans étape de décodage en texte, et `dumps` renvoie toujours des `bytes`.
+"""
+import json
+import os
+
+
+def _json_dumps(obj) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+backends = {"json": (json.loads, _json_dumps)}
+_decode_errors = [json.JSONDecodeError]
+
+try:
+    import orjson
+
+    backends["orjson"] = (orjson.loads, orjson.dumps)
+except ImportError:
+    pass
+
+try:
+    import msgspec
+
+    backends["msgspec"] = (msgspec.json.Decoder().decode, msgspec.json.Encoder().encode)
+    _decode_errors.append(msgspec.DecodeError)
+except ImportError:
+    pass
+
+# Exceptions levées par `loads` lorsque le contenu n'est pas un JSON valide
+DecodeError = tuple(_decode_errors)
+
+_preferred_backends = ["orjson", "msgspec", "json"]
+
+
+def select_backend(name: str | None = None) -> str:
+    """
+    Sélectionne le backend JSON utilisé par `loads` et `dumps`
+
+    :param name: str | None - nom du backend ("orjson", "msgspec" ou "json"),
+        par défaut la variable d'environnement JSON_BACKEND ou le plus rapide des backends installés
+    :return: str - le nom du backend sélectionné
+    """
+    global backend, _loads, _dumps
+    name = name or os.environ.get("JSON_BACKEND") or next(n for n in _preferred_backends if n in backends)
+    if name not in backends:
+        raise ValueError(f"Backend JSON indisponible : {name} (disponibles : {', '.join(backends)})")
+    backend = name
+    _loads, _dumps = backends[name]
+    return name
+
+
+backend = select_backend()
+
+
+def loads(data: bytes | str):
+    """
+    Décode un contenu JSON
+    :param data: bytes | str - le contenu JSON, de préférence en bytes
+    :return: l'objet Python décodé
+    """
+    return _loads(data)
+
+
+def load(file):
+    """
+    Décode le contenu JSON d'un fichier ouvert en mode binaire
+    :param file: fichier ouvert en mode binaire (ex: `zip_ref.open(...)`)
+    :return: l'objet Python décodé
+    """
+    return _loads(file.read())
+
+
+def dumps(obj) -> bytes:
+    """
+    Encode un objet Python en JSON
+    :param obj: l'objet à encoder (dict, list, str, int, float, bool, None)
+    :return: bytes - le contenu JSON encodé en UTF-8
+    """
+    return _dumps(obj)
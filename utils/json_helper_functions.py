@@ -1,77 +1,228 @@
 import json
-from .point_of_interest_helper import Poi, PoiMetadata, Category, City, Departement, Region
+from . import json_codec
+from .point_of_interest_helper import Poi, PoiTable, PoiMetadata, Category, City, Departement, Region, geography_registry, poi_content_hash
 import zipfile
-from typing import List
+from typing import List, Iterable, Iterator, Tuple
+from itertools import islice
+from dataclasses import dataclass
 from datetime import datetime
 import os
-import geopandas as gpd
+import numpy as np
+import shapely
+from shapely.geometry.base import BaseGeometry
 import multiprocessing
+import multiprocessing.util
 from dateutil.parser import isoparse
 
-def get_poi_identifier(filename: str) -> str | None:
+@dataclass
+class PoiRecord:
     """
-    Récupère l'identifiant du point d'intérêt dans le fichier JSON
-    :param filename: str
-    :return: str | None si l'identifiant n'est pas trouvé
+    Ensemble des champs d'un fichier JSON DataTourisme, extraits en une seule lecture.
+    Les champs introuvables valent None (sauf `creation_date`, cf `get_poi_creation_date`).
     """
-    with open(filename, "r", encoding="utf-8") as file:
-        content = json.load(file)
+    identifier: str | None
+    name: str | None
+    creation_date: str | None
+    update_date: str | None
+    categories: list | None
+    region_id: str | None
+    region_name: str | None
+    departement_id: str | None
+    departement_name: str | None
+    city_id: str | None
+    city_name: str | None
+    postal_code: str | None
+    latitude: float | None
+    longitude: float | None
+
+
+# Erreurs d'un champ absent ou mal formé (liste vide, valeur null, coordonnée non numérique...) :
+# l'extracteur renvoie None au lieu d'interrompre la lecture des autres champs
+_field_errors = (KeyError, IndexError, TypeError, ValueError)
+
+
+def _load_json_file(filename: str) -> dict:
+    with open(filename, "rb") as file:
+        return json_codec.load(file)
+
+
+def _poi_identifier(content: dict) -> str | None:
     try:
         _poi_id = content["dc:identifier"]
         return _poi_id
-    except KeyError as e:
+    except _field_errors as e:
         print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
         return None
 
 
-def get_poi_name(filename: str) -> str | None:
-    """
-    Récupère le nom du point d'intérêt dans le fichier JSON
-    :param filename: str
-    :return: str | None si le nom n'est pas trouvé
-    """
-    with open(filename, "r", encoding="utf-8") as file:
-        content = json.load(file)
+def _poi_name(content: dict) -> str | None:
     try:
         _poi_name = content["rdfs:label"]["fr"][0]
         return _poi_name
-    except KeyError as e:
+    except _field_errors as e:
         print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
         return None
 
 
-def get_poi_creation_date(filename: str) -> str | None:
-    """
-    Récupère la date de création du point d'intérêt dans le fichier JSON
-    :param filename: str
-    :return: str | None si la date de création n'est pas trouvée
-    """
-    with open(filename, "r", encoding="utf-8") as file:
-        content = json.load(file)
+def _poi_creation_date(content: dict) -> str | None:
     try:
         _poi_created_date = content["creationDate"]
         return _poi_created_date
-    except KeyError as e:
+    except _field_errors as e:
         print(f"Erreur de clé: {e}. Clé introuvable.")
         print("Renvoi d'une valeur par défaut")
         default_timestamp = "1970-01-01T00:00:00Z"
         return default_timestamp
 
 
+def _poi_update_date(content: dict) -> str | None:
+    try:
+        _poi_updated_date = content["lastUpdateDatatourisme"]
+        return _poi_updated_date
+    except _field_errors as e:
+        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
+        return None
+
+
+def _poi_category(content: dict) -> list | None:
+    try:
+        _poi_category = content["@type"]
+        return _poi_category
+    except _field_errors as e:
+        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
+        return None
+
+
+def _poi_region(content: dict) -> tuple[str, str] | tuple[None, None]:
+    try:
+        _poi_region_id = content["isLocatedAt"][0]["schema:address"][0][
+            "hasAddressCity"
+        ]["isPartOfDepartment"]["isPartOfRegion"]["@id"]
+        _poi_region_name = content["isLocatedAt"][0]["schema:address"][0][
+            "hasAddressCity"
+        ]["isPartOfDepartment"]["isPartOfRegion"]["rdfs:label"]["fr"][0]
+        return _poi_region_id, _poi_region_name
+    except _field_errors as e:
+        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
+        return None, None
+
+
+def _poi_department(content: dict) -> tuple[str, str] | tuple[None, None]:
+    try:
+        _poi_department_id = content["isLocatedAt"][0]["schema:address"][0][
+            "hasAddressCity"
+        ]["isPartOfDepartment"]["@id"]
+        _poi_department_name = content["isLocatedAt"][0]["schema:address"][0][
+            "hasAddressCity"
+        ]["isPartOfDepartment"]["rdfs:label"]["fr"][0]
+        return _poi_department_id, _poi_department_name
+    except _field_errors as e:
+        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
+        return None, None
+
+
+def _poi_city(content: dict) -> tuple[str, str] | tuple[None, None]:
+    try:
+        _poi_city_id = content["isLocatedAt"][0]["schema:address"][0]["hasAddressCity"][
+            "@id"
+        ]
+        _poi_city = content["isLocatedAt"][0]["schema:address"][0]["hasAddressCity"][
+            "rdfs:label"
+        ]["fr"][0]
+        return _poi_city_id, _poi_city
+    except _field_errors as e:
+        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
+        return None, None
+
+
+def _poi_postal_code(content: dict) -> str | None:
+    try:
+        _poi_postcode = content["isLocatedAt"][0]["schema:address"][0][
+            "schema:postalCode"
+        ]
+        return _poi_postcode
+    except _field_errors as e:
+        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
+        return None
+
+
+def _poi_coordinates(content: dict) -> tuple[float, float] | tuple[None, None]:
+    try:
+        _poi_lat = float(content["isLocatedAt"][0]["schema:geo"]["schema:latitude"])
+        _poi_long = float(content["isLocatedAt"][0]["schema:geo"]["schema:longitude"])
+        return _poi_lat, _poi_long
+    except _field_errors as e:
+        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
+        return None, None
+
+
+# Champs de PoiRecord renseignés par chaque extracteur
+_record_extractors = (
+    (("identifier",), _poi_identifier),
+    (("name",), _poi_name),
+    (("creation_date",), _poi_creation_date),
+    (("update_date",), _poi_update_date),
+    (("categories",), _poi_category),
+    (("region_id", "region_name"), _poi_region),
+    (("departement_id", "departement_name"), _poi_department),
+    (("city_id", "city_name"), _poi_city),
+    (("postal_code",), _poi_postal_code),
+    (("latitude", "longitude"), _poi_coordinates),
+)
+
+
+def get_poi_record(filename: str, fields: Iterable[str] = None) -> PoiRecord:
+    """
+    Récupère les champs du point d'intérêt en ne lisant et parsant le fichier JSON qu'une seule fois
+    Seuls les champs demandés sont extraits : un champ absent ou mal formé parmi les autres est ignoré
+    :param filename: str
+    :param fields: Iterable[str] - Champs de PoiRecord à extraire (tous par défaut), les autres valent None
+    :return: PoiRecord
+    """
+    content = _load_json_file(filename)
+    fields = set(fields) if fields is not None else None
+    values = dict.fromkeys(PoiRecord.__dataclass_fields__)
+    for names, extractor in _record_extractors:
+        if fields is None or fields.intersection(names):
+            value = extractor(content)
+            values.update(zip(names, value if len(names) > 1 else (value,)))
+    return PoiRecord(**values)
+
+
+def get_poi_identifier(filename: str) -> str | None:
+    """
+    Récupère l'identifiant du point d'intérêt dans le fichier JSON
+    :param filename: str
+    :return: str | None si l'identifiant n'est pas trouvé
+    """
+    return _poi_identifier(_load_json_file(filename))
+
+
+def get_poi_name(filename: str) -> str | None:
+    """
+    Récupère le nom du point d'intérêt dans le fichier JSON
+    :param filename: str
+    :return: str | None si le nom n'est pas trouvé
+    """
+    return _poi_name(_load_json_file(filename))
+
+
+def get_poi_creation_date(filename: str) -> str | None:
+    """
+    Récupère la date de création du point d'intérêt dans le fichier JSON
+    :param filename: str
+    :return: str | None si la date de création n'est pas trouvée
+    """
+    return _poi_creation_date(_load_json_file(filename))
+
+
 def get_poi_update_date(filename: str) -> str | None:
     """
     Récupère la date de mise à jour du point d'intérêt dans le fichier JSON
     :param filename: str
     :return: str | None si la date de mise à jour n'est pas trouvée
     """
-    with open(filename, "r", encoding="utf-8") as file:
-        content = json.load(file)
-    try:
-        _poi_updated_date = content["lastUpdateDatatourisme"]
-        return _poi_updated_date
-    except KeyError as e:
-        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
-        return None
+    return _poi_update_date(_load_json_file(filename))
 
 
 def find_last_update_by_label(label: str) -> str | None:
@@ -95,14 +246,7 @@ def get_poi_category(filename: str) -> list | None:
     :param filename: str
     :return: str | None si la catégorie n'est pas trouvée
     """
-    with open(filename, "r", encoding="utf-8") as file:
-        content = json.load(file)
-    try:
-        _poi_category = content["@type"]
-        return _poi_category
-    except KeyError as e:
-        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
-        return None
+    return _poi_category(_load_json_file(filename))
 
 
 def category_cleanup(category_list: list) -> list:
@@ -126,19 +270,7 @@ def get_poi_region(filename: str) -> tuple[str, str] | tuple[None, None]:
     :param filename: str
     :return: str | None si la région n'est pas trouvée
     """
-    with open(filename, "r", encoding="utf-8") as file:
-        content = json.load(file)
-    try:
-        _poi_region_id = content["isLocatedAt"][0]["schema:address"][0][
-            "hasAddressCity"
-        ]["isPartOfDepartment"]["isPartOfRegion"]["@id"]
-        _poi_region_name = content["isLocatedAt"][0]["schema:address"][0][
-            "hasAddressCity"
-        ]["isPartOfDepartment"]["isPartOfRegion"]["rdfs:label"]["fr"][0]
-        return _poi_region_id, _poi_region_name
-    except KeyError as e:
-        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
-        return None, None
+    return _poi_region(_load_json_file(filename))
 
 
 def get_poi_department(filename: str) -> tuple[str, str] | tuple[None, None]:
@@ -147,19 +279,7 @@ def get_poi_department(filename: str) -> tuple[str, str] | tuple[None, None]:
     :param filename: str
     :return: str | None si le département n'est pas trouvé
     """
-    with open(filename, "r", encoding="utf-8") as file:
-        content = json.load(file)
-    try:
-        _poi_department_id = content["isLocatedAt"][0]["schema:address"][0][
-            "hasAddressCity"
-        ]["isPartOfDepartment"]["@id"]
-        _poi_department_name = content["isLocatedAt"][0]["schema:address"][0][
-            "hasAddressCity"
-        ]["isPartOfDepartment"]["rdfs:label"]["fr"][0]
-        return _poi_department_id, _poi_department_name
-    except KeyError as e:
-        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
-        return None, None
+    return _poi_department(_load_json_file(filename))
 
 
 def get_poi_city(filename: str) -> tuple[str, str] | tuple[None, None]:
@@ -168,20 +288,7 @@ def get_poi_city(filename: str) -> tuple[str, str] | tuple[None, None]:
     :param filename: str
     :return: str | None si la ville n'est pas trouvée
     """
-    with open(filename, "r", encoding="utf-8") as file:
-        content = json.load(file)
-    try:
-        _poi_city_id = content["isLocatedAt"][0]["schema:address"][0]["hasAddressCity"][
-            "@id"
-        ]
-        _poi_city = content["isLocatedAt"][0]["schema:address"][0]["hasAddressCity"][
-            "rdfs:label"
-        ]["fr"][0]
-        # _poi_postcode = content["isLocatedAt"][0]["schema:address"][0]["schema:postalCode"]
-        return _poi_city_id, _poi_city
-    except KeyError as e:
-        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
-        return None, None
+    return _poi_city(_load_json_file(filename))
 
 
 def get_poi_postal_code(filename: str) -> str | None:
@@ -190,16 +297,7 @@ def get_poi_postal_code(filename: str) -> str | None:
     :param filename: str
     :return: str | None si le code postal n'est pas trouvé
     """
-    with open(filename, "r", encoding="utf-8") as file:
-        content = json.load(file)
-    try:
-        _poi_postcode = content["isLocatedAt"][0]["schema:address"][0][
-            "schema:postalCode"
-        ]
-        return _poi_postcode
-    except KeyError as e:
-        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
-        return None
+    return _poi_postal_code(_load_json_file(filename))
 
 
 def get_poi_coordinates(filename: str) -> tuple[float, float] | tuple[None, None]:
@@ -208,15 +306,7 @@ def get_poi_coordinates(filename: str) -> tuple[float, float] | tuple[None, None
     :param filename: str
     :return: Tuple[float, float] | None si les coordonnées ne sont pas trouvées
     """
-    with open(filename, "r", encoding="utf-8") as file:
-        content = json.load(file)
-    try:
-        _poi_lat = float(content["isLocatedAt"][0]["schema:geo"]["schema:latitude"])
-        _poi_long = float(content["isLocatedAt"][0]["schema:geo"]["schema:longitude"])
-        return _poi_lat, _poi_long
-    except KeyError as e:
-        print(f"Erreur de clé: {e}. Vérifier la structure et recommencer.")
-        return None, None
+    return _poi_coordinates(_load_json_file(filename))
 
 def parse_poi_from_json(json_data: dict) -> Poi:
     """
@@ -289,16 +379,16 @@ def parse_poi_from_json(json_data: dict) -> Poi:
                             region_id = region_info.get("@id", "UnknownRegionID")
 
         # Construire les objets hiérarchiques
-        region = Region(name=region_name, id=region_id)
-        departement = Departement(name=departement_name, id=departement_id, region=region)
-        city = City(name=city_name, id=city_id, departement=departement)
+        region = geography_registry.region(name=region_name, id=region_id)
+        departement = geography_registry.departement(name=departement_name, id=departement_id, region=region)
+        city = geography_registry.city(name=city_name, id=city_id, departement=departement)
 
         # Extraire les catégories
         categories = []
         if "@type" in json_data and isinstance(json_data["@type"], list):
             for category_type in json_data["@type"]:
                 if not (category_type.startswith("schema:") or category_type.startswith("olo:")):
-                    categories.append(Category(name=category_type, id=None)) 
+                    categories.append(geography_registry.category(name=category_type, id=None))
         # Construire l'objet Poi
         poi = Poi(
             id=poi_id,
@@ -313,6 +403,8 @@ def parse_poi_from_json(json_data: dict) -> Poi:
             categories=categories,
             osm_node_id=None
         )
+        # Empreinte du contenu, comparée à celle de la base pour ne pas réécrire un POI inchangé
+        poi.content_hash = poi_content_hash(poi)
 
         return poi
     except KeyError as e:
@@ -326,6 +418,62 @@ def parse_poi_from_json(json_data: dict) -> Poi:
         raise
 
 
+def iter_pois(zip_path: str, poi_metadata_list: Iterable[PoiMetadata]) -> Iterator[Poi]:
+    """
+    Lit un à un les POIs (Points of Interest) à partir des fichiers référencés dans les métadonnées.
+    Chaque POI est produit dès qu'il est parsé : aucune liste complète n'est construite en mémoire.
+
+    :param
+        - zip_path (str) : Chemin vers l'archive ZIP contenant les fichiers.
+        - poi_metadata_list (Iterable[PoiMetadata]) : Métadonnées des POIs à lire.
+
+    :return
+        - Iterator[Poi] : Générateur des objets Poi extraits et parsés.
+    """
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            yield from _iter_pois_from_zip(zip_ref, (metadata.file_path for metadata in poi_metadata_list))
+    except Exception as e:
+        print(f"Erreur lors de l'ouverture de l'archive : {str(e)}")
+
+
+def _iter_pois_from_zip(zip_ref: zipfile.ZipFile, file_paths: Iterable[str]) -> Iterator[Poi]:
+    for path in file_paths:
+        file_path = os.path.join("objects", path)
+        try:
+            with zip_ref.open(file_path) as poi_file:
+                json_data = json_codec.load(poi_file)
+            poi = parse_poi_from_json(json_data)  # Transformer en objet Poi
+        except KeyError:
+            print(f"Fichier {file_path} introuvable dans l'archive.")
+            continue
+        except json_codec.DecodeError:
+            print(f"Erreur : le fichier {file_path} n'est pas un JSON valide.")
+            continue
+        except Exception as e:
+            print(f"Erreur inattendue pour {file_path} : {str(e)}")
+            continue
+        yield poi
+
+
+def iter_poi_batches(zip_path: str, poi_metadata_list: Iterable[PoiMetadata], batch_size: int = 1000) -> Iterator[List[Poi]]:
+    """
+    Lit les POIs de l'archive par lots de `batch_size`.
+    La mémoire utilisée est bornée par la taille d'un lot et non par celle de l'archive.
+
+    :param
+        - zip_path (str) : Chemin vers l'archive ZIP contenant les fichiers.
+        - poi_metadata_list (Iterable[PoiMetadata]) : Métadonnées des POIs à lire.
+        - batch_size (int) : Nombre maximal de POIs par lot.
+
+    :return
+        - Iterator[List[Poi]] : Générateur de listes d'objets Poi.
+    """
+    pois = iter_pois(zip_path, poi_metadata_list)
+    while batch := list(islice(pois, batch_size)):
+        yield batch
+
+
 # Fonction pour lire tous les POIs depuis les fichiers référencés dans les métadonnées
 def get_all_poi(zip_path: str, poi_metadata_list: List[PoiMetadata]) -> List[Poi]:
     """
@@ -339,30 +487,10 @@ def get_all_poi(zip_path: str, poi_metadata_list: List[PoiMetadata]) -> List[Poi
         - List[Poi] : Liste des objets Poi extraits et parsés.
     """
     pois = []
-    try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            i = 0
-            start_run = datetime.now()
-            for metadata in poi_metadata_list:
-                file_path = os.path.join("objects", metadata.file_path)
-                # Vérifier si le fichier existe (correspondance exacte ou approximative)
-                i += 1
-                if i % 10000 == 0:
-                    print(i, "/", len(poi_metadata_list), datetime.now() - start_run)
-                try:
-                    # Lire le fichier JSON
-                    with zip_ref.open(file_path) as poi_file:
-                        json_data = json.load(poi_file)
-                        poi = parse_poi_from_json(json_data)  # Transformer en objet Poi
-                        pois.append(poi)
-                except KeyError:
-                    print(f"Fichier {file_path} introuvable dans l'archive.")
-                except json.JSONDecodeError:
-                    print(f"Erreur : le fichier {file_path} n'est pas un JSON valide.")
-                except Exception as e:
-                    print(f"Erreur inattendue pour {file_path} : {str(e)}")
-    except Exception as e:
-        print(f"Erreur lors de l'ouverture de l'archive : {str(e)}")
+    start_run = datetime.now()
+    for batch in iter_poi_batches(zip_path, poi_metadata_list, batch_size=10000):
+        pois.extend(batch)
+        print(len(pois), "/", len(poi_metadata_list), datetime.now() - start_run)
     return pois
 
 def get_all_poi_metadata(zip_path) -> List[PoiMetadata]:
@@ -386,10 +514,8 @@ def get_all_poi_metadata(zip_path) -> List[PoiMetadata]:
             # Lire `index.json`
             print("Lecture de `index.json`")
             with zip_ref.open('index.json') as index_file:
-                content = index_file.read().decode('utf-8')
-
                 # Charger et traiter les données JSON
-                index_data = json.loads(content)
+                index_data = json_codec.load(index_file)
                 poi_metadata_list = []
                 for item in index_data:
                     # Vérifier les clés dans chaque objet
@@ -409,46 +535,77 @@ def get_all_poi_metadata(zip_path) -> List[PoiMetadata]:
 
     except KeyError as e:
         print(f"Erreur : {str(e)}")
-    except json.JSONDecodeError as e:
+    except json_codec.DecodeError as e:
         print(f"Erreur : Problème de parsing JSON - {str(e)}")
     except Exception as e:
         print(f"Erreur inattendue : {str(e)}")
         return []
     
-def get_france_geometry(shp_path: str) -> gpd.GeoDataFrame:
+def _coordinate_array(values) -> np.ndarray:
+    if isinstance(values, np.ndarray) and values.dtype.kind == "f":
+        return values
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+
+def france_mask(latitudes, longitudes, france_geometry: BaseGeometry) -> np.ndarray:
     """
-    Charge les données géographiques et extrait la géométrie de la France.
+    Calcule en une seule passe vectorisée quelles coordonnées sont situées en France.
+    Un pré-filtre sur l'emprise (bounding box) de la France écarte d'abord les points les plus éloignés,
+    puis le test d'inclusion est réalisé sur la géométrie préparée pour tous les points restants.
 
     :param
-        shp_path (str): Chemin vers le fichier Shapefile.
+        latitudes: Tableau (ou séquence) des latitudes, None ou NaN si inconnues.
+        longitudes: Tableau (ou séquence) des longitudes, None ou NaN si inconnues.
+        france_geometry (BaseGeometry): Géométrie de la France (voir `load_france_boundary`),
+            ou GeoDataFrame dont les géométries sont réunies.
 
     :return
-        gpd.GeoDataFrame : Géométrie de la France.
+        np.ndarray : Masque booléen, True pour les coordonnées situées en France.
     """
-    world = gpd.read_file(shp_path, engine="pyogrio")
-    return world[world['name'] == 'France']
+    latitudes = _coordinate_array(latitudes)
+    longitudes = _coordinate_array(longitudes)
+    if hasattr(france_geometry, "geometry"):
+        france_geometry = shapely.union_all(france_geometry.geometry.values)
+    min_x, min_y, max_x, max_y = france_geometry.bounds
+    mask = (longitudes >= min_x) & (longitudes <= max_x) & (latitudes >= min_y) & (latitudes <= max_y)
+    shapely.prepare(france_geometry)
+    mask[mask] = shapely.contains_xy(france_geometry, longitudes[mask], latitudes[mask])
+    return mask
 
-def filter_poi_in_france(pois: list[Poi], france_geometry: gpd.GeoDataFrame) -> list[str]:
+
+def poi_in_france_mask(pois: list[Poi] | PoiTable, france_geometry: BaseGeometry) -> np.ndarray:
     """
-    Filtre les POI pour ne garder que ceux situés en France.
+    Calcule pour chaque POI s'il est situé en France.
 
     :param
-        pois (list[POI]): Liste des objets POI.
-        france_geometry (gpd.GeoDataFrame): Géométrie de la France.
+        pois (list[POI] | PoiTable): Liste ou table des POIs.
+        france_geometry (BaseGeometry): Géométrie de la France (voir `france_mask`).
 
     :return
-        list[str] : Liste des chemins des fichiers JSON des POI en France.
+        np.ndarray : Masque booléen aligné sur les POIs.
     """
-    poi_in_france_files = []
+    if isinstance(pois, PoiTable):
+        return france_mask(pois.latitudes, pois.longitudes, france_geometry)
+    return france_mask([poi.latitude for poi in pois], [poi.longitude for poi in pois], france_geometry)
 
-    for poi in pois:
-        try:
-            point = poi.to_point()
-            if france_geometry.geometry.contains(point).any():
-                poi_in_france_files.append(poi)
-        except Exception as e:
-            print(f"Erreur lors du traitement de {poi} : {e}")
-    return poi_in_france_files
+
+def filter_poi_in_france(pois: list[Poi] | PoiTable, france_geometry: BaseGeometry) -> list[Poi] | PoiTable:
+    """
+    Filtre les POI pour ne garder que ceux situés en France.
+    Les POIs sans coordonnées valides sont écartés.
+
+    :param
+        pois (list[POI] | PoiTable): Liste ou table des POIs.
+        france_geometry (BaseGeometry): Géométrie de la France (voir `france_mask`).
+
+    :return
+        list[Poi] | PoiTable : POIs en France, dans le même format que `pois`.
+    """
+    if isinstance(pois, PoiTable):
+        return pois.take(poi_in_france_mask(pois, france_geometry))
+    pois = list(pois)
+    mask = poi_in_france_mask(pois, france_geometry)
+    return [poi for poi, in_france in zip(pois, mask) if in_france]
 
 def parse_poi_batch(zip_path: str, batch_metadata: List[PoiMetadata]) -> List[Poi]:
     """
@@ -461,29 +618,66 @@ def parse_poi_batch(zip_path: str, batch_metadata: List[PoiMetadata]) -> List[Po
     Returns:
         List[Poi]: Liste des objets POI extraits.
     """
-    pois = []
-    try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            for metadata in batch_metadata:
-                file_path = os.path.join("objects", metadata.file_path)
-                try:
-                    with zip_ref.open(file_path) as poi_file:
-                        json_data = json.load(poi_file)
-                        poi = parse_poi_from_json(json_data)
-                        pois.append(poi)
-                except KeyError:
-                    print(f"Fichier {file_path} introuvable dans l'archive.")
-                except json.JSONDecodeError:
-                    print(f"Erreur : le fichier {file_path} n'est pas un JSON valide.")
-                except Exception as e:
-                    print(f"Erreur inattendue pour {file_path} : {str(e)}")
-    except Exception as e:
-        print(f"Erreur lors de l'ouverture de l'archive : {str(e)}")
-    return pois
+    return list(iter_pois(zip_path, batch_metadata))
+
+# Archive et chemins des fichiers propres à chaque processus du pool de parsing parallèle
+_worker_zip_ref: zipfile.ZipFile | None = None
+_worker_file_paths: List[str] = []
+
+
+def _init_poi_worker(zip_path: str, file_paths: List[str]):
+    """
+    Initialisation d'un processus du pool : l'archive n'est ouverte qu'une seule fois par processus
+    et les chemins des fichiers ne sont transmis qu'une seule fois.
+    Le registre hérité du processus parent (par fork) est vidé.
+    """
+    global _worker_zip_ref, _worker_file_paths
+    geography_registry.clear()
+    _worker_zip_ref = zipfile.ZipFile(zip_path, 'r')
+    # L'archive est fermée à la fin du processus
+    multiprocessing.util.Finalize(None, _worker_zip_ref.close, exitpriority=10)
+    _worker_file_paths = file_paths
+
+
+def _parse_poi_range(poi_range: Tuple[int, int]) -> List[Poi]:
+    start, stop = poi_range
+    return list(_iter_pois_from_zip(_worker_zip_ref, _worker_file_paths[start:stop]))
+
+
+def iter_poi_batches_parallel(zip_path: str, poi_metadata_list: List[PoiMetadata], batch_size: int = 1000, processes: int | None = None) -> Iterator[List[Poi]]:
+    """
+    Lire et parser les POIs d'une archive ZIP en parallèle, en produisant chaque lot dès qu'il est prêt.
+
+    Chaque processus ouvre l'archive une seule fois et ne reçoit que des intervalles d'indices
+    dans la liste des métadonnées. Les lots sont produits dans leur ordre de fin de traitement,
+    qui n'est pas nécessairement celui des métadonnées.
+
+    Args:
+        zip_path (str): Chemin vers l'archive ZIP contenant les fichiers JSON.
+        poi_metadata_list (List[PoiMetadata]): Liste des métadonnées des POIs.
+        batch_size (int): Taille des batches pour le traitement parallèle.
+        processes (int | None): Nombre de processus (par défaut le nombre de CPU).
+
+    Returns:
+        Iterator[List[Poi]]: Générateur des lots de POIs extraits.
+    """
+    file_paths = [metadata.file_path for metadata in poi_metadata_list]
+    ranges = [(i, min(i + batch_size, len(file_paths))) for i in range(0, len(file_paths), batch_size)]
+    with multiprocessing.Pool(
+        processes=processes or multiprocessing.cpu_count(),
+        initializer=_init_poi_worker,
+        initargs=(zip_path, file_paths)
+    ) as pool:
+        yield from pool.imap_unordered(_parse_poi_range, ranges)
+        # Arrêt normal des processus (et non `terminate` à la sortie du bloc) pour qu'ils ferment l'archive
+        pool.close()
+        pool.join()
+
 
 def get_all_poi_parallel(zip_path: str, poi_metadata_list: List[PoiMetadata], batch_size: int = 1000) -> List[Poi]:
     """
     Lire et parser tous les POIs depuis une archive ZIP en parallèle.
+    L'ordre des POIs n'est pas nécessairement celui des métadonnées.
 
     Args:
         zip_path (str): Chemin vers l'archive ZIP contenant les fichiers JSON.
@@ -493,13 +687,5 @@ def get_all_poi_parallel(zip_path: str, poi_metadata_list: List[PoiMetadata], ba
     Returns:
         List[Poi]: Liste complète des POIs extraits.
     """
-    # Diviser les métadonnées en batches
-    batches = [poi_metadata_list[i:i + batch_size] for i in range(0, len(poi_metadata_list), batch_size)]
-    # Initialiser un pool de processus
-    with multiprocessing.Pool(processes=multiprocessing.cpu_count()) as pool:
-        # Appliquer parse_poi_batch à chaque batch en parallèle
-        results = pool.starmap(parse_poi_batch, [(zip_path, batch) for batch in batches])
-    
     # Fusionner les résultats de tous les batches
-    all_pois = [poi for batch in results for poi in batch]
-    return all_pois
\ No newline at end of file
+    return [poi for batch in iter_poi_batches_parallel(zip_path, poi_metadata_list, batch_size) for poi in batch]
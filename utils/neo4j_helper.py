@@ -1,10 +1,11 @@
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict, List, Iterable
+from itertools import islice
 import os
 import re
 import neo4j as neo4j
 import pandas as pd
-from pyproj import Transformer
-from utils.point_of_interest_helper import Poi
+import numpy as np
+from utils.point_of_interest_helper import Poi, PoiTable, poi_xy
 
 
 def connect_to_neo4j() -> neo4j.Driver:
@@ -18,39 +19,48 @@ def connect_to_neo4j() -> neo4j.Driver:
   )
 
 
-# EPSG:9794 est le code EPSG pour la projection "RGF93 v2b / Lambert-93" utilisée en France
-# cf https://fr.wikipedia.org/wiki/Projection_conique_conforme_de_Lambert#Lambert_93
-transformer = Transformer.from_crs("EPSG:4326", "EPSG:9794", always_xy=True)
-
-
 def _encode_poi(poi: Poi) -> dict | None:
-  try:
-    x, y = transformer.transform(poi.longitude, poi.latitude)
-    return {'id': poi.id, 'name': poi.name, 'x': int(x), 'y': int(y)}
-  except OverflowError:
+  x, y = poi_xy(poi)
+  if x is None:
     return None
+  return {'id': poi.id, 'name': poi.name, 'x': x, 'y': y}
+
 
+def _encode_poi_table(table: PoiTable) -> Iterable[dict]:
+  # Coordonnées Lambert-93 calculées à la construction de la table, ou lues en base
+  valid = np.flatnonzero(np.isfinite(table.x) & np.isfinite(table.y))
+  ids, names, x, y = table.ids[valid], table.names[valid], table.x[valid].astype(np.int64), table.y[valid].astype(np.int64)
+  return ({'id': ids[i], 'name': names[i], 'x': int(x[i]), 'y': int(y[i])} for i in range(len(valid)))
 
-def import_pois(driver: neo4j.Driver, pois: List[Poi]):
+
+def import_pois(driver: neo4j.Driver, pois: Iterable[Poi] | PoiTable, batch_size: int = 10000):
   '''
   Importe une liste de POIS dans neo4j
   Si le POI n'existe pas, il est créé. S'il existe déjà avec le même identifiant, il est modifié.
-  Les coordonnées x,y de chaque POI sont calculées et importées à partir des latitude et longitude
+  Les coordonnées Lambert-93 x,y de chaque POI sont importées : celles du POI (ou de la PoiTable, calculées
+  en une seule passe sur les colonnes à sa construction), sinon calculées à partir des latitude et longitude
+  Les POIs peuvent être fournis par un générateur : ils sont encodés et importés par lots de `batch_size`
 
   :param driver:
   :param pois: Les POIs à importer
+  :param batch_size: Nombre de POIs envoyés à neo4j par requête
   :return:
   '''
+  if isinstance(pois, PoiTable):
+    encoded_pois = _encode_poi_table(pois)
+  else:
+    encoded_pois = (d for poi in pois if (d := _encode_poi(poi)) is not None)
   with driver.session() as session:
     try:
       session.run("CREATE INDEX IF NOT EXISTS FOR (poi:POI) ON (poi.id)")
     except Exception as e:
       print('Ignoring Exception', e)
-    session.run("""
-            UNWIND $pois AS poi
-            MERGE (p:POI {id: poi.id})
-            SET p = poi
-        """, pois=[d for poi in pois if (d := _encode_poi(poi)) is not None])
+    while batch := list(islice(encoded_pois, batch_size)):
+      session.run("""
+              UNWIND $pois AS poi
+              MERGE (p:POI {id: poi.id})
+              SET p = poi
+          """, pois=batch)
 
 
 def _sanitize(text: str) -> str:
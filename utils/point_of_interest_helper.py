@@ -1,11 +1,57 @@
 from shapely.geometry import Point
-from typing import List, Tuple
+from pyproj import Transformer
+from typing import List, Tuple, Dict, Iterable, Iterator
 from datetime import datetime
+import numpy as np
+import pyarrow as pa
+import hashlib
 import json
 import logging
+import sys
+
+# EPSG:9794 est le code EPSG pour la projection "RGF93 v2b / Lambert-93" utilisée en France
+# cf https://fr.wikipedia.org/wiki/Projection_conique_conforme_de_Lambert#Lambert_93
+lambert93_transformer = Transformer.from_crs("EPSG:4326", "EPSG:9794", always_xy=True)
+
+
+def lambert93_xy(latitudes, longitudes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Projette des coordonnées GPS en Lambert-93 (coordonnées métriques), en une seule passe sur des tableaux.
+    Les coordonnées sont tronquées au mètre, comme celles importées dans Neo4j et utilisées par la clusterisation,
+    et doivent tenir dans les colonnes INT x et y de Point_Of_Interest.
+
+    :param
+        latitudes, longitudes (array-like): Latitudes et longitudes, NaN si inconnues.
+
+    :return
+        Tuple[np.ndarray, np.ndarray]: Coordonnées x et y (flottants), NaN si inconnues, non projetables
+        ou hors des bornes d'un entier 32 bits (près du pôle Sud).
+    """
+    x, y = lambert93_transformer.transform(np.asarray(longitudes, dtype=float), np.asarray(latitudes, dtype=float))
+    x, y = np.trunc(np.atleast_1d(x)), np.trunc(np.atleast_1d(y))
+    invalid = ~((np.abs(x) < 2 ** 31) & (np.abs(y) < 2 ** 31))
+    x[invalid] = np.nan
+    y[invalid] = np.nan
+    return x, y
+
+
+def poi_xy(poi: "Poi") -> Tuple[int | None, int | None]:
+    """
+    Coordonnées Lambert-93 d'un POI : celles déjà calculées, sinon projetées à partir de sa latitude et sa longitude.
+
+    :return
+        Tuple[int | None, int | None]: Coordonnées x et y en mètres, None si inconnues ou non projetables.
+    """
+    if poi.x is not None and poi.y is not None:
+        return poi.x, poi.y
+    x, y = lambert93_xy([poi.latitude if poi.latitude is not None else np.nan],
+                        [poi.longitude if poi.longitude is not None else np.nan])
+    return _optional_int(x[0]), _optional_int(y[0])
 
 
 class Region:
+    __slots__ = ("name", "id")
+
     def __init__(self, name: str, id: str):
         """
         Représente une région.
@@ -25,16 +71,21 @@ class Region:
 
     @staticmethod
     def from_dict(data):
-        return Region(
+        return geography_registry.region(
             name=data["name"],
             id=data["id"]
         )
 
+    def __reduce__(self):
+        return _intern_region, (self.name, self.id)
+
     def __repr__(self):
         return f"<Region name={self.name}, id={self.id}>"
 
 
 class Departement:
+    __slots__ = ("name", "id", "region")
+
     def __init__(self, name: str, id: str, region: Region):
         """
         Représente un département.
@@ -66,17 +117,22 @@ class Departement:
         # Désérialisation de la région, seulement si c'est un dictionnaire
         region = Region.from_dict(data["region"]) if isinstance(data.get("region"), dict) else None
         
-        return Departement(
+        return geography_registry.departement(
             name=data["name"],
             id=data["id"],
             region=region
         )
 
+    def __reduce__(self):
+        return _intern_departement, (self.name, self.id, self.region)
+
     def __repr__(self):
         return f"<Departement name={self.name}, id={self.id}, region={self.region.name}>"
 
 
 class City:
+    __slots__ = ("name", "id", "departement")
+
     def __init__(self, name: str, id: str, departement: Departement):
         """
         Représente une ville.
@@ -106,18 +162,23 @@ class City:
                 logging.warning(f"Le champ 'departement' est une chaîne invalide : {data['departement']}")
 
         departement = Departement.from_dict(data["departement"]) if isinstance(data.get("departement"), dict) else None
-        return City(
+        return geography_registry.city(
             name=data["name"],
             id=data["id"],
             departement=departement
         )
 
+    def __reduce__(self):
+        return _intern_city, (self.name, self.id, self.departement)
+
     def __repr__(self):
         return f"<City name={self.name}, id={self.id}, departement={self.departement.name}>"
 
 
 
 class Category:
+    __slots__ = ("name", "id")
+
     def __init__(self, name: str, id: str):
         """
         Représente une catégorie.
@@ -137,16 +198,86 @@ class Category:
 
     @staticmethod
     def from_dict(data):
-        return Category(
+        return geography_registry.category(
             name=data["name"],
             id=data["id"]
         )
 
+    def __reduce__(self):
+        return _intern_category, (self.name, self.id)
+
     def __repr__(self):
         return f"<Category name={self.name}, id={self.id}>"
 
 
+class GeographyRegistry:
+    """
+    Registre d'internement des régions, départements, villes et catégories.
+    Les objets sont indexés par leur identifiant DataTourisme (et leur nom et parent) : les POIs d'une même
+    commune partagent ainsi un unique objet City, et donc un unique Departement et une unique Region,
+    créés une seule fois par exécution.
+
+    Les objets internés sont partagés et ne doivent pas être modifiés.
+    """
+    __slots__ = ("_objects",)
+
+    def __init__(self):
+        self._objects = {}
+
+    def _intern(self, key: tuple, factory):
+        obj = self._objects.get(key)
+        if obj is None:
+            obj = self._objects[key] = factory()
+        return obj
+
+    def region(self, name: str, id: str) -> Region:
+        return self._intern((Region, id, name), lambda: Region(name=name, id=id))
+
+    def departement(self, name: str, id: str, region: Region) -> Departement:
+        return self._intern((Departement, id, name, region), lambda: Departement(name=name, id=id, region=region))
+
+    def city(self, name: str, id: str, departement: Departement) -> City:
+        return self._intern((City, id, name, departement), lambda: City(name=name, id=id, departement=departement))
+
+    def category(self, name: str, id: str) -> Category:
+        return self._intern((Category, id, name), lambda: Category(name=name, id=id))
+
+    def clear(self):
+        """
+        Vide le registre (par exemple entre deux exécutions d'un même processus).
+        """
+        self._objects.clear()
+
+    def __len__(self):
+        return len(self._objects)
+
+
+# Registre utilisé par le parsing et par les méthodes `from_dict`
+geography_registry = GeographyRegistry()
+
+
+# Les objets internés sont reconstruits via le registre lors du dépickling (par exemple les lots parsés
+# par les processus de `iter_poi_batches_parallel`)
+def _intern_region(name, id):
+    return geography_registry.region(name, id)
+
+
+def _intern_departement(name, id, region):
+    return geography_registry.departement(name, id, region)
+
+
+def _intern_city(name, id, departement):
+    return geography_registry.city(name, id, departement)
+
+
+def _intern_category(name, id):
+    return geography_registry.category(name, id)
+
+
 class Poi:
+    __slots__ = ("id", "name", "rating", "created_at", "updated_at", "latitude", "longitude",
+                 "postal_code", "city", "categories", "osm_node_id", "content_hash", "x", "y")
+
     def __init__(
         self,
         id: str,  # Identifiant principal (extrait du JSON)
@@ -159,7 +290,10 @@ class Poi:
         postal_code: str,
         city: City,
         categories: List[Category],
-        osm_node_id: str = None  # Champ optionnel, utilisé uniquement si nécessaire
+        osm_node_id: str = None,  # Champ optionnel, utilisé uniquement si nécessaire
+        content_hash: str = None,
+        x: int = None,
+        y: int = None
     ):
         """
         Représente un Point of Interest (POI).
@@ -176,6 +310,8 @@ class Poi:
             city (City): Instance de la classe City associée.
             categories (List[Category]): Liste des catégories associées.
             osm_node_id (str): Identifiant OSM du POI (optionnel).
+            content_hash (str): Empreinte du contenu du POI (voir `poi_content_hash`), None si inconnue.
+            x, y (int): Coordonnées Lambert-93 en mètres (voir `lambert93_xy`), None si non calculées.
         """
         self.id = id
         self.name = name
@@ -184,10 +320,13 @@ class Poi:
         self.updated_at = updated_at
         self.latitude = latitude
         self.longitude = longitude
-        self.postal_code = postal_code
+        self.postal_code = sys.intern(postal_code) if isinstance(postal_code, str) else postal_code
         self.city = city
         self.categories = categories
         self.osm_node_id = osm_node_id
+        self.content_hash = content_hash
+        self.x = x
+        self.y = y
 
     def to_point(self) -> Point:
         """
@@ -213,7 +352,10 @@ class Poi:
             "postal_code": self.postal_code,
             "city": self.city.to_dict() if isinstance(self.city, City) else self.city,  # Sérialisation conditionnelle de l'objet City
             "categories": [cat.to_dict() for cat in self.categories] if self.categories else [],
-            "osm_node_id": self.osm_node_id if self.osm_node_id else None
+            "osm_node_id": self.osm_node_id if self.osm_node_id else None,
+            "content_hash": self.content_hash,
+            "x": self.x,
+            "y": self.y
         }
 
     @staticmethod
@@ -239,7 +381,10 @@ class Poi:
             postal_code=data["postal_code"],
             city=city,
             categories=categories,
-            osm_node_id=data.get("osm_node_id")
+            osm_node_id=data.get("osm_node_id"),
+            content_hash=data.get("content_hash"),
+            x=data.get("x"),
+            y=data.get("y")
         )
 
     def __repr__(self):
@@ -248,10 +393,422 @@ class Poi:
         return f"<Poi name={self.name}, postal_code={self.postal_code}, city={city_name}, categories={categories}>"
 
 
-    
 
-    
+class PoiTable:
+    def __init__(
+        self,
+        ids: np.ndarray,
+        names: np.ndarray,
+        ratings: np.ndarray,
+        created_at: np.ndarray,
+        updated_at: np.ndarray,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        postal_codes: np.ndarray,
+        osm_node_ids: np.ndarray,
+        city_codes: np.ndarray,
+        cities: List[City],
+        category_offsets: np.ndarray,
+        category_codes: np.ndarray,
+        categories: List[Category],
+        content_hashes: np.ndarray = None,
+        x: np.ndarray = None,
+        y: np.ndarray = None
+    ):
+        """
+        Représente un ensemble de POIs sous forme de colonnes (une colonne NumPy par champ).
+        C'est le format d'échange en mémoire du pipeline : il occupe bien moins de mémoire qu'une liste
+        d'objets Poi et permet le filtrage et la comparaison par opérations sur des tableaux.
+
+        Les villes et les catégories sont encodées par dictionnaire : `city_codes` contient l'indice
+        de la ville dans `cities` (-1 si inconnue), et les villes d'un même département partagent les mêmes
+        objets Departement et Region. Les catégories du POI `i` sont
+        `category_codes[category_offsets[i]:category_offsets[i + 1]]`, indices dans `categories`.
+
+        Les dates sont stockées en `datetime64[us]` (NaT si inconnue), sans fuseau horaire, comme dans
+        la base de données. Les latitudes, longitudes et notes inconnues valent NaN.
+
+        :param
+            ids, names, postal_codes, osm_node_ids (np.ndarray): Colonnes de chaînes (dtype object).
+            ratings, latitudes, longitudes (np.ndarray): Colonnes de flottants.
+            created_at, updated_at (np.ndarray): Colonnes de dates.
+            city_codes (np.ndarray): Indice de la ville de chaque POI dans `cities`.
+            cities (List[City]): Dictionnaire des villes.
+            category_offsets (np.ndarray): Début des catégories de chaque POI dans `category_codes` (taille n + 1).
+            category_codes (np.ndarray): Indices des catégories dans `categories`.
+            categories (List[Category]): Dictionnaire des catégories.
+            content_hashes (np.ndarray): Empreintes du contenu des POIs (dtype object, None si inconnue).
+            x, y (np.ndarray): Coordonnées Lambert-93 en mètres (flottants, NaN si inconnues), calculées
+                à partir des latitudes et longitudes si elles ne sont pas fournies.
+        """
+        self.ids = ids
+        self.names = names
+        self.ratings = ratings
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.postal_codes = postal_codes
+        self.osm_node_ids = osm_node_ids
+        self.city_codes = city_codes
+        self.cities = cities
+        self.category_offsets = category_offsets
+        self.category_codes = category_codes
+        self.categories = categories
+        self.content_hashes = content_hashes if content_hashes is not None else np.full(len(ids), None, dtype=object)
+        if x is None or y is None:
+            x, y = lambert93_xy(latitudes, longitudes)
+        self.x = x
+        self.y = y
+
+    @staticmethod
+    def from_pois(pois: Iterable[Poi]) -> "PoiTable":
+        """
+        Construit une table à partir d'objets Poi (liste ou générateur).
+        """
+        encoder = _PoiTableEncoder()
+        columns = ([], [], [], [], [], [], [], [], [], [], [], [], [])
+        category_offsets = [0]
+        category_codes = []
+        for poi in pois:
+            for column, value in zip(columns, (
+                poi.id, poi.name, poi.rating, _naive_datetime(poi.created_at), _naive_datetime(poi.updated_at),
+                poi.latitude, poi.longitude, poi.postal_code, poi.osm_node_id, encoder.city_code(poi.city),
+                poi.content_hash, poi.x, poi.y
+            )):
+                column.append(value)
+            category_codes.extend(encoder.category_code(category) for category in poi.categories or [])
+            category_offsets.append(len(category_codes))
+
+        ids, names, ratings, created_at, updated_at, latitudes, longitudes, postal_codes, osm_node_ids, city_codes, content_hashes, x, y = columns
+        latitudes, longitudes, x, y = _float_array(latitudes), _float_array(longitudes), _float_array(x), _float_array(y)
+        # Projection des seuls POIs dont les coordonnées Lambert-93 ne sont pas encore connues
+        missing = np.flatnonzero(np.isnan(x) | np.isnan(y))
+        if len(missing):
+            x[missing], y[missing] = lambert93_xy(latitudes[missing], longitudes[missing])
+        return PoiTable(
+            ids=_object_array(ids),
+            names=_object_array(names),
+            ratings=_float_array(ratings),
+            created_at=np.array(created_at, dtype="datetime64[us]"),
+            updated_at=np.array(updated_at, dtype="datetime64[us]"),
+            latitudes=latitudes,
+            longitudes=longitudes,
+            postal_codes=_object_array(postal_codes),
+            osm_node_ids=_object_array(osm_node_ids),
+            city_codes=np.array(city_codes, dtype=np.int32),
+            cities=encoder.cities,
+            category_offsets=np.array(category_offsets, dtype=np.int64),
+            category_codes=np.array(category_codes, dtype=np.int32),
+            categories=encoder.categories,
+            content_hashes=_object_array(content_hashes),
+            x=x,
+            y=y
+        )
+
+    @staticmethod
+    def concat(tables: Iterable["PoiTable"]) -> "PoiTable":
+        """
+        Concatène plusieurs tables en fusionnant leurs dictionnaires de villes et de catégories.
+        """
+        tables = list(tables)
+        if not tables:
+            return PoiTable.from_pois([])
+        encoder = _PoiTableEncoder()
+        city_codes, category_offsets, category_codes = [], [np.zeros(1, dtype=np.int64)], []
+        for table in tables:
+            # Seules les entrées des dictionnaires encore utilisées par la table sont reprises
+            city_mapping = np.full(len(table.cities) + 1, -1, dtype=np.int32)
+            for code in np.unique(table.city_codes[table.city_codes >= 0]):
+                city_mapping[code] = encoder.city_code(table.cities[code])
+            category_mapping = np.full(len(table.categories), -1, dtype=np.int32)
+            for code in np.unique(table.category_codes):
+                category_mapping[code] = encoder.category_code(table.categories[code])
+            city_codes.append(city_mapping[table.city_codes])
+            category_codes.append(category_mapping[table.category_codes])
+            category_offsets.append(table.category_offsets[1:] + category_offsets[-1][-1])
+
+        return PoiTable(
+            ids=np.concatenate([table.ids for table in tables]),
+            names=np.concatenate([table.names for table in tables]),
+            ratings=np.concatenate([table.ratings for table in tables]),
+            created_at=np.concatenate([table.created_at for table in tables]),
+            updated_at=np.concatenate([table.updated_at for table in tables]),
+            latitudes=np.concatenate([table.latitudes for table in tables]),
+            longitudes=np.concatenate([table.longitudes for table in tables]),
+            postal_codes=np.concatenate([table.postal_codes for table in tables]),
+            osm_node_ids=np.concatenate([table.osm_node_ids for table in tables]),
+            city_codes=np.concatenate(city_codes),
+            cities=encoder.cities,
+            category_offsets=np.concatenate(category_offsets),
+            category_codes=np.concatenate(category_codes),
+            categories=encoder.categories,
+            content_hashes=np.concatenate([table.content_hashes for table in tables]),
+            x=np.concatenate([table.x for table in tables]),
+            y=np.concatenate([table.y for table in tables])
+        )
+
+    def take(self, indices) -> "PoiTable":
+        """
+        Sélectionne des POIs par un tableau d'indices ou un masque booléen.
+        Les dictionnaires de villes et de catégories sont partagés avec la table d'origine.
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        starts = self.category_offsets[:-1][indices]
+        lengths = self.category_offsets[1:][indices] - starts
+        category_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=category_offsets[1:])
+        positions = np.repeat(starts - category_offsets[:-1], lengths) + np.arange(category_offsets[-1])
+        return PoiTable(
+            ids=self.ids[indices],
+            names=self.names[indices],
+            ratings=self.ratings[indices],
+            created_at=self.created_at[indices],
+            updated_at=self.updated_at[indices],
+            latitudes=self.latitudes[indices],
+            longitudes=self.longitudes[indices],
+            postal_codes=self.postal_codes[indices],
+            osm_node_ids=self.osm_node_ids[indices],
+            city_codes=self.city_codes[indices],
+            cities=self.cities,
+            category_offsets=category_offsets,
+            category_codes=self.category_codes[positions],
+            categories=self.categories,
+            content_hashes=self.content_hashes[indices],
+            x=self.x[indices],
+            y=self.y[indices]
+        )
+
+    def poi(self, index: int) -> Poi:
+        """
+        Reconstruit l'objet Poi d'une ligne de la table.
+        """
+        city_code = self.city_codes[index]
+        codes = self.category_codes[self.category_offsets[index]:self.category_offsets[index + 1]]
+        return Poi(
+            id=self.ids[index],
+            name=self.names[index],
+            rating=_optional_float(self.ratings[index]),
+            created_at=_optional_datetime(self.created_at[index]),
+            updated_at=_optional_datetime(self.updated_at[index]),
+            latitude=_optional_float(self.latitudes[index]),
+            longitude=_optional_float(self.longitudes[index]),
+            postal_code=self.postal_codes[index],
+            city=self.cities[city_code] if city_code >= 0 else None,
+            categories=[self.categories[code] for code in codes],
+            osm_node_id=self.osm_node_ids[index],
+            content_hash=self.content_hashes[index],
+            x=_optional_int(self.x[index]),
+            y=_optional_int(self.y[index])
+        )
+
+    def to_arrow(self) -> pa.RecordBatch:
+        """
+        Convertit la table en RecordBatch Arrow. Les colonnes de villes, départements et régions
+        et le code postal sont des colonnes dictionnaire (chaque chaîne n'est stockée qu'une fois),
+        les catégories des listes de colonnes dictionnaire.
+        """
+        city_indices = pa.array(self.city_codes, mask=self.city_codes < 0)
+        departements = [city.departement if isinstance(city, City) else None for city in self.cities]
+        regions = [departement.region if departement is not None else None for departement in departements]
+        geography = {
+            "city_id": [city.id if isinstance(city, City) else city for city in self.cities],
+            "city_name": [city.name if isinstance(city, City) else None for city in self.cities],
+            "departement_id": [departement.id if departement is not None else None for departement in departements],
+            "departement_name": [departement.name if departement is not None else None for departement in departements],
+            "region_id": [region.id if region is not None else None for region in regions],
+            "region_name": [region.name if region is not None else None for region in regions],
+        }
+        category_offsets = pa.array(self.category_offsets.astype(np.int32))
+        category_codes = pa.array(self.category_codes)
+        postal_codes = pa.array(self.postal_codes, type=pa.string()).dictionary_encode()
+        columns = {
+            "id": pa.array(self.ids, type=pa.string()),
+            "name": pa.array(self.names, type=pa.string()),
+            "rating": pa.array(self.ratings, from_pandas=True),
+            "created_at": pa.array(self.created_at),
+            "updated_at": pa.array(self.updated_at),
+            "latitude": pa.array(self.latitudes, from_pandas=True),
+            "longitude": pa.array(self.longitudes, from_pandas=True),
+            "postal_code": postal_codes,
+            "osm_node_id": pa.array(self.osm_node_ids, type=pa.string()),
+            "content_hash": pa.array(self.content_hashes, type=pa.string()),
+            "x": pa.array(self.x, from_pandas=True),
+            "y": pa.array(self.y, from_pandas=True),
+            **{
+                name: pa.DictionaryArray.from_arrays(city_indices, pa.array(values, type=pa.string()))
+                for name, values in geography.items()
+            },
+            "category_name": pa.ListArray.from_arrays(category_offsets, pa.DictionaryArray.from_arrays(
+                category_codes, pa.array([category.name for category in self.categories], type=pa.string()))),
+            "category_id": pa.ListArray.from_arrays(category_offsets, pa.DictionaryArray.from_arrays(
+                category_codes, pa.array([category.id for category in self.categories], type=pa.string()))),
+        }
+        return pa.RecordBatch.from_pydict(columns)
+
+    @staticmethod
+    def from_arrow(batch: pa.RecordBatch) -> "PoiTable":
+        """
+        Reconstruit une table à partir d'un RecordBatch produit par `to_arrow`.
+        Les villes, départements, régions et catégories sont internés dans `geography_registry`.
+        """
+        columns = {name: batch.column(name) for name in batch.schema.names}
+        geography = {name: columns[name].dictionary.to_pylist() for name in (
+            "city_id", "city_name", "departement_id", "departement_name", "region_id", "region_name")}
+        cities = []
+        for city_id, city_name, departement_id, departement_name, region_id, region_name in zip(*geography.values()):
+            if city_name is None and departement_id is None:
+                cities.append(city_id)
+                continue
+            region = geography_registry.region(name=region_name, id=region_id) if region_id is not None else None
+            departement = geography_registry.departement(name=departement_name, id=departement_id, region=region) \
+                if departement_id is not None else None
+            cities.append(geography_registry.city(name=city_name, id=city_id, departement=departement))
+
+        category_names, category_ids = columns["category_name"], columns["category_id"]
+        categories = [
+            geography_registry.category(name=name, id=category_id)
+            for name, category_id in zip(category_names.values.dictionary.to_pylist(), category_ids.values.dictionary.to_pylist())
+        ]
+        return PoiTable(
+            ids=columns["id"].to_numpy(zero_copy_only=False),
+            names=columns["name"].to_numpy(zero_copy_only=False),
+            ratings=columns["rating"].to_numpy(zero_copy_only=False).astype(float),
+            created_at=columns["created_at"].to_numpy(zero_copy_only=False),
+            updated_at=columns["updated_at"].to_numpy(zero_copy_only=False),
+            latitudes=columns["latitude"].to_numpy(zero_copy_only=False).astype(float),
+            longitudes=columns["longitude"].to_numpy(zero_copy_only=False).astype(float),
+            postal_codes=_dictionary_column(columns["postal_code"]),
+            osm_node_ids=columns["osm_node_id"].to_numpy(zero_copy_only=False),
+            city_codes=columns["city_id"].indices.fill_null(-1).to_numpy().astype(np.int32),
+            cities=cities,
+            category_offsets=category_names.offsets.to_numpy().astype(np.int64),
+            category_codes=category_names.values.indices.to_numpy().astype(np.int32),
+            categories=categories,
+            # Absente des tables sérialisées avant l'ajout des empreintes
+            content_hashes=columns["content_hash"].to_numpy(zero_copy_only=False) if "content_hash" in columns else None,
+            # Recalculées à partir des latitudes et longitudes si absentes
+            x=columns["x"].to_numpy(zero_copy_only=False).astype(float) if "x" in columns else None,
+            y=columns["y"].to_numpy(zero_copy_only=False).astype(float) if "y" in columns else None
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        Sérialise la table au format Arrow IPC (flux), par exemple pour la transmettre entre tâches via Redis.
+        """
+        batch = self.to_arrow()
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "PoiTable":
+        """
+        Désérialise une table écrite par `to_bytes`.
+        """
+        tables = [PoiTable.from_arrow(batch) for batch in pa.ipc.open_stream(data)]
+        return tables[0] if len(tables) == 1 else PoiTable.concat(tables)
+
+    def to_pois(self) -> List[Poi]:
+        return list(self)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Poi]:
+        return (self.poi(index) for index in range(len(self)))
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.poi(key)
+        if isinstance(key, slice):
+            return self.take(np.arange(len(self))[key])
+        return self.take(key)
+
+    def __repr__(self):
+        return f"<PoiTable pois={len(self)}, cities={len(self.cities)}, categories={len(self.categories)}>"
+
+
+class _PoiTableEncoder:
+    """
+    Dictionnaires des villes et des catégories en cours de construction d'une PoiTable.
+    Les villes, départements et régions sont ceux de `geography_registry`.
+    """
+    def __init__(self):
+        self.cities, self.categories = [], []
+        self._city_codes, self._category_codes = {}, {}
+
+    def city_code(self, city) -> int:
+        if city is None:
+            return -1
+        if isinstance(city, dict):
+            city = City.from_dict(city)
+        key = city.id if isinstance(city, City) else city
+        code = self._city_codes.get(key)
+        if code is None:
+            if isinstance(city, City):
+                city = geography_registry.city(name=city.name, id=city.id, departement=self._departement(city.departement))
+            code = self._city_codes[key] = len(self.cities)
+            self.cities.append(city)
+        return code
+
+    def _departement(self, departement: Departement | None) -> Departement | None:
+        if departement is None:
+            return None
+        region = departement.region
+        if region is not None:
+            region = geography_registry.region(name=region.name, id=region.id)
+        return geography_registry.departement(name=departement.name, id=departement.id, region=region)
+
+    def category_code(self, category: Category) -> int:
+        key = (category.name, category.id)
+        code = self._category_codes.get(key)
+        if code is None:
+            code = self._category_codes[key] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+
+def _object_array(values: list) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _dictionary_column(column: pa.DictionaryArray) -> np.ndarray:
+    # Chaque valeur du dictionnaire n'est décodée (et internée) qu'une fois, puis répartie selon les indices
+    values = _object_array([sys.intern(value) if value is not None else None for value in column.dictionary.to_pylist()] + [None])
+    return values[column.indices.fill_null(-1).to_numpy()]
+
+
+def _float_array(values: list) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+
+def _naive_datetime(value: datetime | None) -> datetime | None:
+    if value is not None and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def _optional_float(value) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+def _optional_int(value) -> int | None:
+    return None if np.isnan(value) else int(value)
+
+
+def _optional_datetime(value: np.datetime64) -> datetime | None:
+    return None if np.isnat(value) else value.astype(datetime)
+
+
 class PoiMetadata:
+    __slots__ = ("label", "last_update", "file_path")
+
     def __init__(self, label, last_update, file_path):
         self.label = label
         self.last_update = last_update
@@ -281,24 +838,62 @@ class PoiMetadata:
             file_path=data["file_path"]
         )
 
-def compare_pois(db_pois: List[Poi], poi_list: List[Poi]) -> Tuple[List[Poi], List[Poi]]:
+def poi_content_hash(poi: Poi) -> str:
+    """
+    Empreinte stable du contenu d'un POI : tous ses champs sauf la date de mise à jour
+    (`lastUpdateDatatourisme`), qui peut changer sans que le contenu du POI ne change.
+    L'empreinte (BLAKE2b sur 128 bits, en hexadécimal) ne dépend ni du processus ni de l'ordre des catégories.
+
+    :param
+        poi (Poi): Le POI.
+
+    :return
+        str: L'empreinte, 32 caractères hexadécimaux.
+    """
+    city = poi.city
+    departement = city.departement if isinstance(city, City) else None
+    region = departement.region if departement is not None else None
+    content = [
+        poi.id, poi.name, poi.rating, poi.created_at.isoformat() if poi.created_at else None,
+        poi.latitude, poi.longitude, poi.postal_code, poi.osm_node_id,
+        [city.id, city.name] if isinstance(city, City) else city,
+        [departement.id, departement.name] if departement is not None else None,
+        [region.id, region.name] if region is not None else None,
+        sorted([category.name, category.id or ""] for category in poi.categories or []),
+    ]
+    data = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def compare_pois(db_pois: List[Poi] | PoiTable, poi_list: List[Poi] | PoiTable) -> Tuple[List[Poi], List[Poi]] | Tuple[PoiTable, PoiTable]:
     """
     Compare les POIs de la base de données avec les POIs de la liste extraits.
     - Ajoute dans `pois_to_create` les POIs de `poi_list` qui ne sont pas dans `db_pois`.
-    - Ajoute dans `pois_to_update` les POIs dont la date d'update est plus récente dans `poi_list`.
+    - Ajoute dans `pois_to_update` les POIs dont la date d'update est plus récente dans `poi_list`,
+      sauf si leurs empreintes de contenu sont connues et identiques : le POI n'a pas réellement changé.
+      Le nombre d'écritures ainsi évitées est journalisé.
+    Si l'un des deux arguments est une PoiTable, la comparaison est faite par `compare_poi_tables`
+    et renvoie des PoiTable.
 
     :param
-        db_pois (List[Poi]): Liste des POIs dans la base de données.
-        poi_list (List[Poi]): Liste des POIs extraits des fichiers JSON.
+        db_pois (List[Poi] | PoiTable): Liste des POIs dans la base de données.
+        poi_list (List[Poi] | PoiTable): Liste des POIs extraits des fichiers JSON.
 
     :return
         tuple: (pois_to_create, pois_to_update)
     """
+    if isinstance(db_pois, PoiTable) or isinstance(poi_list, PoiTable):
+        return compare_poi_tables(
+            db_pois if isinstance(db_pois, PoiTable) else PoiTable.from_pois(db_pois),
+            poi_list if isinstance(poi_list, PoiTable) else PoiTable.from_pois(poi_list)
+        )
+
     # Indexer les POIs de la DB par leur ID pour un accès rapide
     db_pois_dict = {poi.id: poi for poi in db_pois}
 
     pois_to_create = []
     pois_to_update = []
+    unchanged = 0
 
     for poi in poi_list:
         if poi.id not in db_pois_dict:
@@ -312,6 +907,66 @@ def compare_pois(db_pois: List[Poi], poi_list: List[Poi]) -> Tuple[List[Poi], Li
             if db_poi.updated_at.tzinfo is not None:
                 db_poi.updated_at = db_poi.updated_at.replace(tzinfo=None)
             if poi.updated_at > db_poi.updated_at:  # Comparer les dates d'update
-                pois_to_update.append(poi)
+                if poi.content_hash is not None and poi.content_hash == db_poi.content_hash:
+                    unchanged += 1
+                else:
+                    pois_to_update.append(poi)
 
+    _log_unchanged_pois(unchanged)
     return pois_to_create, pois_to_update
+
+
+def compare_poi_tables(db_table: PoiTable, table: PoiTable) -> Tuple[PoiTable, PoiTable]:
+    """
+    Équivalent de `compare_pois` par opérations sur les colonnes : les identifiants de `table` sont
+    recherchés dans les identifiants triés de `db_table`, puis les dates de mise à jour et les empreintes
+    de contenu sont comparées.
+
+    :param
+        db_table (PoiTable): POIs de la base de données.
+        table (PoiTable): POIs extraits des fichiers JSON.
+
+    :return
+        tuple: (pois_to_create, pois_to_update)
+    """
+    order = np.argsort(db_table.ids, kind="stable")
+    sorted_ids = db_table.ids[order]
+    positions = np.minimum(np.searchsorted(sorted_ids, table.ids), max(len(sorted_ids) - 1, 0))
+    if len(sorted_ids):
+        in_db = sorted_ids[positions] == table.ids
+        db_updated_at = db_table.updated_at[order[positions]]
+        db_content_hashes = db_table.content_hashes[order[positions]]
+    else:
+        in_db = np.zeros(len(table), dtype=bool)
+        db_updated_at = np.full(len(table), np.datetime64("NaT", "us"))
+        db_content_hashes = np.full(len(table), None, dtype=object)
+    newer = in_db & (table.updated_at > db_updated_at)
+    unchanged = newer & np.not_equal(table.content_hashes, None) & (table.content_hashes == db_content_hashes)
+    _log_unchanged_pois(int(unchanged.sum()))
+    return table.take(~in_db), table.take(newer & ~unchanged)
+
+
+def _log_unchanged_pois(count: int):
+    if count:
+        logging.info(f"{count} POIs ont une date de mise à jour plus récente mais un contenu inchangé : "
+                     f"{count} mises à jour évitées.")
+
+
+def select_updated_metadata(poi_metadata_list: Iterable[PoiMetadata], watermarks: Dict[str, str]) -> List[PoiMetadata]:
+    """
+    Sélectionne les métadonnées des POIs nouveaux ou modifiés depuis le dernier traitement,
+    sans ouvrir les fichiers des POIs.
+    Un POI est retenu si son fichier n'a pas de watermark ou si la valeur de `lastUpdateDatatourisme`
+    de l'index diffère de celle enregistrée.
+
+    :param
+        poi_metadata_list (Iterable[PoiMetadata]): Métadonnées issues de `index.json`.
+        watermarks (Dict[str, str]): `lastUpdateDatatourisme` déjà traité, par chemin de fichier.
+
+    :return
+        List[PoiMetadata]: Métadonnées des POIs à parser.
+    """
+    return [
+        metadata for metadata in poi_metadata_list
+        if watermarks.get(metadata.file_path) != metadata.last_update
+    ]
@@ -1,36 +1,486 @@
+import io
+import mmap
 import os
 import pickle
-import gzip
+import time
+import uuid
+import zlib
+from functools import lru_cache
+from urllib.parse import quote, unquote
+from typing import Iterable, Iterator, NamedTuple, Callable
+import pandas as pd
+import pyarrow as pa
 import redis
 
 default_port = 6379
 default_db = 0
 default_expiration = 1800
+default_chunk_size = 8 * 1024 * 1024
+default_pipeline_chunks = 8
+default_spill_size = 32 * 1024 * 1024
+
+# A chunked object is referenced by a `<name>` key holding `chunks:<n>`, its chunks are stored in the
+# `<name>:chunk:<i>` keys. An object fitting in a single chunk is stored as is in the `<name>` key.
+# An object spilled to REDIS_SPILL_DIRECTORY is referenced by a `<name>` key holding `file:<file name>`.
+# The stored stream starts with a one byte header, the id of the codec used to compress it.
+_manifest_prefix = b"chunks:"
+_file_prefix = b"file:"
+_spill_suffix = ".spill"
+_temporary_suffix = ".tmp"
+# Age under which an unreferenced spill file may still be waiting for its reference to be written
+_cleanup_grace = 60
+_gzip_wbits = 31
+_gzip_magic = b"\x1f\x8b"
+# DataFrames are stored as an Arrow IPC stream, which starts with a continuation marker where a pickle starts with
+# its PROTO opcode. With these codecs, Arrow compresses the column buffers itself and the stream is stored as is.
+_arrow_marker = b"\xff\xff\xff\xff"
+_arrow_compressions = {"lz4", "zstd"}
+
+
+class Codec(NamedTuple):
+  id: int
+  compressor: Callable  # level -> object with compress(data) and flush()
+  decompressor: Callable  # () -> object with decompress(data) and flush()
+  default_level: int | None
+
+
+class _Identity:
+  def compress(self, data) -> bytes:
+    return bytes(data)
+
+  decompress = compress
+
+  def flush(self) -> bytes:
+    return b""
+
+
+codecs = {
+  "none": Codec(0, lambda level: _Identity(), _Identity, None),
+  "gzip": Codec(1, lambda level: zlib.compressobj(level, wbits=_gzip_wbits), lambda: zlib.decompressobj(wbits=_gzip_wbits), 1),
+  "zlib": Codec(2, lambda level: zlib.compressobj(level), zlib.decompressobj, 1),
+}
+
+try:
+  import lz4.frame
+
+  class _Lz4Compressor:
+    def __init__(self, level: int):
+      self.compressor = lz4.frame.LZ4FrameCompressor(compression_level=level)
+      self.header = self.compressor.begin()
+
+    def compress(self, data) -> bytes:
+      header, self.header = self.header, b""
+      return header + self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+      return self.header + self.compressor.flush()
+
+  class _Lz4Decompressor:
+    def __init__(self):
+      self.decompressor = lz4.frame.LZ4FrameDecompressor()
+
+    def decompress(self, data) -> bytes:
+      return self.decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+      return b""
+
+  codecs["lz4"] = Codec(3, _Lz4Compressor, _Lz4Decompressor, 0)
+except ImportError:
+  pass
+
+try:
+  import zstandard
+
+  codecs["zstd"] = Codec(4, lambda level: zstandard.ZstdCompressor(level=level).compressobj(),
+                         lambda: zstandard.ZstdDecompressor().decompressobj(), 3)
+except ImportError:
+  pass
+
+_codecs_by_id = {codec.id: codec for codec in codecs.values()}
+_preferred_codecs = ["zstd", "lz4", "gzip"]
+default_codec = next(name for name in _preferred_codecs if name in codecs)
+
+
+def _codec_name(name: str | None) -> str:
+  name = name or os.environ.get('REDIS_CODEC') or default_codec
+  if name not in codecs:
+    raise ValueError(f"Unknown or unavailable codec {name}, available codecs: {', '.join(codecs)}")
+  return name
+
+
+def _codec(name: str | None, level: int | None) -> tuple[Codec, int | None]:
+  codec = codecs[_codec_name(name)]
+  if level is None:
+    level = int(os.environ['REDIS_CODEC_LEVEL']) if os.environ.get('REDIS_CODEC_LEVEL') else codec.default_level
+  return codec, level
+
+
+def _decompressor(first_chunk: bytes):
+  """
+  Decompressor matching the header of a stored stream, and the length of that header.
+  Values stored before the header was introduced are plain gzip streams.
+  """
+  if first_chunk.startswith(_gzip_magic):
+    return codecs["gzip"].decompressor(), 0
+  return _codecs_by_id[first_chunk[0]].decompressor(), 1
+
+
+@lru_cache(maxsize=None)
+def _connection_pool(host: str, port: int, db: int) -> redis.ConnectionPool:
+  return redis.ConnectionPool(host=host, port=port, db=db)
 
 
 def _redis():
   host = os.environ['REDIS_HOST']
   port = int(os.environ.get('REDIS_PORT', str(default_port)))
   db = int(os.environ.get('REDIS_DB', str(default_db)))
-  return redis.Redis(host=host, port=port, db=db)
+  return redis.Redis(connection_pool=_connection_pool(host, port, db))
+
+
+def _chunk_key(name: str, index: int) -> str:
+  return f"{name}:chunk:{index}"
 
 
-def object_store(name: str, data: object) -> str:
+def _chunk_count(value: bytes) -> int | None:
+  if value.startswith(_manifest_prefix):
+    return int(value[len(_manifest_prefix):])
+  return None
+
+
+def _spill_directory() -> str | None:
+  return os.environ.get('REDIS_SPILL_DIRECTORY') or None
+
+
+def _spill_file_name(name: str) -> str:
+  return f"{quote(name, safe='')}.{uuid.uuid4().hex}{_spill_suffix}"
+
+
+def _spill_file(value: bytes) -> str | None:
+  """
+  Path of the file referenced by a stored value, None if the object is stored in redis
+  """
+  if value.startswith(_file_prefix):
+    return os.path.join(_spill_directory() or "", value[len(_file_prefix):].decode())
+  return None
+
+
+def _remove_spill_file(value: bytes | None):
+  path = _spill_file(value) if value is not None else None
+  if path is not None:
+    try:
+      os.remove(path)
+    except FileNotFoundError:
+      pass
+
+
+class _ObjectWriter(io.RawIOBase):
+  """
+  Write-only file compressing on the fly and sending chunks of `chunk_size` bytes to redis
+  by pipelines of `pipeline_chunks` chunks.
+  When a spill directory is set, the compressed stream is held in memory up to `spill_size` bytes,
+  beyond that it is written to a file of the spill directory, renamed once complete, and only
+  a reference to the file is stored in redis.
+  Nothing is referenced under `name` if the writer exits with an exception.
+  """
+  def __init__(self, name: str, codec: str | None = None, level: int | None = None):
+    super().__init__()
+    codec, level = _codec(codec, level)
+    self.name = name
+    self.client = _redis()
+    self.expiration = int(os.environ.get('REDIS_EXPIRATION', str(default_expiration)))
+    self.chunk_size = int(os.environ.get('REDIS_CHUNK_SIZE', str(default_chunk_size)))
+    self.pipeline_chunks = int(os.environ.get('REDIS_PIPELINE_CHUNKS', str(default_pipeline_chunks)))
+    self.spill_directory = _spill_directory()
+    self.spill_size = int(os.environ.get('REDIS_SPILL_SIZE', str(default_spill_size)))
+    self.compressor = codec.compressor(level)
+    self.buffer = bytearray([codec.id])
+    self.pipeline = self.client.pipeline(transaction=False)
+    self.chunks = 0
+    self.file = None
+    self.file_name = None
+
+  def writable(self):
+    return True
+
+  def write(self, data) -> int:
+    # pickle may write PickleBuffer objects (protocol 5), which have no length
+    data = memoryview(data).cast("B")
+    self.buffer += self.compressor.compress(data)
+    self._spill_if_needed()
+    if self.file is not None:
+      self.file.write(self.buffer)
+      del self.buffer[:]
+    elif self.spill_directory is None:
+      while len(self.buffer) >= self.chunk_size:
+        self._send(bytes(self.buffer[:self.chunk_size]))
+        del self.buffer[:self.chunk_size]
+    return data.nbytes
+
+  def _spill_if_needed(self):
+    if self.file is None and self.spill_directory is not None and len(self.buffer) > self.spill_size:
+      self.file_name = _spill_file_name(self.name)
+      os.makedirs(self.spill_directory, exist_ok=True)
+      self.file = open(self._path(_temporary_suffix), "wb")
+
+  def _path(self, suffix: str = "") -> str:
+    return os.path.join(self.spill_directory, self.file_name + suffix)
+
+  def _send(self, chunk: bytes):
+    self.pipeline.set(_chunk_key(self.name, self.chunks), chunk, ex=self.expiration)
+    self.chunks += 1
+    if self.chunks % self.pipeline_chunks == 0:
+      self.pipeline.execute()
+
+  def close(self):
+    if self.closed:
+      return
+    self.buffer += self.compressor.flush()
+    self._spill_if_needed()
+    if self.file is not None:
+      self.file.write(self.buffer)
+      self.file.close()
+      # The complete file appears under its final name at once, then it is referenced
+      os.replace(self._path(_temporary_suffix), self._path())
+      self.pipeline.set(self.name, _file_prefix + self.file_name.encode(), ex=self.expiration, get=True)
+    elif self.chunks == 0 and len(self.buffer) <= self.chunk_size:
+      self.pipeline.set(self.name, bytes(self.buffer), ex=self.expiration, get=True)
+    else:
+      for start in range(0, len(self.buffer), self.chunk_size):
+        self._send(bytes(self.buffer[start:start + self.chunk_size]))
+      # The manifest is written last and all the keys expire together
+      for index in range(self.chunks):
+        self.pipeline.expire(_chunk_key(self.name, index), self.expiration)
+      self.pipeline.set(self.name, _manifest_prefix + str(self.chunks).encode(), ex=self.expiration, get=True)
+    previous = self.pipeline.execute()[-1]
+    # The file of a replaced object is not referenced anymore
+    _remove_spill_file(previous)
+    self.buffer = bytearray()
+    super().close()
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    if exc_type is None:
+      self.close()
+    else:
+      self.pipeline.reset()
+      if self.file is not None:
+        self.file.close()
+        os.remove(self._path(_temporary_suffix))
+      super().close()
+
+
+class _StreamReader(io.RawIOBase):
+  """
+  Read-only file fed by an iterator of bytes.
+  """
+  def __init__(self, chunks: Iterator[bytes]):
+    super().__init__()
+    self.chunks = chunks
+    self.pending = b""
+
+  def readable(self):
+    return True
+
+  def readinto(self, buffer) -> int:
+    while not self.pending:
+      self.pending = next(self.chunks, None)
+      if self.pending is None:
+        self.pending = b""
+        return 0
+    size = min(len(buffer), len(self.pending))
+    buffer[:size] = self.pending[:size]
+    self.pending = self.pending[size:]
+    return size
+
+
+def object_write(name: str, chunks: Iterable[bytes], codec: str | None = None, level: int | None = None) -> str:
+  f"""
+  Store a stream of bytes in redis.
+  The stream is compressed on the fly and split across several keys of at most REDIS_CHUNK_SIZE bytes,
+  written by pipelines of REDIS_PIPELINE_CHUNKS keys.
+  Above REDIS_SPILL_SIZE compressed bytes, the stream is written to a file of REDIS_SPILL_DIRECTORY instead.
+  The id of the codec is stored in a one byte header so that any stored value can be read back.
+
+  :Environment Variables:
+    - **REDIS_HOST** (str): The hostname of the redis server.
+    - **REDIS_PORT** (int): The port number of the redis server (default to {default_port}).
+    - **REDIS_DB** (int): The database number for object storage (default to {default_db}).
+    - **REDIS_EXPIRATION** (int): The expiration time of the object (default to {default_expiration}).
+    - **REDIS_CHUNK_SIZE** (int): The maximum size of a stored chunk (default to {default_chunk_size}).
+    - **REDIS_PIPELINE_CHUNKS** (int): The number of chunks sent per round trip (default to {default_pipeline_chunks}).
+    - **REDIS_CODEC** (str): The compression codec, one of {', '.join(codecs)} (default to {default_codec}).
+    - **REDIS_CODEC_LEVEL** (int): The compression level (default to the codec's default level).
+    - **REDIS_SPILL_DIRECTORY** (str): A directory shared by the readers, where objects larger than
+      REDIS_SPILL_SIZE are written instead of redis (default to no spilling).
+    - **REDIS_SPILL_SIZE** (int): The compressed size above which an object is spilled (default to {default_spill_size}).
+  :param name: name of the object
+  :param chunks: the bytes to store
+  :param codec: the compression codec, overrides REDIS_CODEC
+  :param level: the compression level, overrides REDIS_CODEC_LEVEL
+  :return: the name of the object
+  """
+  with _ObjectWriter(name, codec, level) as writer:
+    for chunk in chunks:
+      writer.write(chunk)
+  return name
+
+
+def object_stream(name: str) -> Iterator[bytes] | None:
+  f"""
+  Read a stream of bytes stored by `object_write` or `object_store`.
+  Chunks are fetched by pipelines of REDIS_PIPELINE_CHUNKS keys and decompressed as they arrive,
+  so the consumer can start before the whole object is fetched.
+
+  :Environment Variables:
+    - **REDIS_HOST** (str): The hostname of the redis server.
+    - **REDIS_PORT** (int): The port number of the redis server (default to {default_port}).
+    - **REDIS_DB** (int): The database number for object storage (default to {default_db}).
+    - **REDIS_PIPELINE_CHUNKS** (int): The number of chunks fetched per round trip (default to {default_pipeline_chunks}).
+    - **REDIS_SPILL_DIRECTORY** (str): The directory of the spilled objects.
+  :param name: name of the object
+  :return: an iterator over the decompressed bytes, None if the object does not exist
+  """
+  client = _redis()
+  value = client.get(name)
+  if value is None:
+    return None
+  return _decompress(name, client, value)
+
+
+def _stored_chunks(name: str, client: redis.Redis, value: bytes) -> Iterator[bytes]:
+  path = _spill_file(value)
+  if path is not None:
+    yield from _file_chunks(name, path)
+    return
+  count = _chunk_count(value)
+  if count is None:
+    yield value
+    return
+  pipeline_chunks = int(os.environ.get('REDIS_PIPELINE_CHUNKS', str(default_pipeline_chunks)))
+  for start in range(0, count, pipeline_chunks):
+    pipeline = client.pipeline(transaction=False)
+    for index in range(start, min(start + pipeline_chunks, count)):
+      pipeline.get(_chunk_key(name, index))
+    for index, chunk in enumerate(pipeline.execute(), start):
+      if chunk is None:
+        raise KeyError(f"Missing chunk {index} of {name}")
+      yield chunk
+
+
+def _file_chunks(name: str, path: str) -> Iterator[bytes]:
+  """
+  Chunks of REDIS_CHUNK_SIZE bytes of a spilled object, read through a memory map of its file
+  """
+  chunk_size = int(os.environ.get('REDIS_CHUNK_SIZE', str(default_chunk_size)))
+  try:
+    file = open(path, "rb")
+  except FileNotFoundError:
+    raise KeyError(f"Missing file {path} of {name}")
+  with file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+    for start in range(0, len(mapped), chunk_size):
+      yield mapped[start:start + chunk_size]
+
+
+def _decompress(name: str, client: redis.Redis, value: bytes) -> Iterator[bytes]:
+  decompressor = None
+  for chunk in _stored_chunks(name, client, value):
+    if decompressor is None:
+      decompressor, header_size = _decompressor(chunk)
+      chunk = chunk[header_size:]
+    yield decompressor.decompress(chunk)
+  yield decompressor.flush()
+
+
+def _arrow_table(data: object) -> pa.Table | None:
+  """
+  Arrow table of a DataFrame which converts back to the same DataFrame, None otherwise.
+  Columns of arbitrary Python objects do not convert, and lists or dicts would come back as arrays.
+  """
+  if not isinstance(data, pd.DataFrame):
+    return None
+  try:
+    table = pa.Table.from_pandas(data)
+  except (pa.ArrowException, ValueError, TypeError):
+    return None
+  if any(pa.types.is_nested(field.type) for field in table.schema):
+    return None
+  return table
+
+
+def _store_table(name: str, table: pa.Table, codec: str | None, level: int | None):
+  codec = _codec_name(codec)
+  options = pa.ipc.IpcWriteOptions()
+  if codec in _arrow_compressions:
+    options = pa.ipc.IpcWriteOptions(compression=pa.Codec(codec, _codec(codec, level)[1]))
+    codec, level = "none", None
+  with _ObjectWriter(name, codec, level) as writer:
+    with pa.ipc.new_stream(writer, table.schema, options=options) as stream:
+      stream.write_table(table)
+
+
+def _in_place_arrow_source(value: bytes) -> pa.NativeFile | pa.Buffer | None:
+  """
+  Arrow IPC stream stored without outer compression, read in place: the file of a spilled object is
+  memory-mapped and a single redis value is wrapped, so the columns are not copied.
+  """
+  header = bytes([codecs["none"].id]) + _arrow_marker
+  path = _spill_file(value)
+  if path is not None:
+    if not os.path.exists(path):
+      return None
+    source = pa.memory_map(path)
+    if source.read(len(header)) == header:
+      source.seek(1)
+      return source
+    source.close()
+    return None
+  if value.startswith(header):
+    return pa.py_buffer(value).slice(1)
+  return None
+
+
+def _stored_source(name: str, client: redis.Redis, value: bytes) -> tuple[object, bool]:
+  """
+  Source of the decompressed stream of an object, and whether it is an Arrow IPC stream
+  """
+  source = _in_place_arrow_source(value)
+  if source is not None:
+    return source, True
+  stream = io.BufferedReader(_StreamReader(_decompress(name, client, value)))
+  return stream, stream.peek(1)[:1] == _arrow_marker[:1]
+
+
+def object_store(name: str, data: object, codec: str | None = None, level: int | None = None) -> str:
   f"""
   Store an object in redis
+  The object is pickled and compressed on the fly, and split across several keys when it is larger
+  than REDIS_CHUNK_SIZE, or written to REDIS_SPILL_DIRECTORY when it is larger than REDIS_SPILL_SIZE (see `object_write`).
+  A DataFrame is stored as an Arrow IPC stream instead of a pickle, its columns compressed by Arrow with
+  the lz4 and zstd codecs. Only DataFrames whose columns cannot round-trip through Arrow are pickled.
 
   :Environment Variables:
     - **REDIS_HOST** (str): The hostname of the redis server.
     - **REDIS_PORT** (int): The port number of the redis server (default to {default_port}).
     - **REDIS_DB** (int): The database number for object storage (default to {default_db}).
     - **REDIS_EXPIRATION** (int): The expiration time of the object (default to {default_expiration}).
+    - **REDIS_CHUNK_SIZE** (int): The maximum size of a stored chunk (default to {default_chunk_size}).
+    - **REDIS_CODEC** (str): The compression codec, one of {', '.join(codecs)} (default to {default_codec}).
+    - **REDIS_CODEC_LEVEL** (int): The compression level (default to the codec's default level).
+    - **REDIS_SPILL_DIRECTORY** (str): A directory shared by the readers, where objects larger than
+      REDIS_SPILL_SIZE are written instead of redis (default to no spilling).
+    - **REDIS_SPILL_SIZE** (int): The compressed size above which an object is spilled (default to {default_spill_size}).
   :param name: name of the object
   :param data: value of the object
+  :param codec: the compression codec, overrides REDIS_CODEC
+  :param level: the compression level, overrides REDIS_CODEC_LEVEL
   :return: the name of the object
   """
-  compressed = gzip.compress(pickle.dumps(data))
-  expiration = int(os.environ.get('REDIS_EXPIRATION', str(default_expiration)))
-  _redis().set(name, compressed, ex=expiration)
+  table = _arrow_table(data)
+  if table is not None:
+    _store_table(name, table, codec, level)
+    return name
+  with _ObjectWriter(name, codec, level) as writer:
+    pickle.dump(data, writer, protocol=pickle.HIGHEST_PROTOCOL)
   return name
 
 
@@ -42,23 +492,101 @@ def object_read(name: str):
     - **REDIS_HOST** (str): The hostname of the redis server.
     - **REDIS_PORT** (int): The port number of the redis server (default to {default_port}).
     - **REDIS_DB** (int): The database number for object storage (default to {default_db}).
+    - **REDIS_SPILL_DIRECTORY** (str): The directory of the spilled objects.
   :param name: name of the object
   :return: the stored value
   """
-  compressed = _redis().get(name)
-  return None if compressed is None else pickle.loads(gzip.decompress(compressed))
+  client = _redis()
+  value = client.get(name)
+  if value is None:
+    return None
+  source, is_arrow = _stored_source(name, client, value)
+  if is_arrow:
+    return pa.ipc.open_stream(source).read_all().to_pandas()
+  return pickle.load(source)
+
+
+def object_read_table(name: str) -> pa.Table | None:
+  f"""
+  Read a DataFrame stored in redis as an Arrow table, without converting it to pandas.
+  A DataFrame stored with the `none` codec in REDIS_SPILL_DIRECTORY is memory-mapped: its columns are
+  not copied, nor read before they are used.
+
+  :Environment Variables:
+    - **REDIS_HOST** (str): The hostname of the redis server.
+    - **REDIS_PORT** (int): The port number of the redis server (default to {default_port}).
+    - **REDIS_DB** (int): The database number for object storage (default to {default_db}).
+    - **REDIS_SPILL_DIRECTORY** (str): The directory of the spilled objects.
+  :param name: name of the object
+  :return: the stored DataFrame as an Arrow table, None if the object does not exist
+  """
+  client = _redis()
+  value = client.get(name)
+  if value is None:
+    return None
+  source, is_arrow = _stored_source(name, client, value)
+  if not is_arrow:
+    raise TypeError(f"{name} is not a DataFrame stored as Arrow IPC")
+  return pa.ipc.open_stream(source).read_all()
 
 
 def object_delete(name: str) -> str:
   f"""
-  Delete an object in redis
+  Delete an object in redis, including all its chunks
 
   :Environment Variables:
     - **REDIS_HOST** (str): The hostname of the redis server.
     - **REDIS_PORT** (int): The port number of the redis server (default to {default_port}).
     - **REDIS_DB** (int): The database number for object storage (default to {default_db}).
+    - **REDIS_SPILL_DIRECTORY** (str): The directory of the spilled objects.
   :param name: name of the object to delete
   :return: the name of the object deleted
   """
-  _redis().delete(name)
+  client = _redis()
+  value = client.get(name)
+  count = _chunk_count(value) if value is not None else None
+  keys = [_chunk_key(name, index) for index in range(count or 0)]
+  client.delete(name, *keys)
+  _remove_spill_file(value)
   return name
+
+
+def object_cleanup() -> list[str]:
+  f"""
+  Delete the files of REDIS_SPILL_DIRECTORY which are no longer referenced in redis, because their object
+  expired or was replaced, and the temporary files left by interrupted writes older than REDIS_EXPIRATION.
+
+  :Environment Variables:
+    - **REDIS_HOST** (str): The hostname of the redis server.
+    - **REDIS_PORT** (int): The port number of the redis server (default to {default_port}).
+    - **REDIS_DB** (int): The database number for object storage (default to {default_db}).
+    - **REDIS_EXPIRATION** (int): The expiration time of the object (default to {default_expiration}).
+    - **REDIS_SPILL_DIRECTORY** (str): The directory of the spilled objects.
+  :return: the paths of the deleted files
+  """
+  directory = _spill_directory()
+  if directory is None or not os.path.isdir(directory):
+    return []
+  client = _redis()
+  expiration = int(os.environ.get('REDIS_EXPIRATION', str(default_expiration)))
+  now = time.time()
+  deleted = []
+  for entry in os.scandir(directory):
+    try:
+      age = now - entry.stat().st_mtime
+    except FileNotFoundError:
+      continue
+    if entry.name.endswith(_temporary_suffix):
+      obsolete = age > expiration
+    elif entry.name.endswith(_spill_suffix):
+      name = unquote(entry.name[:-len(_spill_suffix)].rpartition(".")[0])
+      obsolete = age > _cleanup_grace and client.get(name) != _file_prefix + entry.name.encode()
+    else:
+      continue
+    if obsolete:
+      try:
+        os.remove(entry.path)
+        deleted.append(entry.path)
+      except FileNotFoundError:
+        pass
+  return deleted
@@ -81,5 +81,14 @@ class TestsJsonHelperFunctions(unittest.TestCase):
       dh.collect_city_information_from_files(self.urls).to_dict()
     )
 
+  def test_collect_all_information_from_files(self):
+    # Les DataFrames construits à partir des seuls champs utiles sont ceux des enregistrements complets
+    records = [dh.helper.get_poi_record(url) for url in self.urls]
+    region_df, department_df, city_df, category_df = dh.collect_all_information_from_files(self.urls)
+    self.assertEqual(dh._region_dataframe(records).to_dict(), region_df.to_dict())
+    self.assertEqual(dh._department_dataframe(records).to_dict(), department_df.to_dict())
+    self.assertEqual(dh._city_dataframe(records).to_dict(), city_df.to_dict())
+    self.assertEqual(set(dh._category_dataframe(records)['name']), set(category_df['name']))
+
     if __name__ == '__main__':
       unittest.main()
@@ -1,9 +1,15 @@
 import os
 import unittest
 import json
+import datetime
+import pandas as pd
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from sqlalchemy import create_engine
 from testcontainers.postgres import PostgresContainer
 import utils.database_helper as dh
 import utils.json_helper_functions as jhf
+from utils.point_of_interest_helper import PoiMetadata, PoiTable, Category, compare_pois, poi_content_hash
 
 
 class TestDatabase(unittest.TestCase):
@@ -42,13 +48,255 @@ class TestDatabase(unittest.TestCase):
     self.assertEqual("Le chat, la goutte d'eau et le frigo (titre provisoire)", pois[0].name)
     self.assertEqual('MARCHE DE NOEL PLACE DU CAPITOLE', pois[1].name)
 
-  def _initialize_db(self):
+  def test_iter_pois_with_server_side_cursor(self):
+    self._initialize_db()
+    pois = dh.iter_pois_from_db(self.engine, fetch_size=2)
+    self.assertNotIsInstance(pois, list)
+    self.assertEqual([self._poi1.id, self._poi2.id, self._poi3.id], [poi.id for poi in pois])
+    self.assertEqual(
+      ["Le chat, la goutte d'eau et le frigo (titre provisoire)", 'MARCHE DE NOEL PLACE DU CAPITOLE'],
+      [poi.name for poi in dh.iter_pois_from_db(self.engine, 'CulturalEvent', fetch_size=1)]
+    )
+
+  def test_iter_poi_rows_projection(self):
+    self._initialize_db()
+    rows = list(dh.iter_poi_rows_from_db(self.engine, ('dt_poi_id', 'latitude', 'longitude'), fetch_size=2))
+    poi = self._poi1
+    self.assertEqual((poi.id, poi.latitude, poi.longitude), rows[0])
+    self.assertEqual(3, len(rows))
+    rows = list(dh.iter_poi_rows_from_db(self.engine, ('dt_poi_id', 'dt_updated_at'), category='CulturalEvent'))
+    self.assertEqual([self._poi1.id, self._poi3.id], [poi_id for poi_id, _ in rows])
+    with self.assertRaises(ValueError):
+      list(dh.iter_poi_rows_from_db(self.engine, ('dt_poi_id', 'dt_poi_id; DROP TABLE city')))
+
+  def test_compare_pois_in_db(self):
+    self._initialize_db()
+    unchanged, updated, touched, new = self._poi1, self._poi2, self._poi3, self._create_poi('3/31/33-3106eeed-0b75-3acf-a5a9-6fb1a59a8cfe.json')
+    updated.updated_at = updated.updated_at + datetime.timedelta(days=1)
+    updated.name = 'Nouveau nom'
+    updated.content_hash = poi_content_hash(updated)
+    touched.updated_at = touched.updated_at + datetime.timedelta(days=1)
+    new.id = 'NEW\tID\\1'
+    new.content_hash = poi_content_hash(new)
+    table = PoiTable.from_pois([unchanged, updated, touched, new])
+    to_create, to_update = dh.compare_pois_in_db(self.engine, table, page_size=2)
+    self.assertEqual([new.id], list(to_create.ids))
+    self.assertEqual([updated.id], list(to_update.ids))
+    expected_create, expected_update = compare_pois(PoiTable.from_pois(dh.iter_pois_from_db(self.engine)), table)
+    self.assertEqual(list(expected_create.ids), list(to_create.ids))
+    self.assertEqual(list(expected_update.ids), list(to_update.ids))
+    self.assertEqual(([], []), dh.diff_pois_in_db(self.engine, []))
+
+  def test_content_hash_round_trip(self):
+    self._initialize_db()
+    stored = {poi.id: poi.content_hash for poi in dh.iter_pois_from_db(self.engine)}
+    self.assertEqual(poi_content_hash(self._poi1), stored[self._poi1.id])
+
+  def test_add_pois_to_db(self):
+    self._initialize_db()
+    expected = sorted((poi.to_dict() for poi in dh.iter_pois_from_db(self.engine)), key=lambda poi: poi['id'])
+    expected_links = self._category_links()
+    self.engine.close()
+    self.tearDown()
+    self.setUp()
+    self._initialize_db(pois=False)
+    cache = dh.DimensionCache()
+    dh.add_pois_to_db(self.engine, [self._poi1, self._poi2], page_size=1, cache=cache)
+    dh.add_pois_to_db(self.engine, PoiTable.from_pois([self._poi2, self._poi3]), cache=cache)
+    pois = sorted((poi.to_dict() for poi in dh.iter_pois_from_db(self.engine)), key=lambda poi: poi['id'])
+    self.assertEqual(expected, pois)
+    self.assertEqual(expected_links, self._category_links())
+
+  def test_write_pois_parallel(self):
+    self._initialize_db()
+    expected = sorted((poi.to_dict() for poi in dh.iter_pois_from_db(self.engine)), key=lambda poi: poi['id'])
+    expected_links = self._category_links()
+    self.engine.close()
+    self.tearDown()
+    self.setUp()
+    self._initialize_db(pois=False)
+    pool = ThreadedConnectionPool(1, 2, dsn=self.engine.dsn, password=os.environ["POSTGRES_PASSWORD"])
+    try:
+      rate = dh.write_pois_parallel(pool, [self._poi1, self._poi2, self._poi3], "insert", workers=2, sub_batch_size=1)
+      self.assertGreater(rate, 0)
+      pois = sorted((poi.to_dict() for poi in dh.iter_pois_from_db(self.engine)), key=lambda poi: poi['id'])
+      self.assertEqual(expected, pois)
+      self.assertEqual(expected_links, self._category_links())
+      renamed = self._poi2
+      renamed.name = 'Nouveau nom'
+      dh.write_pois_parallel(pool, [self._poi1, renamed], "update", workers=2)
+      self.assertEqual('Nouveau nom', {poi.id: poi for poi in dh.iter_pois_from_db(self.engine)}[renamed.id].name)
+      self.assertEqual(expected_links, self._category_links())
+      # Un sous-lot en échec ne vide pas le cache partagé par les autres sous-lots
+      cache = dh.DimensionCache()
+      invalid = self._poi3
+      invalid.name = None
+      with self.assertRaises(psycopg2.Error):
+        dh.write_pois_parallel(pool, [self._poi1, invalid], "update", workers=2, sub_batch_size=1, cache=cache)
+      self.assertTrue(cache.loaded)
+      self.assertEqual({poi.city.id for poi in (self._poi1, self._poi2, self._poi3)}, cache.cities)
+    finally:
+      pool.closeall()
+
+  def test_dimension_cache(self):
+    self._initialize_db(pois=False)
+    cache = dh.DimensionCache()
+    poi = self._poi1
+    dh.add_pois_to_db(self.engine, [poi], cache=cache)
+    self.assertEqual({poi.city.id}, cache.cities)
+    with self.engine.cursor() as cursor:
+      cursor.execute("SELECT name, dt_category_id FROM category")
+      self.assertEqual(dict(cursor.fetchall()), cache.categories)
+    # Un second cache lit les dimensions déjà présentes au lieu de les insérer à nouveau
+    other = dh.DimensionCache()
+    with self.engine.cursor() as cursor:
+      self.assertEqual(cache.categories, other.ensure(cursor, PoiTable.from_pois([poi])))
+      self.assertEqual(cache.cities, other.cities)
+    self.engine.rollback()
+    # Les dimensions d'une transaction annulée ne sont pas mises en cache
+    invalid = self._poi2
+    invalid.name = None
+    with self.assertRaises(psycopg2.Error):
+      dh.add_pois_to_db(self.engine, [invalid], cache=cache)
+    self.assertTrue(cache.loaded)
+    self.assertEqual({poi.city.id}, cache.cities)
+    self.assertEqual({}, cache.pending)
+    dh.add_pois_to_db(self.engine, [self._poi2], cache=cache)
+    self.assertEqual({poi.city.id, self._poi2.city.id}, cache.cities)
+
+  def test_update_pois_in_db(self):
+    self._initialize_db()
+    renamed, recategorized = self._poi1, self._poi2
+    renamed.name = 'Nouveau nom'
+    removed = recategorized.categories[0]
+    recategorized.categories = recategorized.categories[1:] + [Category(name='NewCategory', id=None)]
+    link_ids = self._link_ids()
+    dh.update_pois_in_db(self.engine, [renamed, recategorized], page_size=1)
+    pois = {poi.id: poi for poi in dh.iter_pois_from_db(self.engine)}
+    self.assertEqual('Nouveau nom', pois[renamed.id].name)
+    expected = sorted((recategorized.id, category.name) for category in recategorized.categories)
+    self.assertEqual(expected, [link for link in self._category_links() if link[0] == recategorized.id])
+    # Les liens inchangés ne sont ni supprimés ni réinsérés
+    unchanged = {poi_id: ids for poi_id, ids in link_ids.items() if poi_id != recategorized.id}
+    self.assertEqual(unchanged, {poi_id: ids for poi_id, ids in self._link_ids().items() if poi_id != recategorized.id})
+    self.assertEqual(len(recategorized.categories) - 1, len(link_ids[recategorized.id] & self._link_ids()[recategorized.id]))
+    self.assertNotIn((recategorized.id, removed.name), self._category_links())
+
+  def _link_ids(self):
+    with self.engine.cursor() as cursor:
+      cursor.execute("SELECT dt_poi_id, id FROM category_point_of_interest")
+      links = {}
+      for poi_id, link_id in cursor.fetchall():
+        links.setdefault(poi_id, set()).add(link_id)
+      return links
+
+  def _category_links(self):
+    with self.engine.cursor() as cursor:
+      cursor.execute(
+        """
+        SELECT link.dt_poi_id, category.name FROM category_point_of_interest AS link
+        JOIN category ON category.dt_category_id = link.dt_category_id
+        ORDER BY link.dt_poi_id, category.name
+        """
+      )
+      return cursor.fetchall()
+
+  def test_save_dataframe_with_copy(self):
+    engine = create_engine("postgresql+psycopg2://", creator=dh.connect_to_db_from_env)
+    df = pd.DataFrame({
+      'id': ['kb:1', 'kb:2', 'kb:3'],
+      'name': ['Tab\tet\nretour', 'Barre \\ oblique', None],
+      'rating': [4.5, float('nan'), 3.0],
+      'count': [1, 2, 3],
+    })
+    dh.save_dataframe_to_postgres(df, 'copy_test', engine, method='copy')
+    dh.save_dataframe_to_postgres(df, 'insert_test', engine)
+    copied = pd.read_sql('SELECT * FROM copy_test ORDER BY id', engine)
+    pd.testing.assert_frame_equal(pd.read_sql('SELECT * FROM insert_test ORDER BY id', engine), copied)
+    pd.testing.assert_frame_equal(df, copied)
+    dh.save_dataframe_to_postgres(df, 'copy_test', engine, if_exists='append', method='copy')
+    self.assertEqual(6, len(pd.read_sql('SELECT * FROM copy_test', engine)))
+    dh.save_dataframe_to_postgres(df.head(1), 'copy_test', engine, method='copy')
+    self.assertEqual(1, len(pd.read_sql('SELECT * FROM copy_test', engine)))
+    engine.dispose()
+    # Les lignes sont converties au fil des lectures
+    rows = iter([('a', None), ('b\tc', 1), ('d', 2)])
+    stream = dh._CopyStream(rows)
+    self.assertEqual('a\t\\', stream.read(3))
+    # Le reste de la première ligne suffit à la lecture suivante : la deuxième n'est pas convertie
+    self.assertEqual('N\n', stream.read(2))
+    self.assertEqual(('b\tc', 1), next(rows))
+    self.assertEqual('d\t2\n', stream.read())
+    self.assertEqual('', stream.read(10))
+
+  def test_migrate_database(self):
+    self._initialize_db()
+    self.assertEqual([version for version, _, _ in dh.schema_migrations], dh.migrate_database(self.engine))
+    self.assertEqual([], dh.migrate_database(self.engine))
+    # Sur des tables de test, PostgreSQL préfère les parcours séquentiels : ils sont désactivés
+    # pour vérifier que les requêtes fréquentes peuvent utiliser les index
+    with self.engine.cursor() as cursor:
+      cursor.execute("SET enable_seqscan = off")
+    find_cities = """
+      SELECT DISTINCT city.name FROM point_of_interest AS poi
+      LEFT JOIN category_point_of_interest cpoi on poi.dt_poi_id = cpoi.dt_poi_id
+      LEFT JOIN category on cpoi.dt_category_id = category.dt_category_id
+      LEFT JOIN city on poi.dt_city_id = city.dt_city_id
+      WHERE city.name LIKE %s and category.name=%s
+    """
+    indexes = dh.query_plan_indexes(self.engine, find_cities, ('Tou%', 'CulturalEvent'))
+    self.assertIn('city_name_pattern_idx', indexes)
+    self.assertTrue({'category_name_idx', 'category_poi_category_idx'} <= indexes, indexes)
+    find_poi = find_cities.replace('SELECT DISTINCT city.name', 'SELECT poi.*').replace('LIKE', '=')
+    self.assertIn('city_name_pattern_idx', dh.query_plan_indexes(self.engine, find_poi, ('Toulouse', 'CulturalEvent')))
+    query, parameters = dh._poi_rows_query(dh.poi_columns, 'CulturalEvent')
+    self.assertTrue({'category_name_idx', 'category_poi_category_idx'} <= dh.query_plan_indexes(self.engine, query, parameters))
+    self.engine.rollback()
+
+  def test_migration_computes_poi_xy(self):
+    self._initialize_db()
+    dh.migrate_database(self.engine)
+    expected = {poi.id: (poi.x, poi.y) for poi in dh.iter_pois_from_db(self.engine)}
+    self.assertNotIn(None, [x for x, _ in expected.values()])
+    # POIs enregistrés avant la migration 3 : leurs coordonnées sont calculées par la migration
+    with self.engine.cursor() as cursor:
+      cursor.execute("UPDATE point_of_interest SET x = NULL, y = NULL")
+      cursor.execute("DELETE FROM schema_migration WHERE version = 3")
+    self.engine.commit()
+    self.assertEqual([3], dh.migrate_database(self.engine))
+    self.assertEqual(expected, {poi.id: (poi.x, poi.y) for poi in dh.iter_pois_from_db(self.engine)})
+
+  def test_poi_watermarks(self):
+    self._initialize_db()
+    self.assertEqual({}, dh.get_poi_watermarks(self.engine))
+    dh.save_poi_watermarks(self.engine, [
+      PoiMetadata('A', '2024-10-17T03:22:07.57Z', '0/0a/a.json'),
+      PoiMetadata('B', '2024-10-01T00:00:00Z', '1/17/b.json'),
+    ])
+    dh.save_poi_watermarks(self.engine, [PoiMetadata('B', '2024-11-08T20:00:38.905Z', '1/17/b.json')])
+    self.assertEqual({
+      '0/0a/a.json': '2024-10-17T03:22:07.57Z',
+      '1/17/b.json': '2024-11-08T20:00:38.905Z',
+    }, dh.get_poi_watermarks(self.engine))
+
+  def test_archive_validators(self):
+    self._initialize_db(pois=False)
+    dh.migrate_database(self.engine)
+    self.assertEqual({}, dh.get_archive_validators(self.engine))
+    dh.store_archive_validators(self.engine, {'etag': '"v1"', 'last_modified': 'Wed, 01 Jan 2025 00:00:00 GMT'})
+    dh.store_archive_validators(self.engine, {'etag': '"v2"', 'last_modified': None})
+    dh.store_archive_validators(self.engine, {})
+    self.assertEqual({'etag': '"v2"', 'last_modified': None}, dh.get_archive_validators(self.engine))
+
+  def _initialize_db(self, pois=True):
     init_script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database_create.sql')
     with open(init_script_path, 'r') as file:
       init_script = file.read()
       with self.engine.cursor() as cursor:
         cursor.execute(init_script)
         self.engine.commit()
+    if not pois:
+      return
     pois = [self._poi1, self._poi2, self._poi3]
     for poi in pois:
       dh.add_poi_to_db(self.engine, poi)
@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.downloader import DownloadStatus, download_datatourisme_archive, check_archive_integrity, \
+  read_archive_validators, save_archive_validators
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+  """
+  Stand-in du flux DataTourisme : gère ETag, Range et peut couper la connexion au milieu d'une réponse
+  """
+  payload = os.urandom(300000)
+  etag = '"v1"'
+  content_type = 'application/zip'
+  interrupt_after = None
+  requests = []
+
+  def do_GET(self):
+    FeedHandler.requests.append(dict(self.headers))
+    if self.headers.get('If-None-Match') == self.etag:
+      self.send_response(304)
+      self.end_headers()
+      return
+    start = 0
+    range_header = self.headers.get('Range')
+    if range_header and self.headers.get('If-Range', self.etag) == self.etag:
+      start = int(range_header.split('=')[1].split('-')[0])
+      self.send_response(206)
+      self.send_header('Content-Range', f'bytes {start}-{len(self.payload) - 1}/{len(self.payload)}')
+    else:
+      self.send_response(200)
+    body = self.payload[start:]
+    self.send_header('Content-Type', self.content_type)
+    self.send_header('Content-Length', str(len(body)))
+    self.send_header('ETag', self.etag)
+    self.end_headers()
+    if FeedHandler.interrupt_after is not None:
+      self.wfile.write(body[:FeedHandler.interrupt_after])
+      FeedHandler.interrupt_after = None
+      self.close_connection = True
+      return
+    self.wfile.write(body)
+
+  def log_message(self, format, *args):
+    pass
+
+
+class TestsDownloader(unittest.TestCase):
+  @classmethod
+  def setUpClass(cls):
+    cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+    threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+    cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}/feed.zip'
+
+  @classmethod
+  def tearDownClass(cls):
+    cls.server.shutdown()
+    cls.server.server_close()
+
+  def setUp(self):
+    self.temp_dir = tempfile.mkdtemp()
+    self.download_path = os.path.join(self.temp_dir, 'raw_archive')
+    self.validators_path = os.path.join(self.temp_dir, 'validators.json')
+    self.file_path = os.path.join(self.download_path, 'archive.zip')
+    FeedHandler.requests = []
+    FeedHandler.interrupt_after = None
+    FeedHandler.content_type = 'application/zip'
+
+  def tearDown(self):
+    shutil.rmtree(self.temp_dir)
+
+  def _download(self):
+    return download_datatourisme_archive(self.url, self.download_path, validators_path=self.validators_path,
+                                         chunk_size=65536, timeout=5)
+
+  def test_download_with_checksum(self):
+    self.assertEqual(DownloadStatus.DOWNLOADED, self._download())
+    with open(self.file_path, 'rb') as file:
+      self.assertEqual(FeedHandler.payload, file.read())
+    self.assertTrue(check_archive_integrity(self.file_path))
+    self.assertFalse(os.path.exists(self.file_path + '.part'))
+
+  def test_corrupted_archive_is_detected(self):
+    self._download()
+    with open(self.file_path, 'r+b') as file:
+      file.write(b'corrupted')
+    self.assertFalse(check_archive_integrity(self.file_path))
+
+  def test_unchanged_feed_is_not_downloaded(self):
+    self._download()
+    save_archive_validators(self.download_path, self.validators_path)
+    shutil.rmtree(self.download_path)
+    self.assertEqual(DownloadStatus.NOT_MODIFIED, self._download())
+    self.assertEqual('"v1"', FeedHandler.requests[-1]['If-None-Match'])
+    self.assertFalse(os.path.exists(self.file_path))
+
+  def test_unchanged_feed_with_stored_validators(self):
+    self._download()
+    validators = read_archive_validators(self.download_path)
+    shutil.rmtree(self.download_path)
+    status = download_datatourisme_archive(self.url, self.download_path, validators=validators, chunk_size=65536, timeout=5)
+    self.assertEqual(DownloadStatus.NOT_MODIFIED, status)
+    self.assertEqual('"v1"', FeedHandler.requests[-1]['If-None-Match'])
+
+  def test_validators_are_not_saved_before_processing(self):
+    self._download()
+    shutil.rmtree(self.download_path)
+    self.assertEqual(DownloadStatus.DOWNLOADED, self._download())
+
+  def test_interrupted_download_is_resumed(self):
+    FeedHandler.interrupt_after = 131072
+    self.assertEqual(DownloadStatus.DOWNLOADED, self._download())
+    self.assertEqual(2, len(FeedHandler.requests))
+    self.assertEqual('bytes=131072-', FeedHandler.requests[1]['Range'])
+    with open(self.file_path, 'rb') as file:
+      self.assertEqual(FeedHandler.payload, file.read())
+    self.assertTrue(check_archive_integrity(self.file_path))
+
+  def test_unexpected_content_type(self):
+    FeedHandler.content_type = 'text/html'
+    self.assertEqual(DownloadStatus.FAILED, self._download())
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+import geopandas as gpd
+import numpy as np
+from shapely.geometry import box
+from utils.france_boundary import build_france_boundary, load_france_boundary, default_boundary_path
+from utils.json_helper_functions import france_mask
+
+
+class TestsFranceBoundary(unittest.TestCase):
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.shp_path = os.path.join(self.tmp_dir.name, 'countries.shp')
+    self.wkb_path = os.path.join(self.tmp_dir.name, 'france_boundary.wkb')
+    world = gpd.GeoDataFrame({'name': ['France', 'Spain']},
+                             geometry=[box(-5.0, 42.5, 8.0, 51.0), box(-9.0, 36.0, 3.0, 42.5)], crs='EPSG:4326')
+    world.to_file(self.shp_path, engine='pyogrio')
+
+  def tearDown(self):
+    load_france_boundary.cache_clear()
+    self.tmp_dir.cleanup()
+
+  def test_build_and_load(self):
+    built = build_france_boundary(self.shp_path, self.wkb_path, tolerance=0.1)
+    self.assertTrue(os.path.isfile(f"{self.wkb_path}.sha256"))
+    loaded = load_france_boundary(self.wkb_path)
+    self.assertTrue(loaded.equals(built))
+    self.assertEqual((-5.0, 42.5, 8.0, 51.0), loaded.bounds)
+    self.assertIs(loaded, load_france_boundary(self.wkb_path))
+
+  def test_invalid_checksum(self):
+    build_france_boundary(self.shp_path, self.wkb_path)
+    with open(self.wkb_path, 'ab') as file:
+      file.write(b'\x00')
+    with self.assertRaises(ValueError):
+      load_france_boundary(self.wkb_path)
+
+  def test_missing_country(self):
+    world = gpd.read_file(self.shp_path, engine='pyogrio')
+    world[world['name'] != 'France'].to_file(self.shp_path, engine='pyogrio')
+    with self.assertRaises(ValueError):
+      build_france_boundary(self.shp_path, self.wkb_path)
+
+  def test_default_boundary(self):
+    self.assertTrue(os.path.isfile(default_boundary_path))
+    boundary = load_france_boundary()
+    # Paris, Lyon, Londres, Madrid
+    latitudes = [48.8566, 45.764, 51.5072, 40.4168]
+    longitudes = [2.3522, 4.8357, -0.1276, -3.7038]
+    np.testing.assert_array_equal([True, True, False, False], france_mask(latitudes, longitudes, boundary))
+
+
+if __name__ == '__main__':
+  unittest.main()
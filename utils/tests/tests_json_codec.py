@@ -0,0 +1,47 @@
+import os
+import unittest
+from utils import json_codec
+
+
+class TestsJsonCodec(unittest.TestCase):
+  def setUp(self):
+    self.file_path = os.path.join(os.path.dirname(__file__), 'dt_feed_example', 'data', 'objects', '0', '0a',
+                                  '49-0a1a7c7e-b2b1-3bb8-b4a2-0be8c160333a.json')
+
+  def tearDown(self):
+    json_codec.select_backend()
+
+  def test_stdlib_is_always_available(self):
+    self.assertIn('json', json_codec.backends)
+
+  def test_unknown_backend(self):
+    with self.assertRaises(ValueError):
+      json_codec.select_backend('unknown')
+
+  def test_all_backends_round_trip(self):
+    data = {'id': 'FMAPDL049V50HL4Q', 'name': 'CHÂTEAU', 'latitude': 47.260621, 'categories': [], 'rating': None}
+    for name in json_codec.backends:
+      with self.subTest(backend=name):
+        self.assertEqual(name, json_codec.select_backend(name))
+        encoded = json_codec.dumps(data)
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(data, json_codec.loads(encoded))
+        self.assertEqual(data, json_codec.loads(encoded.decode('utf-8')))
+
+  def test_all_backends_load_binary_file(self):
+    for name in json_codec.backends:
+      with self.subTest(backend=name):
+        json_codec.select_backend(name)
+        with open(self.file_path, 'rb') as file:
+          self.assertEqual('FMAPDL049V50HL4Q', json_codec.load(file)['dc:identifier'])
+
+  def test_all_backends_raise_decode_error(self):
+    for name in json_codec.backends:
+      with self.subTest(backend=name):
+        json_codec.select_backend(name)
+        with self.assertRaises(json_codec.DecodeError):
+          json_codec.loads(b'{"id": ')
+
+
+if __name__ == '__main__':
+  unittest.main()
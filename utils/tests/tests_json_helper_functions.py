@@ -1,8 +1,13 @@
 import unittest
 import os
 import json
+import shutil
+import tempfile
+import geopandas as gpd
+from shapely.geometry import box
 from datetime import datetime, timezone
 import utils.json_helper_functions as jhf
+from utils.point_of_interest_helper import PoiTable
 
 
 class TestsJsonHelperFunctions(unittest.TestCase):
@@ -68,6 +73,93 @@ class TestsJsonHelperFunctions(unittest.TestCase):
   def test_poi_coordinates(self):
     self.assertEqual((47.260621, -0.076107), jhf.get_poi_coordinates(self.file_path))
 
+  def test_poi_record(self):
+    record = jhf.get_poi_record(self.file_path)
+    self.assertEqual("FMAPDL049V50HL4Q", record.identifier)
+    self.assertEqual("Le chat, la goutte d'eau et le frigo (titre provisoire)", record.name)
+    self.assertEqual("2024-09-25", record.creation_date)
+    self.assertEqual(jhf.get_poi_update_date(self.file_path), record.update_date)
+    self.assertEqual(jhf.get_poi_category(self.file_path), record.categories)
+    self.assertEqual(('kb:France52', 'Pays de la Loire'), (record.region_id, record.region_name))
+    self.assertEqual(('kb:France5249', 'Maine-et-Loire'), (record.departement_id, record.departement_name))
+    self.assertEqual(('kb:49328', 'Saumur'), (record.city_id, record.city_name))
+    self.assertEqual("49400", record.postal_code)
+    self.assertEqual((47.260621, -0.076107), (record.latitude, record.longitude))
+
+  def test_poi_record_fields(self):
+    record = jhf.get_poi_record(self.file_path, ("region_id", "region_name"))
+    self.assertEqual(('kb:France52', 'Pays de la Loire'), (record.region_id, record.region_name))
+    self.assertEqual((None, None, None), (record.identifier, record.city_id, record.latitude))
+
+  def test_poi_record_malformed_field(self):
+    with open(self.file_path, 'r', encoding='utf-8') as file:
+      content = json.load(file)
+    content['isLocatedAt'][0]['schema:geo'] = {'schema:latitude': None, 'schema:longitude': 'inconnue'}
+    del content['isLocatedAt'][0]['schema:address'][0]['schema:postalCode']
+    path = os.path.join(tempfile.mkdtemp(), 'malformed.json')
+    with open(path, 'w', encoding='utf-8') as file:
+      json.dump(content, file)
+    record = jhf.get_poi_record(path)
+    self.assertEqual((None, None, None), (record.latitude, record.longitude, record.postal_code))
+    self.assertEqual(('kb:France52', 'Pays de la Loire'), (record.region_id, record.region_name))
+    shutil.rmtree(os.path.dirname(path))
+
+
+class TestsJsonHelperArchive(unittest.TestCase):
+  @classmethod
+  def setUpClass(cls):
+    data_path = os.path.join(os.path.dirname(__file__), 'dt_feed_example', 'data')
+    cls.temp_dir = tempfile.mkdtemp()
+    cls.zip_path = shutil.make_archive(os.path.join(cls.temp_dir, 'archive'), 'zip', data_path)
+    cls.metadata = jhf.get_all_poi_metadata(cls.zip_path)
+
+  @classmethod
+  def tearDownClass(cls):
+    shutil.rmtree(cls.temp_dir)
+
+  def test_metadata(self):
+    self.assertEqual(5, len(self.metadata))
+
+  def test_iter_pois(self):
+    pois = jhf.iter_pois(self.zip_path, self.metadata)
+    self.assertEqual("FMAPDL049V50HL4Q", next(pois).id)
+    self.assertEqual(4, len(list(pois)))
+
+  def test_iter_poi_batches(self):
+    batches = list(jhf.iter_poi_batches(self.zip_path, self.metadata, batch_size=2))
+    self.assertEqual([2, 2, 1], [len(batch) for batch in batches])
+    self.assertEqual(
+      [poi.id for poi in jhf.get_all_poi(self.zip_path, self.metadata)],
+      [poi.id for batch in batches for poi in batch]
+    )
+
+  def test_get_all_poi_parallel(self):
+    pois = jhf.get_all_poi_parallel(self.zip_path, self.metadata, batch_size=2)
+    self.assertEqual(
+      sorted(poi.id for poi in jhf.get_all_poi(self.zip_path, self.metadata)),
+      sorted(poi.id for poi in pois)
+    )
+
+  def test_iter_poi_batches_parallel(self):
+    batches = list(jhf.iter_poi_batches_parallel(self.zip_path, self.metadata, batch_size=2, processes=2))
+    self.assertEqual([1, 2, 2], sorted(len(batch) for batch in batches))
+
+  def test_filter_poi_in_france(self):
+    occitanie = gpd.GeoDataFrame(geometry=[box(0.0, 42.0, 4.0, 45.0)])
+    pois = jhf.get_all_poi(self.zip_path, self.metadata)
+    pois[1].latitude, pois[1].longitude = None, None
+    self.assertEqual(
+      [False, False, True, True, True],
+      list(jhf.poi_in_france_mask(pois, occitanie))
+    )
+    self.assertEqual(
+      ['FMAMID031V50RLX8', 'PCULAR0110000002', 'PCUMID031V50EYDF'],
+      [poi.id for poi in jhf.filter_poi_in_france(pois, occitanie.geometry[0])]
+    )
+    table = jhf.filter_poi_in_france(PoiTable.from_pois(pois), occitanie.geometry[0])
+    self.assertIsInstance(table, PoiTable)
+    self.assertEqual(['FMAMID031V50RLX8', 'PCULAR0110000002', 'PCUMID031V50EYDF'], list(table.ids))
+
 
 if __name__ == '__main__':
   unittest.main()
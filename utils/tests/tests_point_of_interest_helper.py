@@ -0,0 +1,168 @@
+import pickle
+import unittest
+from datetime import datetime, timezone, timedelta
+import numpy as np
+from utils.point_of_interest_helper import PoiMetadata, select_updated_metadata, Poi, PoiTable, City, Departement, Region, Category, compare_pois, geography_registry, poi_content_hash, lambert93_xy, poi_xy
+
+
+class TestsPointOfInterestHelper(unittest.TestCase):
+  def setUp(self):
+    self.metadata = [
+      PoiMetadata('A', '2024-10-17T03:22:07.57Z', '0/0a/a.json'),
+      PoiMetadata('B', '2024-11-08T20:00:38.905Z', '1/17/b.json'),
+      PoiMetadata('C', '2024-11-06T20:00:38.554Z', '3/31/c.json'),
+    ]
+
+  def test_select_updated_metadata_without_watermarks(self):
+    self.assertEqual(['A', 'B', 'C'], [m.label for m in select_updated_metadata(self.metadata, {})])
+
+  def test_select_updated_metadata(self):
+    watermarks = {
+      '0/0a/a.json': '2024-10-17T03:22:07.57Z',
+      '1/17/b.json': '2024-10-01T00:00:00Z',
+    }
+    self.assertEqual(['B', 'C'], [m.label for m in select_updated_metadata(self.metadata, watermarks)])
+
+
+
+class TestsGeographyRegistry(unittest.TestCase):
+  def setUp(self):
+    self.city = {'name': 'Angers', 'id': 'kb:49007',
+                 'departement': {'name': 'Maine-et-Loire', 'id': 'kb:France5249',
+                                 'region': {'name': 'Pays de la Loire', 'id': 'kb:France52'}}}
+
+  def test_from_dict_is_interned(self):
+    first = City.from_dict(dict(self.city))
+    second = City.from_dict(dict(self.city))
+    self.assertIs(first, second)
+    self.assertIs(first.departement.region, geography_registry.region('Pays de la Loire', 'kb:France52'))
+    self.assertIsNot(first, City.from_dict({**self.city, 'id': 'kb:49099'}))
+    self.assertIs(Category.from_dict({'name': 'Museum', 'id': None}), geography_registry.category('Museum', None))
+
+  def test_pickle_is_interned(self):
+    city = City.from_dict(dict(self.city))
+    self.assertIs(city, pickle.loads(pickle.dumps(city)))
+
+  def test_clear(self):
+    city = City.from_dict(dict(self.city))
+    geography_registry.clear()
+    self.assertEqual(0, len(geography_registry))
+    self.assertIsNot(city, City.from_dict(dict(self.city)))
+
+  def test_slots(self):
+    city = City.from_dict(dict(self.city))
+    poi = Poi(id='A', name='A', rating=None, created_at=None, updated_at=None, latitude=None, longitude=None,
+              postal_code='49000', city=city, categories=[])
+    for obj in (poi, city, city.departement, city.departement.region, PoiMetadata('A', None, 'a.json')):
+      self.assertFalse(hasattr(obj, '__dict__'))
+
+
+def _poi(poi_id, city_id, categories, updated_at, latitude=47.0):
+  region = Region(name='Pays de la Loire', id='kb:France52')
+  departement = Departement(name='Maine-et-Loire', id='kb:France5249', region=region)
+  city = City(name=f'Ville {city_id}', id=city_id, departement=departement)
+  return Poi(id=poi_id, name=f'POI {poi_id}', rating=None, created_at=datetime(2020, 1, 1), updated_at=updated_at,
+             latitude=latitude, longitude=-0.5, postal_code='49000', city=city,
+             categories=[Category(name=name, id=None) for name in categories])
+
+
+class TestsPoiTable(unittest.TestCase):
+  def setUp(self):
+    self.pois = [
+      _poi('A', 'kb:1', ['PlaceOfInterest', 'Museum'], datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=1)))),
+      _poi('B', 'kb:2', [], datetime(2024, 2, 1), latitude=None),
+      _poi('C', 'kb:1', ['Museum'], datetime(2024, 3, 1)),
+    ]
+    self.table = PoiTable.from_pois(self.pois)
+
+  def test_dictionary_encoding(self):
+    self.assertEqual(3, len(self.table))
+    self.assertEqual(['kb:1', 'kb:2'], [city.id for city in self.table.cities])
+    np.testing.assert_array_equal([0, 1, 0], self.table.city_codes)
+    self.assertIs(self.table.cities[0].departement, self.table.cities[1].departement)
+    self.assertEqual(['PlaceOfInterest', 'Museum'], [category.name for category in self.table.categories])
+    np.testing.assert_array_equal([0, 2, 2, 3], self.table.category_offsets)
+    self.assertTrue(np.isnan(self.table.latitudes[1]))
+
+  def test_round_trip(self):
+    for poi, restored in zip(self.pois, self.table):
+      self.assertEqual(poi.id, restored.id)
+      self.assertEqual(poi.updated_at.replace(tzinfo=None), restored.updated_at)
+      self.assertEqual(poi.latitude, restored.latitude)
+      self.assertEqual(poi.city.departement.region.id, restored.city.departement.region.id)
+      self.assertEqual([c.name for c in poi.categories], [c.name for c in restored.categories])
+
+  def test_take_and_concat(self):
+    selected = self.table[np.array([False, True, True])]
+    self.assertEqual(['B', 'C'], [poi.id for poi in selected])
+    self.assertEqual([[], ['Museum']], [[c.name for c in poi.categories] for poi in selected])
+    merged = PoiTable.concat([self.table[2:], PoiTable.from_pois([_poi('D', 'kb:3', ['Museum', 'Castle'], datetime(2024, 4, 1))])])
+    self.assertEqual(['C', 'D'], [poi.id for poi in merged])
+    self.assertEqual(['kb:1', 'kb:3'], [city.id for city in merged.cities])
+    self.assertEqual(['Museum', 'Castle'], [category.name for category in merged.categories])
+    self.assertEqual([['Museum'], ['Museum', 'Castle']], [[c.name for c in poi.categories] for poi in merged])
+
+  def test_lambert93_xy(self):
+    x, y = lambert93_xy([43.6, 91.0, np.nan, -89.999], [1.44, 0.0, 0.0, 0.0])
+    np.testing.assert_array_equal([574008, 6279127], [x[0], y[0]])
+    self.assertTrue(np.isnan(x[1:]).all() and np.isnan(y[1:]).all())
+    expected_x, expected_y = lambert93_xy([47.0], [-0.5])
+    np.testing.assert_array_equal([expected_x[0], np.nan, expected_x[0]], self.table.x)
+    self.assertEqual((int(expected_x[0]), int(expected_y[0])), (self.table.poi(0).x, self.table.poi(0).y))
+    self.assertEqual((None, None), poi_xy(self.pois[1]))
+    # Les coordonnées déjà calculées ne sont pas projetées à nouveau
+    self.pois[2].x, self.pois[2].y = 1, 2
+    self.assertEqual((1, 2), poi_xy(self.pois[2]))
+    table = PoiTable.from_pois(self.pois)
+    np.testing.assert_array_equal([expected_x[0], np.nan, 1], table.x)
+    np.testing.assert_array_equal(table.y, PoiTable.from_bytes(table.to_bytes()).y)
+
+  def test_bytes_round_trip(self):
+    self.pois[1].city = None
+    self.pois[2].rating = 4.5
+    table = PoiTable.from_pois(self.pois)
+    restored = PoiTable.from_bytes(table.to_bytes())
+    self.assertEqual([poi.to_dict() for poi in table], [poi.to_dict() for poi in restored])
+    self.assertIs(restored.cities[0], table.cities[0])
+    np.testing.assert_array_equal([0, -1, 0], restored.city_codes)
+    self.assertEqual(0, len(PoiTable.from_bytes(PoiTable.from_pois([]).to_bytes())))
+
+  def test_compare_tables(self):
+    db_pois = [_poi('A', 'kb:1', [], datetime(2024, 1, 1)), _poi('C', 'kb:1', [], datetime(2024, 1, 1))]
+    expected_create, expected_update = compare_pois(db_pois, list(self.table))
+    to_create, to_update = compare_pois(db_pois, self.table)
+    self.assertIsInstance(to_create, PoiTable)
+    self.assertEqual([poi.id for poi in expected_create], list(to_create.ids))
+    self.assertEqual([poi.id for poi in expected_update], list(to_update.ids))
+    self.assertEqual(['B'], list(to_create.ids))
+    self.assertEqual(['C'], list(to_update.ids))
+    to_create, to_update = compare_pois([], self.table)
+    self.assertEqual(3, len(to_create))
+    self.assertEqual(0, len(to_update))
+
+  def test_content_hash(self):
+    poi = self.pois[0]
+    content_hash = poi_content_hash(poi)
+    self.assertEqual(32, len(content_hash))
+    poi.updated_at = datetime(2025, 1, 1)
+    poi.categories = list(reversed(poi.categories))
+    self.assertEqual(content_hash, poi_content_hash(poi))
+    poi.name = 'Autre nom'
+    self.assertNotEqual(content_hash, poi_content_hash(poi))
+
+  def test_compare_skips_unchanged_content(self):
+    db_pois = [_poi('A', 'kb:1', ['PlaceOfInterest', 'Museum'], datetime(2023, 1, 1)), _poi('C', 'kb:1', ['Museum'], datetime(2023, 1, 1))]
+    for poi in db_pois + self.pois:
+      poi.content_hash = poi_content_hash(poi)
+    self.pois[2].name = 'Nouveau nom'
+    self.pois[2].content_hash = poi_content_hash(self.pois[2])
+    for pois in (self.pois, PoiTable.from_pois(self.pois)):
+      to_create, to_update = compare_pois(db_pois, pois)
+      self.assertEqual(['B'], [poi.id for poi in to_create])
+      self.assertEqual(['C'], [poi.id for poi in to_update])
+    restored = PoiTable.from_bytes(PoiTable.from_pois(self.pois).to_bytes())
+    self.assertEqual([poi.content_hash for poi in self.pois], list(restored.content_hashes))
+
+
+if __name__ == '__main__':
+  unittest.main()
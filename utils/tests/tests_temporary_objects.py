@@ -1,9 +1,16 @@
+import gzip
 import os
+import pickle
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
 import unittest
 import time
 from testcontainers.redis import RedisContainer
 from testcontainers.core.waiting_utils import wait_for_logs
-from utils import object_store, object_read, object_delete
+from utils import object_store, object_read, object_delete, object_write, object_stream, object_cleanup, object_read_table
+from utils.temporary_objects import _redis, codecs
 
 
 class TestTemporaryObjects(unittest.TestCase):
@@ -42,6 +49,198 @@ class TestTemporaryObjects(unittest.TestCase):
     object_delete(name)
     self.assertEqual(None, object_read(name))
 
+  def test_store_and_read_chunked(self):
+    data = [os.urandom(100) for _ in range(1000)]
+    os.environ['REDIS_EXPIRATION'] = '3600'
+    os.environ['REDIS_CHUNK_SIZE'] = '10000'
+    os.environ['REDIS_PIPELINE_CHUNKS'] = '3'
+    try:
+      name = object_store('chunked', data)
+      chunk_keys = _redis().keys('chunked:chunk:*')
+      self.assertGreater(len(chunk_keys), 3)
+      self.assertEqual(data, object_read(name))
+      object_delete(name)
+      self.assertEqual(None, object_read(name))
+      self.assertEqual([], _redis().keys('chunked:chunk:*'))
+    finally:
+      del os.environ['REDIS_CHUNK_SIZE']
+      del os.environ['REDIS_PIPELINE_CHUNKS']
+
+  def test_write_and_stream(self):
+    parts = [os.urandom(5000) for _ in range(20)]
+    os.environ['REDIS_EXPIRATION'] = '3600'
+    os.environ['REDIS_CHUNK_SIZE'] = '8192'
+    try:
+      name = object_write('stream', iter(parts))
+      chunks = object_stream(name)
+      self.assertIsNotNone(chunks)
+      self.assertEqual(b''.join(parts), b''.join(chunks))
+      self.assertIsNone(object_stream('unknown'))
+    finally:
+      del os.environ['REDIS_CHUNK_SIZE']
+      object_delete('stream')
+
+  def test_failed_store_is_not_referenced(self):
+    class Unpicklable:
+      def __reduce__(self):
+        raise ValueError('unpicklable')
+    os.environ['REDIS_EXPIRATION'] = '3600'
+    with self.assertRaises(ValueError):
+      object_store('failed', [1, 2, Unpicklable()])
+    self.assertEqual(None, object_read('failed'))
+
+  def test_codecs(self):
+    data = {'pois': [f'POI {i}' for i in range(5000)], 'random': os.urandom(20000), 'array': np.arange(50000)}
+    os.environ['REDIS_EXPIRATION'] = '3600'
+    os.environ['REDIS_CHUNK_SIZE'] = '10000'
+    try:
+      for codec in codecs:
+        with self.subTest(codec=codec):
+          name = object_store(f'codec_{codec}', data, codec=codec)
+          read = object_read(name)
+          self.assertEqual(data['pois'], read['pois'])
+          self.assertEqual(data['random'], read['random'])
+          np.testing.assert_array_equal(data['array'], read['array'])
+          object_delete(name)
+      os.environ['REDIS_CODEC'] = 'zlib'
+      os.environ['REDIS_CODEC_LEVEL'] = '9'
+      self.assertEqual(data['pois'], object_read(object_store('codec_env', data))['pois'])
+      object_delete('codec_env')
+      with self.assertRaises(ValueError):
+        object_store('codec_unknown', data, codec='unknown')
+    finally:
+      for variable in ('REDIS_CHUNK_SIZE', 'REDIS_CODEC', 'REDIS_CODEC_LEVEL'):
+        os.environ.pop(variable, None)
+
+  def test_read_value_without_header(self):
+    data = list(range(100))
+    _redis().set('legacy', gzip.compress(pickle.dumps(data)), ex=3600)
+    self.assertEqual(data, object_read('legacy'))
+
+  def test_spill_to_directory(self):
+    big = [os.urandom(100) for _ in range(1000)]
+    small = list(range(100))
+    os.environ['REDIS_EXPIRATION'] = '3600'
+    os.environ['REDIS_CHUNK_SIZE'] = '10000'
+    os.environ['REDIS_SPILL_SIZE'] = '50000'
+    with tempfile.TemporaryDirectory() as directory:
+      os.environ['REDIS_SPILL_DIRECTORY'] = directory
+      try:
+        self.assertEqual(small, object_read(object_store('not_spilled', small)))
+        self.assertEqual([], os.listdir(directory))
+        name = object_store('spilled', big)
+        files = os.listdir(directory)
+        self.assertEqual(1, len(files))
+        self.assertEqual(b'file:' + files[0].encode(), _redis().get(name))
+        self.assertEqual(big, object_read(name))
+        # Replacing the object removes its previous file
+        object_store(name, big[:900])
+        self.assertEqual(1, len(os.listdir(directory)))
+        self.assertNotIn(files[0], os.listdir(directory))
+        self.assertEqual(big[:900], object_read(name))
+        object_delete(name)
+        self.assertEqual([], os.listdir(directory))
+        self.assertEqual(None, object_read(name))
+        object_delete('not_spilled')
+      finally:
+        for variable in ('REDIS_CHUNK_SIZE', 'REDIS_SPILL_SIZE', 'REDIS_SPILL_DIRECTORY'):
+          del os.environ[variable]
+
+  def test_spill_cleanup(self):
+    big = [os.urandom(100) for _ in range(1000)]
+    os.environ['REDIS_EXPIRATION'] = '3600'
+    os.environ['REDIS_SPILL_SIZE'] = '50000'
+    with tempfile.TemporaryDirectory() as directory:
+      os.environ['REDIS_SPILL_DIRECTORY'] = directory
+      try:
+        object_store('kept', big)
+        object_store('expired', big)
+        old = time.time() - 7200
+        for file in os.listdir(directory):
+          os.utime(os.path.join(directory, file), (old, old))
+        _redis().delete('expired')
+        open(os.path.join(directory, 'interrupted.spill.tmp'), 'wb').close()
+        os.utime(os.path.join(directory, 'interrupted.spill.tmp'), (old, old))
+        deleted = object_cleanup()
+        self.assertEqual(2, len(deleted))
+        self.assertEqual(1, len(os.listdir(directory)))
+        self.assertEqual(big, object_read('kept'))
+        object_delete('kept')
+      finally:
+        del os.environ['REDIS_SPILL_SIZE']
+        del os.environ['REDIS_SPILL_DIRECTORY']
+
+  def test_failed_spill_leaves_no_file(self):
+    class Unpicklable:
+      def __reduce__(self):
+        raise ValueError('unpicklable')
+    os.environ['REDIS_EXPIRATION'] = '3600'
+    os.environ['REDIS_SPILL_SIZE'] = '50000'
+    with tempfile.TemporaryDirectory() as directory:
+      os.environ['REDIS_SPILL_DIRECTORY'] = directory
+      try:
+        with self.assertRaises(ValueError):
+          object_store('failed_spill', [os.urandom(100) for _ in range(1000)] + [Unpicklable()])
+        self.assertEqual([], os.listdir(directory))
+        self.assertEqual(None, object_read('failed_spill'))
+      finally:
+        del os.environ['REDIS_SPILL_SIZE']
+        del os.environ['REDIS_SPILL_DIRECTORY']
+
+  def test_store_dataframe_as_arrow(self):
+    df = pd.DataFrame({
+      'id': [f'POI{i}' for i in range(1000)],
+      'lat': np.linspace(41, 51, 1000),
+      'cluster': np.arange(1000) % 7,
+      'category': pd.Categorical(['Museum', 'Castle'] * 500),
+    }, index=pd.RangeIndex(10, 1010))
+    os.environ['REDIS_EXPIRATION'] = '3600'
+    for codec in codecs:
+      with self.subTest(codec=codec):
+        name = object_store(f'df_{codec}', df, codec=codec)
+        pd.testing.assert_frame_equal(df, object_read(name))
+        self.assertIsInstance(object_read_table(name), pa.Table)
+        if codec in ('none', 'lz4', 'zstd'):
+          # Arrow compresses the columns itself, the stream is stored as is
+          self.assertTrue(_redis().get(name).startswith(b'\x00\xff\xff\xff\xff'))
+        object_delete(name)
+    self.assertIsNone(object_read_table('unknown'))
+
+  def test_dataframe_not_convertible_to_arrow_is_pickled(self):
+    df = pd.DataFrame({'ids': [['a', 'b'], ['c']], 'value': [object(), 1]})
+    os.environ['REDIS_EXPIRATION'] = '3600'
+    name = object_store('df_pickled', df)
+    self.assertEqual(['a', 'b'], object_read(name)['ids'][0])
+    with self.assertRaises(TypeError):
+      object_read_table(name)
+    self.assertEqual([['a', 'b'], ['c']], object_read(object_store('df_lists', df[['ids']]))['ids'].tolist())
+    object_delete('df_pickled')
+    object_delete('df_lists')
+
+  def test_spilled_dataframe_is_memory_mapped(self):
+    df = pd.DataFrame({'x': np.random.rand(100000), 'y': np.random.rand(100000)})
+    os.environ['REDIS_EXPIRATION'] = '3600'
+    os.environ['REDIS_SPILL_SIZE'] = '50000'
+    with tempfile.TemporaryDirectory() as directory:
+      os.environ['REDIS_SPILL_DIRECTORY'] = directory
+      try:
+        name = object_store('df_spilled', df, codec='none')
+        self.assertEqual(1, len(os.listdir(directory)))
+        allocated = pa.total_allocated_bytes()
+        table = object_read_table(name)
+        # The columns point into the mapped file, nothing is allocated for them
+        self.assertEqual(allocated, pa.total_allocated_bytes())
+        self.assertEqual(df['x'].tolist(), table.column('x').to_pylist())
+        pd.testing.assert_frame_equal(df, object_read(name))
+        del table
+        object_delete(name)
+      finally:
+        del os.environ['REDIS_SPILL_SIZE']
+        del os.environ['REDIS_SPILL_DIRECTORY']
+
+  def test_connection_pool_is_reused(self):
+    self.assertIs(_redis().connection_pool, _redis().connection_pool)
+
 
 if __name__ == "__main__":
   unittest.main()